@@ -1,4 +1,5 @@
 from flask import Flask, request, jsonify, session, redirect, url_for, render_template, send_from_directory, abort, g
+from flask import stream_template, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
 from flask_bcrypt import Bcrypt
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
@@ -7,31 +8,138 @@ import os
 import secrets
 import requests
 import base64
-from datetime import datetime
+import hashlib
+import json
+from collections import defaultdict
+from datetime import datetime, timedelta
 from uuid import uuid4
 from werkzeug.utils import secure_filename
-from sqlalchemy import inspect, text, or_
-
-
-from extensions.uploads import save_files, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH
-from extensions.s3_upload import upload_file_to_s3, upload_bytes_to_s3, presign_keys
+from sqlalchemy import inspect, text, or_, func, select, delete, tuple_, bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, validates
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+
+from extensions.uploads import save_files, delete_files, ALLOWED_EXTENSIONS, MAX_CONTENT_LENGTH
+from extensions.s3_upload import upload_file_to_s3, upload_bytes_to_s3, presign_keys, delete_keys, list_objects_page, extract_key, S3_UPLOAD_PREFIX
+from extensions.query_stats import init_query_stats
+from extensions.metrics import init_metrics, PUSH_LATENCY, PUSH_MESSAGES
+from extensions.tracing import init_tracing, start_span, current_traceparent
+from extensions.profiler import init_profiler
+from extensions.db_engine import engine_options
+from extensions.db_replicas import RoutingSession, init_replicas, use_primary
+from extensions.feed_cache import feed_cache
+from extensions.fast_json import OrjsonProvider
+from extensions.compression import init_compression
+from extensions.msgpack_response import MSGPACK_MIMETYPE, packb, wants_msgpack
+from extensions.batch import BatchError, parse_ops, run_batch
+from extensions.http_client import http_session
+from extensions.passwords import BCRYPT_LOG_ROUNDS, PASSWORD_HASH_RETRY_AFTER_SECONDS, PasswordHasherBusy, password_hasher
 
 
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.config['SECRET_KEY'] = 'supersecretkey'
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///groupo.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('SQLALCHEMY_DATABASE_URI', 'sqlite:///groupo.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 USE_S3 = os.environ.get('RENDER') == 'true'
 if USE_S3:
     print("[startup] RENDER=true detected; will attempt S3 uploads. Ensure AWS_ACCESS_KEY_ID/AWS_SECRET_ACCESS_KEY/S3_BUCKET_NAME are set.")
 MAX_MEDIA_PER_POST = int(os.environ.get('MAX_MEDIA_PER_POST', 20))
-
+# Buffer like/comment pushes per (recipient, post) for this many seconds; 0 sends immediately.
+NOTIFY_COALESCE_SECONDS = int(os.environ.get('NOTIFY_COALESCE_SECONDS', 0))
+EXPO_PUSH_BATCH_SIZE = 100  # Expo accepts at most 100 messages per send request.
+EXPO_RECEIPT_BATCH_SIZE = 1000  # ...and at most 1000 receipt ids per lookup.
+# Expo recommends waiting ~15 minutes before reading receipts.
+PUSH_RECEIPT_DELAY_SECONDS = int(os.environ.get('PUSH_RECEIPT_DELAY_SECONDS', 15 * 60))
+PUSH_MAX_FAILURES = int(os.environ.get('PUSH_MAX_FAILURES', 5))
+# With the queue disabled, enqueue_job() runs handlers inline in the request (the old behaviour).
+JOB_QUEUE_ENABLED = os.environ.get('JOB_QUEUE_ENABLED') == 'true'
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+JOB_RETRY_BASE_SECONDS = int(os.environ.get('JOB_RETRY_BASE_SECONDS', 5))
+JOB_RETRY_MAX_SECONDS = int(os.environ.get('JOB_RETRY_MAX_SECONDS', 60 * 60))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get('JOB_LOCK_TIMEOUT_SECONDS', 15 * 60))
+ACCOUNT_PURGE_BATCH_SIZE = int(os.environ.get('ACCOUNT_PURGE_BATCH_SIZE', 500))
+# Without the job queue, DELETE /api/me purges inline but stops after this many batches; see purge_account().
+ACCOUNT_PURGE_INLINE_BATCHES = int(os.environ.get('ACCOUNT_PURGE_INLINE_BATCHES', 50))
+MEDIA_GC_PAGE_SIZE = 1000
+# Unreferenced media younger than this (relative to the start of the GC run) is never deleted.
+MEDIA_GC_GRACE_SECONDS = int(os.environ.get('MEDIA_GC_GRACE_SECONDS', 24 * 60 * 60))
+# Only S3 keys under this prefix are ever swept. Unset (and no S3_UPLOAD_PREFIX) skips the S3 sweep; set it
+# to an empty string only when the bucket holds nothing but this app's uploads.
+MEDIA_GC_S3_PREFIX = os.environ.get('MEDIA_GC_S3_PREFIX', S3_UPLOAD_PREFIX or None)
+# Marked when a post holds an http(s) URL that is not an object of S3_BUCKET_NAME; the S3 sweep is skipped
+# until scripts/backfill_s3_keys.py has rewritten it, since the object it points at cannot be protected.
+MEDIA_GC_UNRESOLVED = 'unresolved:'
+# Feeds embed only the newest comments of each post; the rest come from GET /api/posts/<id>/comments.
+COMMENT_PREVIEW_COUNT = int(os.environ.get('COMMENT_PREVIEW_COUNT', 3))
+COMMENT_PAGE_SIZE = 50
+# ?stream=true feeds are read and serialized this many posts at a time.
+FEED_STREAM_BATCH_SIZE = int(os.environ.get('FEED_STREAM_BATCH_SIZE', 500))
+# Most contacts accepted by one POST /api/contacts/match; they are looked up CONTACTS_MATCH_CHUNK at a time.
+CONTACTS_MATCH_MAX = int(os.environ.get('CONTACTS_MATCH_MAX', 10000))
+CONTACTS_MATCH_CHUNK = 500
+# Most usernames plus phone numbers accepted by one POST /api/{groups,albums}/<id>/members/bulk.
+MEMBERS_BULK_MAX = int(os.environ.get('MEMBERS_BULK_MAX', 500))
+
+# Scripts that still hash through Flask-Bcrypt use the same cost as password_hasher.
+app.config['BCRYPT_LOG_ROUNDS'] = BCRYPT_LOG_ROUNDS
 bcrypt = Bcrypt(app)
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 login_manager = LoginManager(app)
 login_manager.login_view = 'login_page'
+init_query_stats(app)
+init_metrics(app)
+init_tracing(app)
+init_profiler(app)
+init_replicas(app, db)
+init_compression(app)
+
+# Indexes backing the hot lookups. Declared on the models for fresh databases and created here for
+# databases that predate them; tests/test_query_plans.py fails if an endpoint query falls back to a scan.
+HOT_INDEXES = (
+    ("ix_post_group_id_id", "post", ("group_id", "id")),
+    ("ix_post_user_id", "post", ("user_id",)),
+    ("ix_comment_post_id_id", "comment", ("post_id", "id")),
+    ("ix_comment_user_id", "comment", ("user_id",)),
+    ("ix_device_token_user_id", "device_token", ("user_id",)),
+    ("ix_device_token_token", "device_token", ("token",)),
+    ("ix_post_album_album_id_post_id", "post_album", ("album_id", "post_id")),
+    ("ix_post_like_user_id", "post_like", ("user_id",)),
+    ("ix_group_members_group_id_user_id", "group_members", ("group_id", "user_id")),
+    ("ix_group_parent_group_id_kind", "group", ("parent_group_id", "kind")),
+    ("ix_friends_user_id", "friends", ("user_id",)),
+    ("ix_friends_friend_id", "friends", ("friend_id",)),
+    ("ix_user_phone_hash", "user", ("phone_hash",)),
+)
+
+
+def _ensure_indexes(inspector):
+    tables = set(inspector.get_table_names())
+    with db.engine.begin() as conn:
+        for name, table, columns in HOT_INDEXES:
+            if table in tables:
+                conn.execute(text(f'CREATE INDEX IF NOT EXISTS {name} ON "{table}" ({", ".join(columns)})'))
+
+
+def _backfill_phone_hashes():
+    rows = db.session.execute(select(User.id, User.phone_number).where(User.phone_number.is_not(None), User.phone_hash.is_(None))).all()
+    for start in range(0, len(rows), 1000):
+        db.session.execute(
+            User.__table__.update().where(User.id == bindparam('user_id')).values(phone_hash=bindparam('hash')),
+            [{"user_id": row.id, "hash": _hash_phone_number(row.phone_number)} for row in rows[start:start + 1000]],
+        )
+    db.session.commit()
+
+
+def _backfill_comment_counts():
+    with db.engine.begin() as conn:
+        conn.execute(text("UPDATE post SET comment_count = (SELECT COUNT(*) FROM comment WHERE comment.post_id = post.id)"))
+
 
 def _ensure_schema_columns():
     inspector = inspect(db.engine)
@@ -45,6 +153,13 @@ def _ensure_schema_columns():
     if "phone_number" not in user_cols:
         with db.engine.begin() as conn:
             conn.execute(text("ALTER TABLE user ADD COLUMN phone_number VARCHAR(20)"))
+    if "deleted_at" not in user_cols:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE \"user\" ADD COLUMN deleted_at TIMESTAMP"))
+    if "phone_hash" not in user_cols:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE \"user\" ADD COLUMN phone_hash VARCHAR(64)"))
+        _backfill_phone_hashes()
     group_cols = [c["name"] for c in inspector.get_columns("group")]
     if "kind" not in group_cols:
         with db.engine.begin() as conn:
@@ -57,7 +172,22 @@ def _ensure_schema_columns():
     if "parent_group_id" not in group_cols:
         with db.engine.begin() as conn:
             conn.execute(text("ALTER TABLE \"group\" ADD COLUMN parent_group_id INTEGER"))
+    post_cols = [c["name"] for c in inspector.get_columns("post")]
+    if "comment_count" not in post_cols:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE post ADD COLUMN comment_count INTEGER NOT NULL DEFAULT 0"))
+        _backfill_comment_counts()
     tables = set(inspector.get_table_names())
+    if "job" in tables and "trace_context" not in [c["name"] for c in inspector.get_columns("job")]:
+        with db.engine.begin() as conn:
+            conn.execute(text("ALTER TABLE job ADD COLUMN trace_context VARCHAR(64)"))
+    if "device_token" in tables:
+        token_cols = [c["name"] for c in inspector.get_columns("device_token")]
+        with db.engine.begin() as conn:
+            if "failure_count" not in token_cols:
+                conn.execute(text("ALTER TABLE device_token ADD COLUMN failure_count INTEGER DEFAULT 0"))
+            if "disabled_at" not in token_cols:
+                conn.execute(text("ALTER TABLE device_token ADD COLUMN disabled_at TIMESTAMP"))
     with db.engine.begin() as conn:
         if "post_album" not in tables:
             conn.execute(text("""
@@ -79,6 +209,7 @@ def _ensure_schema_columns():
                     FOREIGN KEY(user_id) REFERENCES user (id)
                 )
             """))
+    _ensure_indexes(inspect(db.engine))
 
 if not os.path.exists(app.config['UPLOAD_FOLDER']):
     os.makedirs(app.config['UPLOAD_FOLDER'])
@@ -90,10 +221,19 @@ class User(db.Model, UserMixin):
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     phone_number = db.Column(db.String(20), unique=True)
+    # sha256 of the normalized number, kept in step by _set_phone_hash; contact matching looks users up by it.
+    phone_hash = db.Column(db.String(64), index=True)
     api_token = db.Column(db.String(128), unique=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    deleted_at = db.Column(db.DateTime)  # Set when deletion is requested; the row goes once purge_account finishes.
+
+    @validates('phone_number')
+    def _set_phone_hash(self, key, value):
+        self.phone_hash = _hash_phone_number(value) if value else None
+        return value
 
 class Group(db.Model):
+    __table_args__ = (db.Index('ix_group_parent_group_id_kind', 'parent_group_id', 'kind'),)
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     kind = db.Column(db.String(20), default='group', nullable=False)
@@ -103,26 +243,30 @@ class Group(db.Model):
     members = db.relationship('User', secondary='group_members', backref='groups')
 
 class Post(db.Model):
+    __table_args__ = (db.Index('ix_post_group_id_id', 'group_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     image_urls = db.Column(db.Text)  # Comma-separated URLs or S3 keys
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), nullable=False)
     likes = db.Column(db.Integer, default=0)
+    comment_count = db.Column(db.Integer, default=0, nullable=False)  # Kept in step with Comment rows by every writer.
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     comments = db.relationship('Comment', backref='post', cascade="all, delete-orphan")
     user = db.relationship('User')
 
 class Comment(db.Model):
+    __table_args__ = (db.Index('ix_comment_post_id_id', 'post_id', 'id'),)
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.String(300), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     user = db.relationship('User')
 
 class GroupMembers(db.Model):
     __tablename__ = 'group_members'
+    __table_args__ = (db.Index('ix_group_members_group_id_user_id', 'group_id', 'user_id'),)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
     group_id = db.Column(db.Integer, db.ForeignKey('group.id'), primary_key=True)
 
@@ -134,17 +278,96 @@ class GroupNameAlias(db.Model):
 
 class PostAlbum(db.Model):
     __tablename__ = 'post_album'
+    __table_args__ = (db.Index('ix_post_album_album_id_post_id', 'album_id', 'post_id'),)
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), primary_key=True)
     album_id = db.Column(db.Integer, db.ForeignKey('group.id'), primary_key=True)
 
 class PostLike(db.Model):
     __tablename__ = 'post_like'
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, index=True)
+
+class NotificationMute(db.Model):
+    # Muting a group also mutes its albums; muting an album only affects that album.
+    __tablename__ = 'notification_mute'
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('group.id'), primary_key=True)
+
+class PendingNotification(db.Model):
+    # Durable buffer for coalesced like/comment pushes; drained by flush_pending_notifications().
+    __tablename__ = 'pending_notification'
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # like, comment
+    actor_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    actor_name = db.Column(db.String(80), nullable=False)
+    group_id = db.Column(db.Integer)
+    group_name = db.Column(db.String(255))
+    comment_id = db.Column(db.Integer)
+    content = db.Column(db.String(300))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class PushTicket(db.Model):
+    # Expo push tickets awaiting a receipt lookup by process_push_receipts().
+    __tablename__ = 'push_ticket'
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(db.String(100), nullable=False, unique=True)
+    token = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+class Job(db.Model):
+    # Durable background work; see enqueue_job() and scripts/job_worker.py.
+    __tablename__ = 'job'
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.Text)  # JSON-encoded keyword arguments for the handler
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, done, dead
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=JOB_MAX_ATTEMPTS, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_at = db.Column(db.DateTime)
+    locked_by = db.Column(db.String(100))
+    last_error = db.Column(db.Text)
+    idempotency_key = db.Column(db.String(255), unique=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    trace_context = db.Column(db.String(64))  # traceparent of the request that enqueued the job
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+class AccountDeletion(db.Model):
+    # Progress of purge_account(); kept after the user row is gone.
+    __tablename__ = 'account_deletion'
+    user_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), default='pending', nullable=False)  # pending, running, done
+    stage = db.Column(db.String(50))
+    rows_deleted = db.Column(db.Integer, default=0, nullable=False)
+    media_deleted = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+class MediaReference(db.Model):
+    # Mark set for the media GC: every stored object referenced by Post.image_urls, as "local:<name>" or "s3:<key>".
+    __tablename__ = 'media_reference'
+    key = db.Column(db.String(512), primary_key=True)
+
+class MediaGCState(db.Model):
+    # Single-row checkpoint so run_media_gc() can stop after a page budget and resume later.
+    __tablename__ = 'media_gc_state'
+    id = db.Column(db.Integer, primary_key=True)
+    phase = db.Column(db.String(20), default='idle', nullable=False)  # idle, mark, sweep_local, sweep_s3
+    mark_cursor = db.Column(db.Integer, default=0, nullable=False)
+    sweep_cursor = db.Column(db.String(512))
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    scanned = db.Column(db.Integer, default=0, nullable=False)
+    deleted = db.Column(db.Integer, default=0, nullable=False)
 
 friends = db.Table('friends',
-    db.Column('user_id', db.Integer, db.ForeignKey('user.id')),
-    db.Column('friend_id', db.Integer, db.ForeignKey('user.id'))
+    db.Column('user_id', db.Integer, db.ForeignKey('user.id'), index=True),
+    db.Column('friend_id', db.Integer, db.ForeignKey('user.id'), index=True)
 )
 
 with app.app_context():
@@ -265,6 +488,11 @@ def _normalize_phone_number(value):
     return digits
 
 
+def _hash_phone_number(normalized):
+    """Hex sha256 of a number already passed through _normalize_phone_number; clients hash the same way."""
+    return hashlib.sha256(normalized.encode('ascii')).hexdigest()
+
+
 def _public_user_payload(user: User):
     return {
         "id": user.id,
@@ -321,43 +549,218 @@ def _albums_for_post(post: Post):
     return ordered
 
 
-def _serialize_post(post: Post, viewer: User, fallback_group_name: str | None = None):
-    primary_group = Group.query.get(post.group_id)
-    if primary_group and primary_group.kind == 'album':
-        display_name = primary_group.name
-    elif primary_group:
-        display_name = _group_name_for_user(primary_group, viewer)
-    else:
-        display_name = fallback_group_name or ''
-    associated_albums = _albums_for_post(post)
+# Keys a serialized post can carry; fields=/include= select a subset (see _requested_post_fields).
+POST_FIELDS = (
+    "id", "content", "image_urls", "user", "user_id", "created_at", "likes", "comment_count",
+    "group_id", "group_name", "associated_albums", "comments",
+)
+# first_image is opt-in: list screens need one presigned URL, not all of them.
+OPTIONAL_POST_FIELDS = ("first_image",)
+POST_FIELD_ALIASES = {"albums": "associated_albums", "media": "image_urls"}
+
+
+def _requested_post_fields():
+    """Fields selected by ``?fields=`` (replaces the default set) and ``?include=`` (adds to it).
+
+    Returns None when neither is given (full posts), else a set; raises ValueError on unknown names.
+    """
+    def parse(name):
+        raw = ','.join(request.args.getlist(name))
+        return [POST_FIELD_ALIASES.get(f.strip(), f.strip()) for f in raw.split(',') if f.strip()]
+
+    fields, include = parse('fields'), parse('include')
+    if not fields and not include:
+        return None
+    unknown = sorted(set(fields + include) - set(POST_FIELDS + OPTIONAL_POST_FIELDS))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return {"id"} | set(fields or POST_FIELDS) | set(include)
+
+
+def _serialize_comment(comment: Comment):
     return {
-        "id": post.id,
-        "content": post.content,
-        "image_urls": _resolve_image_urls(post.image_urls),
-        "user": post.user.username,
-        "user_id": post.user_id,
-        "created_at": post.created_at.isoformat() if post.created_at else None,
-        "likes": post.likes,
-        "group_id": post.group_id,
-        "group_name": display_name,
-        "associated_albums": [
-            {"id": album.id, "name": album.name, "parent_group_id": album.parent_group_id}
-            for album in associated_albums
-        ],
-        "comments": [{
-            "id": c.id,
-            "content": c.content,
-            "user": c.user.username,
-            "user_id": c.user_id,
-            "created_at": c.created_at.isoformat() if c.created_at else None,
-        } for c in post.comments]
+        "id": comment.id,
+        "content": comment.content,
+        "user": comment.user.username,
+        "user_id": comment.user_id,
+        "created_at": comment.created_at.isoformat() if comment.created_at else None,
     }
 
+
+def _latest_comments(post_ids, limit=None):
+    """Newest ``limit`` comments of each post (oldest first) with their authors, one query per 500 posts."""
+    limit = COMMENT_PREVIEW_COUNT if limit is None else limit
+    previews = defaultdict(list)
+    if limit <= 0:
+        return previews
+    for start in range(0, len(post_ids), 500):
+        chunk = post_ids[start:start + 500]
+        ranked = (
+            select(Comment.id, func.row_number().over(partition_by=Comment.post_id, order_by=Comment.id.desc()).label('rank'))
+            .where(Comment.post_id.in_(chunk))
+            .subquery()
+        )
+        rows = (
+            Comment.query.options(joinedload(Comment.user))
+            .join(ranked, ranked.c.id == Comment.id)
+            .filter(ranked.c.rank <= limit)
+            .order_by(Comment.post_id, Comment.id)
+            .all()
+        )
+        for comment in rows:
+            previews[comment.post_id].append(comment)
+    return previews
+
+
+def _can_view_post(post: Post, user: User):
+    """Members of the post's own group or of any album it is linked to can read it."""
+    album_ids = select(PostAlbum.album_id).where(PostAlbum.post_id == post.id)
+    membership = GroupMembers.query.filter(
+        GroupMembers.user_id == user.id,
+        or_(GroupMembers.group_id == post.group_id, GroupMembers.group_id.in_(album_ids)),
+    )
+    return db.session.query(membership.exists()).scalar()
+
+
+def _serialize_post(post: Post, viewer: User, fallback_group_name: str | None = None, fields=None, comment_previews=None):
+    """Serialize ``post``; with ``fields`` only those keys are built, so unrequested relations are never loaded.
+
+    ``comments`` holds only the newest COMMENT_PREVIEW_COUNT; feeds pass ``comment_previews`` from
+    _latest_comments to fetch them for every post at once.
+    """
+    def wanted(name):
+        return fields is None or name in fields
+
+    data = {"id": post.id}
+    if wanted("content"):
+        data["content"] = post.content
+    if wanted("image_urls"):
+        data["image_urls"] = _resolve_image_urls(post.image_urls)
+    if fields is not None and "first_image" in fields:
+        first = _split_image_urls(post.image_urls)[:1]
+        data["first_image"] = _resolve_image_urls(first[0])[0] if first else None
+    if wanted("user"):
+        data["user"] = post.user.username
+    if wanted("user_id"):
+        data["user_id"] = post.user_id
+    if wanted("created_at"):
+        data["created_at"] = post.created_at.isoformat() if post.created_at else None
+    if wanted("likes"):
+        data["likes"] = post.likes
+    if wanted("comment_count"):
+        data["comment_count"] = post.comment_count
+    if wanted("group_id"):
+        data["group_id"] = post.group_id
+    if wanted("group_name"):
+        primary_group = Group.query.get(post.group_id)
+        if primary_group and primary_group.kind == 'album':
+            display_name = primary_group.name
+        elif primary_group:
+            display_name = _group_name_for_user(primary_group, viewer)
+        else:
+            display_name = fallback_group_name or ''
+        data["group_name"] = display_name
+    if wanted("associated_albums"):
+        data["associated_albums"] = [
+            {"id": album.id, "name": album.name, "parent_group_id": album.parent_group_id}
+            for album in _albums_for_post(post)
+        ]
+    if wanted("comments"):
+        if comment_previews is None:
+            comment_previews = _latest_comments([post.id])
+        data["comments"] = [_serialize_comment(c) for c in comment_previews.get(post.id, [])]
+    return data
+
+def _feed_group_ids(post: Post):
+    """Every feed that renders ``post``: its own group, the albums it is linked to, and their parent groups."""
+    ids = {post.group_id}
+    for album in _albums_for_post(post):
+        ids.update((album.id, album.parent_group_id))
+    return ids
+
+
+def _feed_group_ids_for(post_ids):
+    """_feed_group_ids for every post in ``post_ids`` (a list or a select of ids), in three queries."""
+    ids = set(db.session.scalars(
+        select(Post.group_id).where(Post.id.in_(post_ids)).union(select(PostAlbum.album_id).where(PostAlbum.post_id.in_(post_ids)))
+    ))
+    if ids:
+        ids.update(db.session.scalars(select(Group.parent_group_id).where(Group.id.in_(ids), Group.parent_group_id.is_not(None))))
+    return ids
+
+
+def _viewer_aliases(user: User):
+    """The user's (group id, alias) pairs; any feed whose posts carry a group_name depends on them."""
+    rows = db.session.execute(
+        select(GroupNameAlias.group_id, GroupNameAlias.name).where(GroupNameAlias.user_id == user.id).order_by(GroupNameAlias.group_id)
+    )
+    return tuple((row.group_id, row.name) for row in rows)
+
+
+def _cached_feed_response(group_id, viewer_bits, build):
+    """Serve a feed from ``feed_cache``; ``build`` returns the payload dict on a miss.
+
+    Sent as JSON, or as interned MessagePack when the client asks for ``Accept: application/msgpack``.
+    """
+    as_msgpack = wants_msgpack()
+    parts = (request.endpoint, viewer_bits, as_msgpack, tuple(sorted(request.args.items(multi=True))))
+    if as_msgpack:
+        render = lambda: packb(build())
+    else:
+        render = lambda: app.json.response(build()).get_data()
+    body, hit = feed_cache.get_or_build(group_id, parts, render)
+    response = app.response_class(body, mimetype=MSGPACK_MIMETYPE if as_msgpack else 'application/json')
+    response.vary.add('Accept')
+    response.headers['X-Cache'] = 'hit' if hit else 'miss'
+    return response
+
+
+def _feed_posts_select(group_id, album_ids=()):
+    """Posts shown in a feed: those owned by ``group_id`` plus those linked to any of ``album_ids``, newest first."""
+    condition = Post.group_id == group_id
+    if album_ids:
+        linked = select(PostAlbum.post_id).where(PostAlbum.album_id.in_(album_ids))
+        condition = or_(Post.id.in_(linked), condition)
+    return select(Post).where(condition).order_by(Post.id.desc())
+
+
+def _iter_post_batches(stmt):
+    """Lists of at most FEED_STREAM_BATCH_SIZE posts, read through a server-side cursor."""
+    result = db.session.execute(stmt.execution_options(yield_per=FEED_STREAM_BATCH_SIZE))
+    yield from result.scalars().partitions()
+
+
+def _streamed_feed_response(head, stmt, fallback_group_name, fields):
+    """Send ``head`` plus a ``posts`` array encoded one batch at a time, so memory stays flat at any feed size.
+
+    Streamed feeds bypass ``feed_cache`` and are always JSON.
+    """
+    viewer = g.api_user
+
+    def generate():
+        yield app.json.dumps_bytes(head)[:-1] + b',"posts":['
+        separator = b''
+        for batch in _iter_post_batches(stmt):
+            previews = _latest_comments([p.id for p in batch]) if fields is None or "comments" in fields else None
+            for post in batch:
+                yield separator + app.json.dumps_bytes(
+                    _serialize_post(post, viewer, fallback_group_name=fallback_group_name, fields=fields, comment_previews=previews)
+                )
+                separator = b','
+        yield b']}\n'
+
+    response = app.response_class(stream_with_context(generate()), mimetype='application/json')
+    response.headers['X-Cache'] = 'bypass'
+    return response
+
+
 class DeviceToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    token = db.Column(db.String(255), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    token = db.Column(db.String(255), nullable=False, index=True)
     platform = db.Column(db.String(50), default='expo')  # expo, ios, android
+    failure_count = db.Column(db.Integer, default=0)
+    disabled_at = db.Column(db.DateTime)  # Set after PUSH_MAX_FAILURES consecutive delivery errors.
     user = db.relationship('User', backref='device_tokens')
 
 User.friends = db.relationship(
@@ -368,7 +771,10 @@ User.friends = db.relationship(
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    user = User.query.get(int(user_id))
+    if user and user.deleted_at:
+        return None
+    return user
 
 @app.route('/')
 def home():
@@ -399,7 +805,12 @@ def login_page():
     if request.method == 'POST':
         data = request.form
         user = User.query.filter_by(username=data['username']).first()
-        if user and bcrypt.check_password_hash(user.password, data['password']):
+        try:
+            valid = user and not user.deleted_at and _check_password(user, data['password'])
+        except PasswordHasherBusy:
+            return render_template('login.html', error='Too many sign-ins right now, please try again.'), 503
+        if valid:
+            db.session.commit()
             login_user(user)
             return redirect(url_for('dashboard'))
         return render_template('login.html', error='Invalid credentials')
@@ -459,11 +870,12 @@ def group_posts(group_id):
         post = Post(content=content, user_id=current_user.id, group_id=group.id, image_urls=','.join(image_urls))
         db.session.add(post)
         db.session.commit()
+        feed_cache.bump(_feed_group_ids(post))
         return redirect(url_for('group_posts', group_id=group_id))
 
-    posts = Post.query.filter_by(group_id=group.id).order_by(Post.id.desc()).all()
-    image_urls_map = {p.id: _resolve_image_urls(p.image_urls) for p in posts}
-    return render_template('group_posts.html', group=group, posts=posts, image_urls_map=image_urls_map)
+    # Rendered as the rows arrive, so large groups never hold the whole page in memory.
+    posts = (post for batch in _iter_post_batches(_feed_posts_select(group.id)) for post in batch)
+    return stream_template('group_posts.html', group=group, posts=posts, resolve_image_urls=_resolve_image_urls)
 
 @app.route('/uploads/<filename>')
 def uploaded_file(filename):
@@ -475,6 +887,7 @@ def like_post(post_id):
     post = Post.query.get_or_404(post_id)
     post.likes += 1
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     return jsonify({"likes": post.likes})
 
 @app.route('/comment_post/<int:post_id>', methods=['POST'])
@@ -484,12 +897,24 @@ def comment_post(post_id):
     post = Post.query.get_or_404(post_id)
     comment = Comment(content=content, user_id=current_user.id, post=post)
     db.session.add(comment)
+    post.comment_count = Post.comment_count + 1
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     group = Group.query.get(post.group_id)
     if group:
-        notify_group_members_comment(group, current_user, post, comment)
+        notify_group_members_comment([group], current_user, post, comment)
     return jsonify({"message": "Comment added."})
 
+def _delete_post(post: Post):
+    """Delete ``post`` with its album links, likes and buffered digests, then bump the feeds it was in."""
+    feed_ids = _feed_group_ids(post)
+    PostAlbum.query.filter_by(post_id=post.id).delete()
+    PostLike.query.filter_by(post_id=post.id).delete()
+    PendingNotification.query.filter_by(post_id=post.id).delete()
+    db.session.delete(post)
+    db.session.commit()
+    feed_cache.bump(feed_ids)
+
 @app.route('/delete_post/<int:post_id>', methods=['POST'])
 @login_required
 def delete_post(post_id):
@@ -497,8 +922,7 @@ def delete_post(post_id):
     if post.user_id != current_user.id:
         abort(403)  # Forbidden if not the owner
 
-    db.session.delete(post)
-    db.session.commit()
+    _delete_post(post)
     return jsonify({"message": "Post deleted"})
 
 @app.route('/search_users')
@@ -539,10 +963,28 @@ def get_api_user():
     return User.query.filter_by(api_token=token).first()
 
 
+def _check_password(user: User, password):
+    """Verify ``password``; a hash made with another cost factor is replaced (the caller commits)."""
+    if not password_hasher.verify(user.password, password):
+        return False
+    if password_hasher.needs_rehash(user.password):
+        user.password = password_hasher.hash(password)
+    return True
+
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(exc):
+    response = jsonify({"error": "Too many sign-ins right now, please try again."})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(PASSWORD_HASH_RETRY_AFTER_SECONDS)
+    return response
+
+
 def token_required(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
-        user = get_api_user()
+        # Batched sub-requests reuse the user the batch already authenticated.
+        user = g.get('batch_user') or get_api_user()
         if not user:
             return jsonify({"error": "Unauthorized"}), 401
         g.api_user = user
@@ -550,105 +992,795 @@ def token_required(f):
     return wrapper
 
 
-def notify_group_members(group: Group, actor: User, post: Post):
-    member_ids = [m.id for m in group.members if m.id != actor.id]
-    tokens = DeviceToken.query.filter(DeviceToken.user_id.in_(member_ids)).all()
-    if not tokens:
-        return
+JOB_HANDLERS = {}
+
+
+def job_handler(name):
+    def decorator(f):
+        JOB_HANDLERS[name] = f
+        return f
+    return decorator
+
+
+def enqueue_job(name, payload=None, idempotency_key=None, run_at=None, max_attempts=None, user: User | None = None):
+    """Queue ``JOB_HANDLERS[name](**payload)`` for a worker, or run it now when the queue is disabled.
+
+    Returns the Job row (an existing one if ``idempotency_key`` was already used), or None when run inline.
+    """
+    payload = payload or {}
+    if not JOB_QUEUE_ENABLED:
+        try:
+            with start_span(f"job {name}"):
+                JOB_HANDLERS[name](**payload)
+        except Exception as exc:
+            print(f"[jobs] inline job failed name={name} exc={exc}")
+        return None
+    if idempotency_key:
+        existing = Job.query.filter_by(idempotency_key=idempotency_key).first()
+        if existing:
+            return existing
+    job = Job(
+        name=name,
+        payload=json.dumps(payload),
+        idempotency_key=idempotency_key,
+        run_at=run_at or datetime.utcnow(),
+        max_attempts=max_attempts or JOB_MAX_ATTEMPTS,
+        user_id=user.id if user else None,
+        trace_context=current_traceparent(),
+    )
+    try:
+        with db.session.begin_nested():
+            db.session.add(job)
+    except IntegrityError:
+        return Job.query.filter_by(idempotency_key=idempotency_key).first()
+    db.session.commit()
+    return job
+
+
+def _job_backoff(attempts):
+    return timedelta(seconds=min(JOB_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), JOB_RETRY_MAX_SECONDS))
+
 
+def claim_jobs(worker_id, limit=1, now=None):
+    now = now or datetime.utcnow()
+    # FOR UPDATE SKIP LOCKED on Postgres; SQLite ignores it and relies on the conditional UPDATE below.
+    candidates = (
+        Job.query
+        .filter(Job.status == 'queued', Job.run_at <= now)
+        .order_by(Job.run_at.asc(), Job.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    claimed = []
+    for job in candidates:
+        updated = Job.query.filter_by(id=job.id, status='queued').update(
+            {Job.status: 'running', Job.locked_at: now, Job.locked_by: worker_id, Job.attempts: Job.attempts + 1},
+            synchronize_session=False,
+        )
+        if updated:
+            claimed.append(job.id)
+    db.session.commit()
+    return [db.session.get(Job, job_id) for job_id in claimed]
+
+
+def run_job(job: Job):
+    """Run a claimed job, then mark it done, schedule a retry, or dead-letter it."""
+    handler = JOB_HANDLERS.get(job.name)
+    try:
+        if handler is None:
+            raise LookupError(f"no handler registered for {job.name!r}")
+        with start_span(f"job {job.name}", kind='consumer', traceparent=job.trace_context, **{"job.id": job.id, "job.attempt": job.attempts}):
+            handler(**json.loads(job.payload or '{}'))
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(Job, job.id)
+        now = datetime.utcnow()
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        job.locked_by = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'dead'
+            job.finished_at = now
+            print(f"[jobs] dead-lettered id={job.id} name={job.name} attempts={job.attempts} error={job.last_error}")
+        else:
+            job.status = 'queued'
+            job.run_at = now + _job_backoff(job.attempts)
+            print(f"[jobs] retrying id={job.id} name={job.name} attempts={job.attempts} error={job.last_error}")
+        db.session.commit()
+        return False
+    job.status = 'done'
+    job.finished_at = datetime.utcnow()
+    job.locked_at = None
+    job.locked_by = None
+    job.last_error = None
+    db.session.commit()
+    return True
+
+
+def requeue_stale_jobs(now=None):
+    # Jobs left running by a crashed worker go back to the queue; the attempt still counts.
+    now = now or datetime.utcnow()
+    requeued = Job.query.filter(
+        Job.status == 'running',
+        Job.locked_at < now - timedelta(seconds=JOB_LOCK_TIMEOUT_SECONDS),
+    ).update({Job.status: 'queued', Job.locked_at: None, Job.locked_by: None}, synchronize_session=False)
+    db.session.commit()
+    return requeued
+
+
+def run_pending_jobs(worker_id, limit=10):
+    """Claim and run up to ``limit`` due jobs. Returns the number of jobs processed."""
+    jobs = claim_jobs(worker_id, limit=limit)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def _job_payload(job: Job):
+    return {
+        "id": job.id,
+        "name": job.name,
+        "status": job.status,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "last_error": job.last_error,
+        "run_at": job.run_at.isoformat() if job.run_at else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def _recipient_user_ids(actor: User, group_ids=(), user_ids=(), mute_group_ids=()):
+    """Query of distinct user ids for members of ``group_ids`` plus ``user_ids``, minus the actor and muted users."""
+    group_ids = [gid for gid in dict.fromkeys(group_ids) if gid is not None]
+    user_ids = [uid for uid in dict.fromkeys(user_ids) if uid is not None]
+    mute_group_ids = [gid for gid in dict.fromkeys(mute_group_ids) if gid is not None]
+    if not group_ids and not user_ids:
+        return None
+    sources = []
+    if group_ids:
+        # A member is muted for an album if they muted the album itself or its parent group.
+        member_muted = db.session.query(NotificationMute.user_id).filter(
+            NotificationMute.user_id == GroupMembers.user_id,
+            or_(NotificationMute.group_id == GroupMembers.group_id, NotificationMute.group_id == Group.parent_group_id),
+        ).exists()
+        sources.append(
+            db.session.query(GroupMembers.user_id.label("user_id"))
+            .join(Group, Group.id == GroupMembers.group_id)
+            .filter(GroupMembers.group_id.in_(group_ids), GroupMembers.user_id != actor.id, ~member_muted)
+        )
+    if user_ids:
+        direct = db.session.query(User.id.label("user_id")).filter(User.id.in_(user_ids), User.id != actor.id)
+        if mute_group_ids:
+            direct_muted = db.session.query(NotificationMute.user_id).filter(
+                NotificationMute.user_id == User.id,
+                NotificationMute.group_id.in_(mute_group_ids),
+            ).exists()
+            direct = direct.filter(~direct_muted)
+        sources.append(direct)
+    return sources[0] if len(sources) == 1 else sources[0].union(*sources[1:])
+
+
+def _recipient_tokens(actor: User, group_ids=(), user_ids=(), mute_group_ids=()):
+    """Distinct push tokens for the recipients described by ``_recipient_user_ids``.
+
+    Resolved in a single query so a user who belongs to several target albums
+    is only notified once per device.
+    """
+    recipients = _recipient_user_ids(actor, group_ids, user_ids, mute_group_ids)
+    if recipients is None:
+        return []
+    rows = (
+        db.session.query(DeviceToken.token)
+        .filter(DeviceToken.user_id.in_(recipients.subquery().select()), DeviceToken.disabled_at.is_(None))
+        .distinct()
+        .all()
+    )
+    return [row.token for row in rows]
+
+
+@job_handler('send_push')
+def _send_push(tokens, title, body, data):
     expo_endpoint = os.environ.get("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
-    for t in tokens:
-        payload = {
-            "to": t.token,
-            "title": f"New post in {group.name}",
-            "body": f"{actor.username} posted: {post.content[:80]}",
-            "data": {"group_id": group.id, "post_id": post.id},
-        }
+    tokens = list(tokens)
+    failed = []
+    for start in range(0, len(tokens), EXPO_PUSH_BATCH_SIZE):
+        batch = tokens[start:start + EXPO_PUSH_BATCH_SIZE]
+        messages = [{"to": token, "title": title, "body": body, "data": data} for token in batch]
         try:
-            resp = requests.post(expo_endpoint, json=payload, timeout=5)
-            if resp.status_code != 200:
-                print(f"[notify] failed status={resp.status_code} token={t.token} body={resp.text}")
+            with PUSH_LATENCY.time(), start_span('expo.push.send', kind='client', **{"messaging.batch.message_count": len(batch)}):
+                resp = http_session.post(expo_endpoint, json=messages, timeout=5)
         except Exception as exc:
-            print(f"[notify] error token={t.token} exc={exc}")
+            PUSH_MESSAGES.labels('error').inc(len(batch))
+            print(f"[notify] error tokens={len(batch)} exc={exc}")
+            failed.extend(batch)
+            continue
+        if resp.status_code != 200:
+            PUSH_MESSAGES.labels('error').inc(len(batch))
+            print(f"[notify] failed status={resp.status_code} tokens={len(batch)} body={resp.text}")
+            failed.extend(batch)
+            continue
+        _record_push_tickets(batch, resp)
+    if not failed:
+        return
+    if len(failed) == len(tokens):
+        # Nothing was delivered: fail the job so the queue retries it with backoff, then dead-letters it.
+        raise RuntimeError(f"Expo push failed for all {len(failed)} tokens")
+    # Retrying this job would resend the batches that went through; queue the failed tokens on their own.
+    # The follow-up is strictly smaller, and fails (and backs off) as a whole if none of it gets through.
+    if JOB_QUEUE_ENABLED:
+        enqueue_job('send_push', {"tokens": failed, "title": title, "body": body, "data": data},
+                    run_at=datetime.utcnow() + _job_backoff(1))
 
 
-def notify_group_members_comment(group: Group, actor: User, post: Post, comment: Comment):
-    # Notify all group/album members except the actor.
-    # This includes the post owner (if different from actor).
-    skip_ids = {actor.id}
-    member_ids = [m.id for m in group.members if m.id not in skip_ids]
-    tokens = DeviceToken.query.filter(DeviceToken.user_id.in_(member_ids)).all()
-    if not tokens:
+def _queue_push(tokens, title, body, data, actor: User | None = None):
+    # The actor owns the job, so GET /api/jobs/<id> shows them how the push went.
+    return enqueue_job('send_push', {"tokens": list(tokens), "title": title, "body": body, "data": data}, user=actor)
+
+
+def _record_push_tickets(tokens, resp):
+    try:
+        tickets = resp.json().get("data") or []
+    except (ValueError, AttributeError):
         return
+    if isinstance(tickets, dict):
+        tickets = [tickets]
+    now = datetime.utcnow()
+    for token, ticket in zip(tokens, tickets):
+        PUSH_MESSAGES.labels('ok' if ticket.get("status") == "ok" else 'error').inc()
+        if ticket.get("status") == "ok" and ticket.get("id"):
+            db.session.add(PushTicket(ticket_id=ticket["id"], token=token, created_at=now))
+        elif ticket.get("status") == "error":
+            error = (ticket.get("details") or {}).get("error")
+            print(f"[notify] ticket error token={token} error={error} message={ticket.get('message')}")
+            _record_token_failure(token, error, now)
+    db.session.commit()
 
-    expo_endpoint = os.environ.get("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
-    for t in tokens:
-        payload = {
-            "to": t.token,
-            "title": f"New comment in {group.name}",
-            "body": f"{actor.username}: {comment.content[:80]}",
-            "data": {"group_id": group.id, "post_id": post.id, "comment_id": comment.id, "type": "comment"},
-        }
+
+def _record_token_failure(token, error, now):
+    """Prune uninstalled devices and disable tokens that keep failing. Returns the action taken."""
+    if error == 'DeviceNotRegistered':
+        DeviceToken.query.filter_by(token=token).delete(synchronize_session=False)
+        return 'pruned'
+    DeviceToken.query.filter_by(token=token).update(
+        {DeviceToken.failure_count: func.coalesce(DeviceToken.failure_count, 0) + 1},
+        synchronize_session=False,
+    )
+    disabled = DeviceToken.query.filter(
+        DeviceToken.token == token,
+        DeviceToken.failure_count >= PUSH_MAX_FAILURES,
+        DeviceToken.disabled_at.is_(None),
+    ).update({DeviceToken.disabled_at: now}, synchronize_session=False)
+    return 'disabled' if disabled else 'failed'
+
+
+def process_push_receipts(now=None):
+    """Look up Expo receipts for tickets older than PUSH_RECEIPT_DELAY_SECONDS and apply them.
+
+    Returns delivery stats for the run, including the success rate.
+    """
+    now = now or datetime.utcnow()
+    receipts_endpoint = os.environ.get("EXPO_RECEIPTS_URL", "https://exp.host/--/api/v2/push/getReceipts")
+    ready_before = now - timedelta(seconds=PUSH_RECEIPT_DELAY_SECONDS)
+    # Expo only keeps receipts for about a day; tickets older than that will never resolve.
+    expired_before = now - timedelta(hours=24)
+    stats = {"checked": 0, "ok": 0, "error": 0, "pruned": 0, "disabled": 0, "expired": 0}
+    last_id = 0
+    while True:
+        tickets = (
+            PushTicket.query
+            .filter(PushTicket.created_at <= ready_before, PushTicket.id > last_id)
+            .order_by(PushTicket.id.asc())
+            .limit(EXPO_RECEIPT_BATCH_SIZE)
+            .all()
+        )
+        if not tickets:
+            break
+        last_id = tickets[-1].id
         try:
-            resp = requests.post(expo_endpoint, json=payload, timeout=5)
-            if resp.status_code != 200:
-                print(f"[notify] failed status={resp.status_code} token={t.token} body={resp.text}")
+            with start_span('expo.push.receipts', kind='client', **{"messaging.batch.message_count": len(tickets)}):
+                resp = http_session.post(receipts_endpoint, json={"ids": [t.ticket_id for t in tickets]}, timeout=10)
         except Exception as exc:
-            print(f"[notify] error token={t.token} exc={exc}")
+            print(f"[notify] receipts error exc={exc}")
+            break
+        if resp.status_code != 200:
+            print(f"[notify] receipts failed status={resp.status_code} body={resp.text}")
+            break
+        receipts = resp.json().get("data") or {}
+        for ticket in tickets:
+            receipt = receipts.get(ticket.ticket_id)
+            if receipt is None:
+                if ticket.created_at <= expired_before:
+                    db.session.delete(ticket)
+                    stats["expired"] += 1
+                continue
+            stats["checked"] += 1
+            if receipt.get("status") == "ok":
+                stats["ok"] += 1
+                DeviceToken.query.filter_by(token=ticket.token).update(
+                    {DeviceToken.failure_count: 0}, synchronize_session=False
+                )
+            else:
+                stats["error"] += 1
+                error = (receipt.get("details") or {}).get("error")
+                print(f"[notify] receipt error token={ticket.token} error={error} message={receipt.get('message')}")
+                action = _record_token_failure(ticket.token, error, now)
+                if action in stats:
+                    stats[action] += 1
+            db.session.delete(ticket)
+        db.session.commit()
+    stats["success_rate"] = stats["ok"] / stats["checked"] if stats["checked"] else None
+    return stats
 
 
-def notify_post_owner_like(actor: User, post: Post):
-    if not post.user_id or post.user_id == actor.id:
+def _album_names(albums):
+    names = ", ".join(album.name for album in albums[:2])
+    if len(albums) > 2:
+        names += "..."
+    return names
+
+
+def notify_group_members(group: Group, actor: User, post: Post):
+    tokens = _recipient_tokens(actor, group_ids=[group.id])
+    if not tokens:
         return
-    tokens = DeviceToken.query.filter_by(user_id=post.user_id).all()
+    return _queue_push(
+        tokens,
+        f"New post in {group.name}",
+        f"{actor.username} posted: {post.content[:80]}",
+        {"group_id": group.id, "post_id": post.id},
+        actor=actor,
+    )
+
+
+def notify_group_members_comment(groups, actor: User, post: Post, comment: Comment):
+    # Notify all members of every group/album the post lives in, except the actor.
+    # This includes the post owner (if different from actor).
+    if not groups:
+        return
+    if NOTIFY_COALESCE_SECONDS > 0:
+        recipients = _recipient_user_ids(actor, group_ids=[grp.id for grp in groups])
+        _buffer_notifications('comment', recipients, actor, post, groups[0].id, _album_names(groups), comment)
+        return
+    tokens = _recipient_tokens(actor, group_ids=[grp.id for grp in groups])
     if not tokens:
         return
+    return _queue_push(
+        tokens,
+        f"New comment in {_album_names(groups)}",
+        f"{actor.username}: {comment.content[:80]}",
+        {"group_id": groups[0].id, "post_id": post.id, "comment_id": comment.id, "type": "comment"},
+        actor=actor,
+    )
+
+
+def notify_post_owner_like(actor: User, post: Post):
+    if not post.user_id or post.user_id == actor.id:
+        return
     group = Group.query.get(post.group_id)
+    mute_group_ids = [group.id, group.parent_group_id] if group else []
     group_name = group.name if group else "your group"
-    expo_endpoint = os.environ.get("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
-    for t in tokens:
-        payload = {
-            "to": t.token,
-            "title": "New like",
-            "body": f"{actor.username} liked your post in {group_name}",
-            "data": {"group_id": post.group_id, "post_id": post.id, "type": "like"},
-        }
-        try:
-            resp = requests.post(expo_endpoint, json=payload, timeout=5)
-            if resp.status_code != 200:
-                print(f"[notify] failed status={resp.status_code} token={t.token} body={resp.text}")
-        except Exception as exc:
-            print(f"[notify] error token={t.token} exc={exc}")
+    if NOTIFY_COALESCE_SECONDS > 0:
+        recipients = _recipient_user_ids(actor, user_ids=[post.user_id], mute_group_ids=mute_group_ids)
+        _buffer_notifications('like', recipients, actor, post, post.group_id, group_name)
+        return
+    tokens = _recipient_tokens(actor, user_ids=[post.user_id], mute_group_ids=mute_group_ids)
+    if not tokens:
+        return
+    return _queue_push(
+        tokens,
+        "New like",
+        f"{actor.username} liked your post in {group_name}",
+        {"group_id": post.group_id, "post_id": post.id, "type": "like"},
+        actor=actor,
+    )
 
 
 def notify_album_members_post(albums, actor: User, post: Post):
-    member_ids = set()
-    for album in albums:
-        for member in album.members:
-            if member.id != actor.id:
-                member_ids.add(member.id)
-    if not member_ids:
+    if not albums:
         return
-    tokens = DeviceToken.query.filter(DeviceToken.user_id.in_(list(member_ids))).all()
+    tokens = _recipient_tokens(actor, group_ids=[album.id for album in albums])
     if not tokens:
         return
-    album_names = ", ".join(album.name for album in albums[:2])
-    if len(albums) > 2:
-        album_names += "..."
-    expo_endpoint = os.environ.get("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
-    for t in tokens:
-        payload = {
-            "to": t.token,
-            "title": "New post",
-            "body": f"{actor.username} posted in {album_names}",
-            "data": {"post_id": post.id, "type": "post"},
-        }
+    return _queue_push(
+        tokens,
+        "New post",
+        f"{actor.username} posted in {_album_names(albums)}",
+        {"post_id": post.id, "type": "post"},
+        actor=actor,
+    )
+
+
+def notify_clock():
+    return datetime.utcnow()
+
+
+def _buffer_notifications(kind, recipients, actor: User, post: Post, group_id, group_name, comment: Comment | None = None):
+    if recipients is None:
+        return
+    now = notify_clock()
+    db.session.add_all([
+        PendingNotification(
+            recipient_id=row.user_id,
+            post_id=post.id,
+            kind=kind,
+            actor_id=actor.id,
+            actor_name=actor.username,
+            group_id=group_id,
+            group_name=group_name,
+            comment_id=comment.id if comment else None,
+            content=comment.content if comment else None,
+            created_at=now,
+        )
+        for row in recipients.all()
+    ])
+    db.session.commit()
+    if JOB_QUEUE_ENABLED:
+        # One delayed flush per window-aligned slot covers every row buffered before it is due,
+        # which lets the job worker stand in for scripts/notification_worker.py.
+        due = now.timestamp() + NOTIFY_COALESCE_SECONDS
+        slot_end = -(-int(due) // NOTIFY_COALESCE_SECONDS) * NOTIFY_COALESCE_SECONDS
+        enqueue_job(
+            'flush_notifications',
+            run_at=now + timedelta(seconds=slot_end - now.timestamp() + 1),
+            idempotency_key=f"flush_notifications:{slot_end}",
+        )
+
+
+def _cancel_pending_notifications(kind, post_id, actor_id, comment_id=None):
+    """Drop buffered rows for activity that was undone, so the digest no longer counts it; the caller commits."""
+    query = PendingNotification.query.filter_by(kind=kind, post_id=post_id, actor_id=actor_id)
+    if comment_id is not None:
+        query = query.filter_by(comment_id=comment_id)
+    return query.delete(synchronize_session=False)
+
+
+def _digest_push(kind, rows):
+    first, last = rows[0], rows[-1]
+    actors = list(dict.fromkeys(r.actor_name for r in rows))
+    if len(actors) == 1:
+        who = actors[0]
+    elif len(actors) == 2:
+        who = f"{actors[0]} and {actors[1]}"
+    else:
+        who = f"{actors[0]} and {len(actors) - 1} others"
+    data = {"group_id": first.group_id, "post_id": first.post_id, "type": kind}
+    if kind == 'like':
+        title = "New like" if len(rows) == 1 else "New likes"
+        return title, f"{who} liked your post in {first.group_name}", data
+    data["comment_id"] = last.comment_id
+    if len(rows) == 1:
+        return f"New comment in {first.group_name}", f"{first.actor_name}: {(first.content or '')[:80]}", data
+    return f"{len(rows)} new comments in {first.group_name}", f"{who} commented: {(last.content or '')[:80]}", data
+
+
+@job_handler('flush_notifications')
+def flush_pending_notifications(now=None):
+    """Send one summarized push per (recipient, post, kind) whose window has closed.
+
+    Rows are claimed by deleting them before sending, so concurrent flushers
+    never emit the same digest twice. Returns the number of digests sent.
+    """
+    now = now or notify_clock()
+    cutoff = now - timedelta(seconds=NOTIFY_COALESCE_SECONDS)
+    due = (
+        db.session.query(PendingNotification.recipient_id, PendingNotification.post_id, PendingNotification.kind)
+        .group_by(PendingNotification.recipient_id, PendingNotification.post_id, PendingNotification.kind)
+        .having(func.min(PendingNotification.created_at) <= cutoff)
+        .all()
+    )
+    if not due:
+        return 0
+    tokens_by_user = defaultdict(list)
+    live_tokens = DeviceToken.query.filter(
+        DeviceToken.user_id.in_({d.recipient_id for d in due}),
+        DeviceToken.disabled_at.is_(None),
+    )
+    for t in live_tokens.all():
+        tokens_by_user[t.user_id].append(t.token)
+    sent = 0
+    for recipient_id, post_id, kind in due:
+        rows = (
+            PendingNotification.query
+            .filter_by(recipient_id=recipient_id, post_id=post_id, kind=kind)
+            .order_by(PendingNotification.id.asc())
+            .all()
+        )
+        if not rows:
+            continue
+        title, body, data = _digest_push(kind, rows)
+        ids = [r.id for r in rows]
+        claimed = PendingNotification.query.filter(PendingNotification.id.in_(ids)).delete(synchronize_session=False)
+        if claimed != len(ids):
+            db.session.rollback()
+            continue
+        db.session.commit()
+        tokens = list(dict.fromkeys(tokens_by_user.get(recipient_id, [])))
+        if tokens:
+            _queue_push(tokens, title, body, data)
+            sent += 1
+    return sent
+
+
+def _delete_stored_media(urls):
+    """Delete uploaded files referenced by ``Post.image_urls`` entries. Returns how many were removed."""
+    local, keys = [], []
+    for url in urls:
+        if url.startswith('/uploads/'):
+            local.append(url.rsplit('/', 1)[1])
+        elif url and not url.startswith(('http://', 'https://', '/')):
+            keys.append(url)
+    deleted = delete_files(local, app.config['UPLOAD_FOLDER']) if local else 0
+    if keys and USE_S3:
         try:
-            resp = requests.post(expo_endpoint, json=payload, timeout=5)
-            if resp.status_code != 200:
-                print(f"[notify] failed status={resp.status_code} token={t.token} body={resp.text}")
+            deleted += delete_keys(keys)
         except Exception as exc:
-            print(f"[notify] error token={t.token} exc={exc}")
+            print(f"[upload] S3 delete failed, leaving keys for the media GC: {exc}")
+    return deleted
+
+
+def _insert_ignore(table, rows):
+    """Multi-row INSERT that skips rows violating a unique/primary key constraint."""
+    if not rows:
+        return
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql_insert(table).on_conflict_do_nothing()
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(table).on_conflict_do_nothing()
+    else:
+        stmt = table.insert().prefix_with('IGNORE')
+    db.session.execute(stmt, rows)
+
+
+def _media_reference_keys(image_urls):
+    keys = []
+    for url in _split_image_urls(image_urls):
+        if url.startswith('/uploads/'):
+            keys.append(f"local:{url.rsplit('/', 1)[1]}")
+        elif url.startswith(('http://', 'https://')):
+            # Legacy rows hold full presigned URLs instead of keys.
+            key = extract_key(url, os.environ.get('S3_BUCKET_NAME'))
+            keys.append(f"s3:{key}" if key else MEDIA_GC_UNRESOLVED)
+        elif url and not url.startswith('/'):
+            keys.append(f"s3:{url}")
+    return keys
+
+
+def _iter_local_media(upload_dir):
+    with os.scandir(upload_dir) as entries:
+        for entry in entries:
+            if entry.is_file():
+                yield entry.name, datetime.utcfromtimestamp(entry.stat().st_mtime)
+
+
+def _sweep_media_page(storage, objects, cutoff, dry_run):
+    """Delete the unreferenced objects in one listing page that are older than ``cutoff``."""
+    names = [f"{storage}:{name}" for name, _ in objects]
+    referenced = {row.key for row in MediaReference.query.filter(MediaReference.key.in_(names))}
+    garbage = [name for name, modified in objects if f"{storage}:{name}" not in referenced and modified < cutoff]
+    if garbage and not dry_run:
+        if storage == 'local':
+            delete_files(garbage, app.config['UPLOAD_FOLDER'])
+        else:
+            delete_keys(garbage)
+    return len(garbage)
+
+
+@job_handler('media_gc')
+def run_media_gc(max_pages=None, grace_seconds=None, dry_run=False, now=None):
+    """Mark-and-sweep unreferenced uploads in UPLOAD_FOLDER and the S3 bucket.
+
+    Mark streams Post.image_urls by keyset pages into media_reference. Sweep lists storage page by
+    page and checks each page against it, so memory stays bounded by the page size. A run stops
+    once ``max_pages`` pages have been processed and the next call resumes from the checkpoint.
+    The local folder cannot be listed in a stable order, so its sweep is a single streaming pass.
+    S3 is only swept under MEDIA_GC_S3_PREFIX. A dry run rolls back everything it wrote.
+    """
+    now = now or datetime.utcnow()
+    grace = timedelta(seconds=MEDIA_GC_GRACE_SECONDS if grace_seconds is None else grace_seconds)
+    state = db.session.get(MediaGCState, 1)
+    if dry_run:
+        if state and state.phase != 'idle':
+            raise RuntimeError("A media GC run is in progress; finish it before a dry run.")
+        # A dry run works on a throwaway checkpoint and always covers everything in one go.
+        state, max_pages = MediaGCState(id=1, phase='idle'), None
+    elif state is None:
+        state = MediaGCState(id=1, phase='idle')
+        db.session.add(state)
+    stats = {"pages": 0, "marked": 0, "scanned": 0, "garbage": 0, "unresolved": False, "dry_run": dry_run}
+    if state.phase == 'idle':
+        MediaReference.query.delete()
+        state.phase = 'mark'
+        state.mark_cursor = 0
+        state.sweep_cursor = None
+        state.started_at = now
+        state.finished_at = None
+        state.scanned = 0
+        state.deleted = 0
+        if not dry_run:
+            db.session.commit()
+    # Anything uploaded after marking began is younger than this, so a post that is created
+    # mid-run can never lose its media.
+    cutoff = state.started_at - grace
+    while state.phase != 'idle':
+        if max_pages is not None and stats["pages"] >= max_pages:
+            break
+        if state.phase == 'mark':
+            rows = (
+                db.session.query(Post.id, Post.image_urls)
+                .filter(Post.id > state.mark_cursor)
+                .order_by(Post.id.asc())
+                .limit(MEDIA_GC_PAGE_SIZE)
+                .all()
+            )
+            if not rows:
+                state.phase = 'sweep_local'
+                continue
+            refs = [{"key": key} for r in rows for key in _media_reference_keys(r.image_urls)]
+            _insert_ignore(MediaReference.__table__, refs)
+            stats["marked"] += len(refs)
+            state.mark_cursor = rows[-1].id
+        elif state.phase == 'sweep_local':
+            page = []
+            for item in _iter_local_media(app.config['UPLOAD_FOLDER']):
+                page.append(item)
+                if len(page) == MEDIA_GC_PAGE_SIZE:
+                    stats["garbage"] += _sweep_media_page('local', page, cutoff, dry_run)
+                    stats["scanned"] += len(page)
+                    stats["pages"] += 1
+                    page = []
+            if page:
+                stats["garbage"] += _sweep_media_page('local', page, cutoff, dry_run)
+                stats["scanned"] += len(page)
+            state.phase = 'sweep_s3' if USE_S3 else 'idle'
+        elif MEDIA_GC_S3_PREFIX is None:
+            print("[media-gc] MEDIA_GC_S3_PREFIX is not set; skipping the S3 sweep")
+            state.phase = 'idle'
+        elif db.session.get(MediaReference, MEDIA_GC_UNRESOLVED):
+            print("[media-gc] posts still hold S3 URLs that are not keys; run scripts/backfill_s3_keys.py. Skipping the S3 sweep")
+            stats["unresolved"] = True
+            state.phase = 'idle'
+        else:
+            objects, truncated = list_objects_page(start_after=state.sweep_cursor, max_keys=MEDIA_GC_PAGE_SIZE,
+                                                   prefix=MEDIA_GC_S3_PREFIX)
+            objects = [(key, modified.replace(tzinfo=None)) for key, modified in objects]
+            stats["garbage"] += _sweep_media_page('s3', objects, cutoff, dry_run)
+            stats["scanned"] += len(objects)
+            state.sweep_cursor = objects[-1][0] if objects else state.sweep_cursor
+            if not truncated:
+                state.phase = 'idle'
+        stats["pages"] += 1
+        if not dry_run:
+            db.session.commit()
+    if dry_run:
+        db.session.rollback()
+    else:
+        state.scanned += stats["scanned"]
+        state.deleted += stats["garbage"]
+        if state.phase == 'idle':
+            state.finished_at = datetime.utcnow()
+        db.session.commit()
+    stats["phase"] = state.phase
+    return stats
+
+
+def _delete_batch(table, key_cols, condition, batch_size):
+    keys = select(*key_cols).where(condition).limit(batch_size)
+    target = key_cols[0] if len(key_cols) == 1 else tuple_(*key_cols)
+    return db.session.execute(delete(table).where(target.in_(keys))).rowcount
+
+
+def _account_purge_stages(user_id):
+    """Ordered (stage, table, key columns, condition) steps; children are removed before their parents."""
+    user_posts = select(Post.id).where(Post.user_id == user_id)
+    return [
+        ("device_tokens", DeviceToken.__table__, [DeviceToken.id], DeviceToken.user_id == user_id),
+        ("memberships", GroupMembers.__table__, [GroupMembers.user_id, GroupMembers.group_id], GroupMembers.user_id == user_id),
+        ("aliases", GroupNameAlias.__table__, [GroupNameAlias.user_id, GroupNameAlias.group_id], GroupNameAlias.user_id == user_id),
+        ("mutes", NotificationMute.__table__, [NotificationMute.user_id, NotificationMute.group_id], NotificationMute.user_id == user_id),
+        ("notifications", PendingNotification.__table__, [PendingNotification.id], or_(
+            PendingNotification.recipient_id == user_id,
+            PendingNotification.actor_id == user_id,
+            PendingNotification.post_id.in_(user_posts),
+        )),
+        ("friends", friends, [friends.c.user_id, friends.c.friend_id], or_(friends.c.user_id == user_id, friends.c.friend_id == user_id)),
+        ("post_albums", PostAlbum.__table__, [PostAlbum.post_id, PostAlbum.album_id], PostAlbum.post_id.in_(user_posts)),
+        ("likes_received", PostLike.__table__, [PostLike.post_id, PostLike.user_id], PostLike.post_id.in_(user_posts)),
+        ("comments_received", Comment.__table__, [Comment.id], Comment.post_id.in_(user_posts)),
+        ("posts", None, None, None),
+        ("likes", PostLike.__table__, [PostLike.post_id, PostLike.user_id], PostLike.user_id == user_id),
+        ("comments", None, None, None),  # Also decrements the counts of the posts they were on.
+        ("user", None, None, None),  # Also detaches the user's jobs, including the running purge.
+    ]
+
+
+def _purge_comments_batch(user_id, batch_size):
+    """Delete a batch of the user's comments on other people's posts and decrement those posts' counts."""
+    rows = db.session.query(Comment.id, Comment.post_id).filter(Comment.user_id == user_id).limit(batch_size).all()
+    if not rows:
+        return 0
+    per_post = defaultdict(int)
+    for row in rows:
+        per_post[row.post_id] += 1
+    for post_id, removed in per_post.items():
+        Post.query.filter(Post.id == post_id).update({Post.comment_count: Post.comment_count - removed}, synchronize_session=False)
+    return Comment.query.filter(Comment.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+
+
+def _purge_posts_batch(user_id, batch_size):
+    rows = db.session.query(Post.id, Post.image_urls).filter(Post.user_id == user_id).limit(batch_size).all()
+    if not rows:
+        return 0, []
+    deleted = Post.query.filter(Post.id.in_([r.id for r in rows])).delete(synchronize_session=False)
+    media = [url for r in rows for url in _split_image_urls(r.image_urls)]
+    return deleted, media
+
+
+def _purge_user_row(user_id):
+    Job.query.filter(Job.user_id == user_id).update({Job.user_id: None}, synchronize_session=False)
+    return User.query.filter(User.id == user_id).delete(synchronize_session=False)
+
+
+@job_handler('purge_account')
+def purge_account(user_id, batch_size=None, max_batches=None):
+    """Delete everything belonging to a user in bounded batches, committing after each one.
+
+    Progress is stored in AccountDeletion, so a crashed or retried job resumes at the stage it reached. With
+    ``max_batches`` it returns after that many batches, leaving the rest for a later run.
+    """
+    batch_size = batch_size or ACCOUNT_PURGE_BATCH_SIZE
+    record = db.session.get(AccountDeletion, user_id)
+    if not record:
+        record = AccountDeletion(user_id=user_id)
+        db.session.add(record)
+    if record.status == 'done':
+        return
+    stages = _account_purge_stages(user_id)
+    names = [stage[0] for stage in stages]
+    start = names.index(record.stage) if record.stage in names else 0
+    record.status = 'running'
+    # Feeds showing the user's posts, likes or comments. Album links removed by an earlier, interrupted
+    # run are no longer found here; those feeds catch up when their cache entries expire.
+    feed_ids = _feed_group_ids_for(select(Post.id).where(or_(
+        Post.user_id == user_id,
+        Post.id.in_(select(PostLike.post_id).where(PostLike.user_id == user_id)),
+        Post.id.in_(select(Comment.post_id).where(Comment.user_id == user_id)),
+    )))
+    batches = 0
+    for name, table, key_cols, condition in stages[start:]:
+        record.stage = name
+        record.updated_at = datetime.utcnow()
+        db.session.commit()
+        while True:
+            if max_batches is not None and batches >= max_batches:
+                print(f"[purge] account user_id={user_id} paused at stage={name} after {batches} batches")
+                return
+            batches += 1
+            if name == 'posts':
+                deleted, media = _purge_posts_batch(user_id, batch_size)
+            elif name == 'comments':
+                deleted, media = _purge_comments_batch(user_id, batch_size), []
+            elif name == 'user':
+                deleted, media = _purge_user_row(user_id), []
+            else:
+                deleted, media = _delete_batch(table, key_cols, condition, batch_size), []
+            record.rows_deleted += deleted
+            record.updated_at = datetime.utcnow()
+            db.session.commit()
+            if deleted:
+                feed_cache.bump(feed_ids)
+            # Files go only after their rows are committed; anything left behind is found by the media GC.
+            if media:
+                record.media_deleted += _delete_stored_media(media)
+                db.session.commit()
+            if deleted < batch_size:
+                break
+    record.status = 'done'
+    record.finished_at = datetime.utcnow()
+    db.session.commit()
+    print(f"[purge] account user_id={user_id} rows={record.rows_deleted} media={record.media_deleted}")
 
 
 def _resolve_target_albums(primary_album: Group, actor: User, album_ids):
@@ -695,7 +1827,7 @@ def api_register():
         return jsonify({"error": "Phone number must include at least 10 digits"}), 400
     if phone_number and User.query.filter_by(phone_number=phone_number).first():
         return jsonify({"error": "Phone number already in use"}), 400
-    hashed_pw = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+    hashed_pw = password_hasher.hash(data['password'])
     user = User(
         username=data['username'],
         password=hashed_pw,
@@ -713,7 +1845,7 @@ def api_register():
 def api_login():
     data = request.get_json() or {}
     user = User.query.filter_by(username=data.get('username')).first()
-    if not user or not bcrypt.check_password_hash(user.password, data.get('password', '')):
+    if not user or user.deleted_at or not _check_password(user, data.get('password', '')):
         return jsonify({"error": "Invalid credentials"}), 401
     if not user.api_token:
         user.api_token = generate_api_token()
@@ -721,6 +1853,17 @@ def api_login():
     return jsonify({"token": user.api_token, "user": _public_user_payload(user)})
 
 
+@app.route('/api/batch', methods=['POST'])
+@token_required
+def api_batch():
+    """Run ``{"ops": [{"id", "method", "path", "body"}, ...]}`` against the API routes as the caller."""
+    try:
+        ops, parallel = parse_ops(request.get_json(silent=True))
+    except BatchError as exc:
+        return jsonify({"error": str(exc)}), exc.status
+    return jsonify({"results": run_batch(app, db, ops, g.api_user, parallel=parallel)})
+
+
 @app.route('/api/me', methods=['GET', 'PATCH', 'DELETE'])
 @token_required
 def api_me():
@@ -729,19 +1872,21 @@ def api_me():
 
     if request.method == 'DELETE':
         user = g.api_user
-        user_post_ids = [p.id for p in Post.query.filter_by(user_id=user.id).all()]
-        if user_post_ids:
-            PostAlbum.query.filter(PostAlbum.post_id.in_(user_post_ids)).delete(synchronize_session=False)
-            PostLike.query.filter(PostLike.post_id.in_(user_post_ids)).delete(synchronize_session=False)
-        PostLike.query.filter_by(user_id=user.id).delete()
-        Comment.query.filter_by(user_id=user.id).delete()
-        Post.query.filter_by(user_id=user.id).delete()
-        GroupMembers.query.filter_by(user_id=user.id).delete()
-        DeviceToken.query.filter_by(user_id=user.id).delete()
-        GroupNameAlias.query.filter_by(user_id=user.id).delete()
-        db.session.execute(text("DELETE FROM friends WHERE user_id = :uid OR friend_id = :uid"), {"uid": user.id})
-        db.session.delete(user)
+        # Revoke access now; the data itself is purged in batches by the purge_account job.
+        user.api_token = None
+        user.deleted_at = datetime.utcnow()
+        if not db.session.get(AccountDeletion, user.id):
+            db.session.add(AccountDeletion(user_id=user.id))
         db.session.commit()
+        if JOB_QUEUE_ENABLED:
+            enqueue_job('purge_account', {"user_id": user.id}, idempotency_key=f"purge_account:{user.id}", user=user)
+        else:
+            # Purge inline, but only up to ACCOUNT_PURGE_INLINE_BATCHES so a huge account can't hold the request.
+            user_id = user.id  # the row is gone once the purge finishes
+            enqueue_job('purge_account', {"user_id": user_id, "max_batches": ACCOUNT_PURGE_INLINE_BATCHES})
+            if db.session.get(AccountDeletion, user_id).status != 'done':
+                print(f"[purge] WARNING account user_id={user_id} is only partly purged and the job queue is disabled; "
+                      f"finish it with scripts/purge_accounts.py --resume")
         return jsonify({"message": "Account deleted"})
 
     data = request.get_json() or {}
@@ -777,13 +1922,53 @@ def api_change_password():
         return jsonify({"error": "Current and new password are required"}), 400
     if len(new_password) < 8:
         return jsonify({"error": "New password must be at least 8 characters"}), 400
-    if not bcrypt.check_password_hash(g.api_user.password, current_password):
+    if not password_hasher.verify(g.api_user.password, current_password):
         return jsonify({"error": "Current password is incorrect"}), 400
-    g.api_user.password = bcrypt.generate_password_hash(new_password).decode('utf-8')
+    g.api_user.password = password_hasher.hash(new_password)
     db.session.commit()
     return jsonify({"message": "Password updated"})
 
 
+@app.route('/api/contacts/match', methods=['POST'])
+@token_required
+def api_match_contacts():
+    """Find users among an address book: ``{"phone_numbers": [...]}`` and/or ``{"phone_hashes": [...]}``.
+
+    Numbers are normalized like stored ones; hashes are hex sha256 of the normalized number. Each match echoes
+    the contact value the client sent so it can be mapped back to the address-book entry.
+    """
+    data = request.get_json(silent=True) or {}
+    numbers, hashes = data.get('phone_numbers') or [], data.get('phone_hashes') or []
+    if not isinstance(numbers, list) or not isinstance(hashes, list):
+        return jsonify({"error": "phone_numbers and phone_hashes must be lists"}), 400
+    if len(numbers) + len(hashes) > CONTACTS_MATCH_MAX:
+        return jsonify({"error": f"At most {CONTACTS_MATCH_MAX} contacts per request"}), 413
+
+    contacts_by_hash = defaultdict(list)
+    for raw in numbers:
+        normalized = _normalize_phone_number(raw)
+        if normalized:
+            contacts_by_hash[_hash_phone_number(normalized)].append(raw)
+    for raw in hashes:
+        if isinstance(raw, str) and len(raw) == 64:
+            contacts_by_hash[raw.lower()].append(raw)
+
+    matches = []
+    wanted = list(contacts_by_hash)
+    for start in range(0, len(wanted), CONTACTS_MATCH_CHUNK):
+        rows = db.session.execute(
+            select(User.id, User.username, User.first_name, User.last_name, User.phone_hash).where(
+                User.phone_hash.in_(wanted[start:start + CONTACTS_MATCH_CHUNK]),
+                User.deleted_at.is_(None),
+                User.id != g.api_user.id,
+            )
+        ).all()
+        for row in rows:
+            user = {"id": row.id, "username": row.username, "first_name": row.first_name, "last_name": row.last_name}
+            matches.extend({"contact": contact, "user": user} for contact in contacts_by_hash[row.phone_hash])
+    return jsonify({"matches": matches, "checked": len(wanted)})
+
+
 @app.route('/api/push/register', methods=['POST'])
 @token_required
 def api_register_push():
@@ -802,12 +1987,24 @@ def api_register_push():
         primary = existing_for_token[0]
         primary.user_id = g.api_user.id
         primary.platform = platform
+        primary.failure_count = 0
+        primary.disabled_at = None
         for duplicate in existing_for_token[1:]:
             db.session.delete(duplicate)
     db.session.commit()
     return jsonify({"message": "Registered push token"})
 
 
+@app.route('/api/jobs/<int:job_id>', methods=['GET'])
+@token_required
+@use_primary
+def api_job_status(job_id):
+    job = Job.query.get_or_404(job_id)
+    if job.user_id != g.api_user.id:
+        return jsonify({"error": "Not found"}), 404
+    return jsonify({"job": _job_payload(job)})
+
+
 @app.route('/api/groups', methods=['GET', 'POST'])
 @token_required
 def api_groups():
@@ -838,19 +2035,37 @@ def api_group_posts(group_id):
     if request.method == 'POST':
         return jsonify({"error": "Posts must be created in albums. Select one or more albums first."}), 400
 
-    group_albums = Group.query.filter_by(kind='album', parent_group_id=group.id).all()
-    album_ids = [a.id for a in group_albums]
-    if album_ids:
-        related_post_ids = db.session.query(PostAlbum.post_id).filter(PostAlbum.album_id.in_(album_ids))
-        posts = Post.query.filter(or_(Post.id.in_(related_post_ids), Post.group_id == group.id)).order_by(Post.id.desc()).all()
-    else:
-        posts = Post.query.filter_by(group_id=group.id).order_by(Post.id.desc()).all()
+    try:
+        fields = _requested_post_fields()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+    # The viewer's alias for the group is the only per-viewer part of this response.
     viewer_group_name = _group_name_for_user(group, g.api_user)
-    return jsonify({
-        "group": {"id": group.id, "name": viewer_group_name},
-        "albums": [{"id": a.id, "name": a.name, "owner_id": a.owner_id} for a in group_albums],
-        "posts": [_serialize_post(p, g.api_user, fallback_group_name=viewer_group_name) for p in posts]
-    })
+
+    def head():
+        group_albums = Group.query.filter_by(kind='album', parent_group_id=group.id).all()
+        return {
+            "group": {"id": group.id, "name": viewer_group_name},
+            "albums": [{"id": a.id, "name": a.name, "owner_id": a.owner_id} for a in group_albums],
+        }
+
+    if request.args.get('stream') == 'true':
+        data = head()
+        stmt = _feed_posts_select(group.id, [a["id"] for a in data["albums"]])
+        return _streamed_feed_response(data, stmt, viewer_group_name, fields)
+
+    def build():
+        data = head()
+        posts = db.session.scalars(_feed_posts_select(group.id, [a["id"] for a in data["albums"]])).all()
+        previews = _latest_comments([p.id for p in posts]) if fields is None or "comments" in fields else None
+        return {
+            **data,
+            "posts": [
+                _serialize_post(p, g.api_user, fallback_group_name=viewer_group_name, fields=fields, comment_previews=previews)
+                for p in posts
+            ]
+        }
+    return _cached_feed_response(group.id, viewer_group_name, build)
 
 
 @app.route('/api/groups/<int:group_id>/posts/base64', methods=['POST'])
@@ -883,9 +2098,27 @@ def api_update_group(group_id):
     else:
         alias.name = new_name
     db.session.commit()
+    feed_cache.bump([group.id, *db.session.scalars(select(Group.id).where(Group.kind == 'album', Group.parent_group_id == group.id))])
     return jsonify({"group": {"id": group.id, "name": _group_name_for_user(group, g.api_user)}})
 
 
+@app.route('/api/groups/<int:group_id>/mute', methods=['POST', 'DELETE'])
+@token_required
+def api_mute_group(group_id):
+    # Works for both groups and albums; muting a group silences its albums too.
+    group = Group.query.get_or_404(group_id)
+    if g.api_user not in group.members:
+        return jsonify({"error": "Forbidden"}), 403
+    existing = NotificationMute.query.filter_by(group_id=group.id, user_id=g.api_user.id).first()
+    if request.method == 'POST':
+        if not existing:
+            db.session.add(NotificationMute(group_id=group.id, user_id=g.api_user.id))
+    elif existing:
+        db.session.delete(existing)
+    db.session.commit()
+    return jsonify({"group_id": group.id, "muted": request.method == 'POST'})
+
+
 @app.route('/api/groups/<int:group_id>/members', methods=['GET', 'POST'])
 @token_required
 def api_add_group_member_api(group_id):
@@ -926,6 +2159,73 @@ def api_add_group_member_api(group_id):
     return jsonify({"message": "User added", "user": {"id": user.id, "username": user.username, "phone_number": user.phone_number}})
 
 
+def _bulk_add_members(group, data, album_ids=()):
+    """Add ``{"usernames": [...], "phone_numbers": [...]}`` to ``group`` (and to ``album_ids`` for new members).
+
+    All entries are resolved in one query and the membership rows go in with one insert-or-ignore. Returns the
+    response body and status; each entry reports ``added``, ``already_member``, ``not_found`` or ``invalid``.
+    """
+    usernames, phone_numbers = data.get('usernames') or [], data.get('phone_numbers') or []
+    if not isinstance(usernames, list) or not isinstance(phone_numbers, list):
+        return {"error": "usernames and phone_numbers must be lists"}, 400
+    if not usernames and not phone_numbers:
+        return {"error": "Usernames or phone numbers required"}, 400
+    if len(usernames) + len(phone_numbers) > MEMBERS_BULK_MAX:
+        return {"error": f"At most {MEMBERS_BULK_MAX} entries per request"}, 413
+
+    entries = [('username', raw, raw.strip() if isinstance(raw, str) else None) for raw in usernames]
+    entries += [('phone_number', raw, _normalize_phone_number(raw)) for raw in phone_numbers]
+    names = {key for kind, _, key in entries if kind == 'username' and key}
+    phones = {key for kind, _, key in entries if kind == 'phone_number' and key}
+    by_key = {}
+    if names or phones:
+        rows = db.session.execute(
+            select(User.id, User.username, User.phone_number).where(
+                or_(User.username.in_(names), User.phone_number.in_(phones)),
+                User.deleted_at.is_(None),
+            )
+        ).all()
+        for row in rows:
+            by_key[('username', row.username)] = row
+            if row.phone_number:
+                by_key.setdefault(('phone_number', row.phone_number), row)
+
+    existing = {member.id for member in group.members}
+    new_ids = {row.id for row in by_key.values()} - existing
+    _insert_ignore(GroupMembers.__table__, [
+        {"group_id": target_id, "user_id": user_id}
+        for target_id in (group.id, *album_ids) for user_id in new_ids
+    ])
+    db.session.commit()
+
+    results = []
+    for kind, raw, key in entries:
+        row = by_key.get((kind, key)) if key else None
+        result = {kind: raw}
+        if not key:
+            result["status"] = "invalid"
+        elif row is None:
+            result["status"] = "not_found"
+        else:
+            result["status"] = "added" if row.id in new_ids else "already_member"
+            result["user"] = {"id": row.id, "username": row.username, "phone_number": row.phone_number}
+        results.append(result)
+    return {"results": results, "added": len(new_ids)}, 200
+
+
+@app.route('/api/groups/<int:group_id>/members/bulk', methods=['POST'])
+@token_required
+def api_bulk_add_group_members(group_id):
+    group = Group.query.get_or_404(group_id)
+    if group.kind == 'album':
+        return jsonify({"error": "Use album members endpoint"}), 400
+    if g.api_user not in group.members:
+        return jsonify({"error": "Forbidden"}), 403
+    album_ids = db.session.scalars(select(Group.id).where(Group.kind == 'album', Group.parent_group_id == group.id)).all()
+    body, status = _bulk_add_members(group, request.get_json(silent=True) or {}, album_ids)
+    return jsonify(body), status
+
+
 @app.route('/api/groups/<int:group_id>/albums', methods=['GET', 'POST'])
 @token_required
 def api_group_albums(group_id):
@@ -947,6 +2247,7 @@ def api_group_albums(group_id):
             album.members.append(member)
     db.session.add(album)
     db.session.commit()
+    feed_cache.bump([group.id])
     return jsonify({"id": album.id, "name": album.name, "owner_id": album.owner_id, "parent_group_id": album.parent_group_id})
 
 
@@ -975,6 +2276,7 @@ def api_albums():
             album.members.append(g.api_user)
         db.session.add(album)
         db.session.commit()
+        feed_cache.bump([album.parent_group_id])
         return jsonify({"id": album.id, "name": album.name, "owner_id": album.owner_id, "parent_group_id": album.parent_group_id})
 
     albums = [{"id": grp.id, "name": grp.name, "owner_id": grp.owner_id, "parent_group_id": grp.parent_group_id} for grp in g.api_user.groups if grp.kind == 'album']
@@ -1010,15 +2312,31 @@ def api_album_posts(album_id):
         db.session.flush()
         _attach_post_to_albums(post, target_albums)
         db.session.commit()
-        notify_album_members_post(target_albums, g.api_user, post)
-        return jsonify({"message": "Created", "post_id": post.id})
+        feed_cache.bump(_feed_group_ids(post))
+        job = notify_album_members_post(target_albums, g.api_user, post)
+        return jsonify({"message": "Created", "post_id": post.id, "notify_job_id": job.id if job else None})
 
-    linked_post_ids = db.session.query(PostAlbum.post_id).filter_by(album_id=album.id)
-    posts = Post.query.filter(or_(Post.id.in_(linked_post_ids), Post.group_id == album.id)).order_by(Post.id.desc()).all()
-    return jsonify({
-        "album": {"id": album.id, "name": album.name, "owner_id": album.owner_id, "parent_group_id": album.parent_group_id},
-        "posts": [_serialize_post(p, g.api_user, fallback_group_name=album.name) for p in posts]
-    })
+    try:
+        fields = _requested_post_fields()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    album_head = {"album": {"id": album.id, "name": album.name, "owner_id": album.owner_id, "parent_group_id": album.parent_group_id}}
+    if request.args.get('stream') == 'true':
+        return _streamed_feed_response(album_head, _feed_posts_select(album.id, [album.id]), album.name, fields)
+
+    def build():
+        posts = db.session.scalars(_feed_posts_select(album.id, [album.id])).all()
+        previews = _latest_comments([p.id for p in posts]) if fields is None or "comments" in fields else None
+        return {
+            **album_head,
+            "posts": [
+                _serialize_post(p, g.api_user, fallback_group_name=album.name, fields=fields, comment_previews=previews)
+                for p in posts
+            ]
+        }
+    # Posts whose primary group is a group (not an album) show the viewer's alias for it as group_name.
+    return _cached_feed_response(album.id, _viewer_aliases(g.api_user), build)
 
 
 @app.route('/api/albums/<int:album_id>/posts/base64', methods=['POST'])
@@ -1053,8 +2371,9 @@ def api_album_posts_base64(album_id):
     db.session.flush()
     _attach_post_to_albums(post, target_albums)
     db.session.commit()
-    notify_album_members_post(target_albums, g.api_user, post)
-    return jsonify({"message": "Created", "post_id": post.id})
+    feed_cache.bump(_feed_group_ids(post))
+    job = notify_album_members_post(target_albums, g.api_user, post)
+    return jsonify({"message": "Created", "post_id": post.id, "notify_job_id": job.id if job else None})
 
 
 @app.route('/api/albums/<int:album_id>/members', methods=['GET', 'POST'])
@@ -1093,6 +2412,18 @@ def api_album_members(album_id):
     return jsonify({"message": "User added", "user": {"id": user.id, "username": user.username, "phone_number": user.phone_number}})
 
 
+@app.route('/api/albums/<int:album_id>/members/bulk', methods=['POST'])
+@token_required
+def api_bulk_add_album_members(album_id):
+    album = Group.query.get_or_404(album_id)
+    if album.kind != 'album':
+        return jsonify({"error": "Not an album"}), 400
+    if g.api_user not in album.members:
+        return jsonify({"error": "Forbidden"}), 403
+    body, status = _bulk_add_members(album, request.get_json(silent=True) or {})
+    return jsonify(body), status
+
+
 @app.route('/api/albums/<int:album_id>/update', methods=['POST'])
 @token_required
 def api_update_album(album_id):
@@ -1107,6 +2438,8 @@ def api_update_album(album_id):
         return jsonify({"error": "Name required"}), 400
     album.name = new_name
     db.session.commit()
+    # Posts elsewhere that list this album keep the old name until their entries expire.
+    feed_cache.bump([album.id, album.parent_group_id])
     return jsonify({"album": {"id": album.id, "name": album.name, "owner_id": album.owner_id}})
 
 
@@ -1120,6 +2453,7 @@ def api_like_post(post_id):
     db.session.add(PostLike(post_id=post.id, user_id=g.api_user.id))
     post.likes += 1
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     notify_post_owner_like(g.api_user, post)
     return jsonify({"likes": post.likes, "already_liked": False})
 
@@ -1133,20 +2467,39 @@ def api_comment_post(post_id):
     post = Post.query.get_or_404(post_id)
     comment = Comment(content=content, user_id=g.api_user.id, post=post)
     db.session.add(comment)
+    post.comment_count = Post.comment_count + 1
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     post_albums = _albums_for_post(post)
     if post_albums:
-        seen_group_ids = set()
-        for album in post_albums:
-            if album.id in seen_group_ids:
-                continue
-            notify_group_members_comment(album, g.api_user, post, comment)
-            seen_group_ids.add(album.id)
+        notify_group_members_comment(post_albums, g.api_user, post, comment)
     else:
         group = Group.query.get(post.group_id)
         if group:
-            notify_group_members_comment(group, g.api_user, post, comment)
-    return jsonify({"message": "Comment added.", "comment": {"id": comment.id, "content": comment.content, "user": g.api_user.username, "user_id": g.api_user.id, "created_at": comment.created_at.isoformat() if comment.created_at else None}})
+            notify_group_members_comment([group], g.api_user, post, comment)
+    return jsonify({"message": "Comment added.", "comment_count": post.comment_count, "comment": {"id": comment.id, "content": comment.content, "user": g.api_user.username, "user_id": g.api_user.id, "created_at": comment.created_at.isoformat() if comment.created_at else None}})
+
+
+@app.route('/api/posts/<int:post_id>/comments', methods=['GET'])
+@token_required
+def api_post_comments(post_id):
+    """Newest first, keyset-paginated on (post_id, id): pass the returned ``next_cursor`` as ``before_id``."""
+    post = Post.query.get_or_404(post_id)
+    if not _can_view_post(post, g.api_user):
+        return jsonify({"error": "Forbidden"}), 403
+    limit = min(max(request.args.get('limit', COMMENT_PAGE_SIZE, type=int), 1), 200)
+    before_id = request.args.get('before_id', type=int)
+    query = Comment.query.options(joinedload(Comment.user)).filter(Comment.post_id == post.id)
+    if before_id:
+        query = query.filter(Comment.id < before_id)
+    rows = query.order_by(Comment.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    return jsonify({
+        "post_id": post.id,
+        "comment_count": post.comment_count,
+        "comments": [_serialize_comment(c) for c in page],
+        "next_cursor": page[-1].id if len(rows) > limit else None,
+    })
 
 
 @app.route('/api/posts/<int:post_id>', methods=['DELETE'])
@@ -1155,10 +2508,7 @@ def api_delete_post(post_id):
     post = Post.query.get_or_404(post_id)
     if post.user_id != g.api_user.id:
         return jsonify({"error": "Forbidden"}), 403
-    PostAlbum.query.filter_by(post_id=post.id).delete()
-    PostLike.query.filter_by(post_id=post.id).delete()
-    db.session.delete(post)
-    db.session.commit()
+    _delete_post(post)
     return jsonify({"message": "Post deleted"})
 
 
@@ -1168,8 +2518,12 @@ def api_delete_comment(comment_id):
     comment = Comment.query.get_or_404(comment_id)
     if comment.user_id != g.api_user.id:
         return jsonify({"error": "Forbidden"}), 403
+    post = comment.post
+    post.comment_count = Post.comment_count - 1
+    _cancel_pending_notifications('comment', post.id, comment.user_id, comment_id=comment.id)
     db.session.delete(comment)
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     return jsonify({"message": "Comment deleted", "comment_id": comment_id, "post_id": comment.post_id})
 
 
@@ -1189,6 +2543,7 @@ def api_add_post_media(post_id):
     image_urls = store_files(files)
     post.image_urls = ','.join(existing + image_urls)
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     return jsonify({"message": "Attached", "image_urls": _resolve_image_urls(post.image_urls)})
 
 
@@ -1211,6 +2566,7 @@ def api_add_post_media_base64(post_id):
         return jsonify({"error": "No valid files"}), 400
     post.image_urls = ','.join(existing + image_urls)
     db.session.commit()
+    feed_cache.bump(_feed_group_ids(post))
     return jsonify({"message": "Attached", "image_urls": _resolve_image_urls(post.image_urls)})
 
 if __name__ == '__main__':
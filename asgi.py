@@ -0,0 +1,16 @@
+# ASGI entry point, served alongside the WSGI app:app, e.g. `uvicorn asgi:app --workers 4`.
+# Same routes and JSON as under gunicorn; see extensions/asgi.py for how requests reach Flask.
+from app import app as flask_app, db
+from extensions.asgi import WSGIAdapter
+from extensions.http_client import http_session
+from extensions.metrics import mark_process_dead
+
+
+def _shutdown():
+    http_session.close()
+    with flask_app.app_context():
+        db.engine.dispose()
+
+
+# uvicorn has no equivalent of gunicorn's child_exit hook, so each worker removes its own gauge files.
+app = WSGIAdapter(flask_app, on_shutdown=[_shutdown, mark_process_dead])
@@ -0,0 +1,161 @@
+"""Concurrent connections per worker: gunicorn sync worker (app:app) versus the ASGI entry point (asgi:app).
+
+Each mode runs one worker process against the same SQLite file, with Expo and S3 replaced by
+benchmarks.fakes with added latency. Comments push inline (JOB_QUEUE_ENABLED=false) and uploads go to
+the fake S3, so both spend most of their time waiting on the network. Client threads keep one
+connection each and loop over feed reads, comments and uploads.
+
+Usage:
+    python -m benchmarks.asgi_concurrency --connections 32 --duration 10 --latency-ms 100
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import requests
+
+from benchmarks.common import summarize, write_results, git_commit
+from benchmarks.fakes import app_environment, start_fakes
+
+MODES = {
+    "wsgi": lambda port: ["gunicorn", "app:app", "--workers", "1", "--bind", f"127.0.0.1:{port}"],
+    "asgi": lambda port: [sys.executable, "-m", "uvicorn", "asgi:app", "--workers", "1", "--host", "127.0.0.1",
+                          "--port", str(port), "--log-level", "warning", "--no-access-log"],
+}
+USERS = 20
+ACTIONS = (("feed", 0.6), ("comment", 0.3), ("upload", 0.1))
+
+
+def _prepare(path):
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    from app import app, db, User, Group, Post, PostAlbum, DeviceToken
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"conn{i}", password="x", first_name="C", last_name="Bench", api_token=f"conn{i}-token") for i in range(USERS)]
+        album = Group(name="Bench", kind="album")
+        album.members.extend(users)
+        db.session.add(album)
+        db.session.flush()
+        db.session.add_all([DeviceToken(user_id=u.id, token=f"ExponentPushToken[conn{u.id}]") for u in users])
+        post_ids = []
+        for i in range(30):
+            post = Post(content=f"post {i}", user_id=users[i % USERS].id, group_id=album.id)
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+            post_ids.append(post.id)
+        db.session.commit()
+        return album.id, post_ids
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(mode, env):
+    port = _free_port()
+    proc = subprocess.Popen(MODES[mode](port), env=env, stdout=subprocess.DEVNULL, stderr=subprocess.STDOUT)
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/", timeout=1)
+            return proc, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+def run_mode(mode, env, album_id, post_ids, connections, duration, timeout):
+    proc, base_url = _start_server(mode, env)
+    latencies = {name: [] for name, _ in ACTIONS}
+    errors = {name: 0 for name, _ in ACTIONS}
+    deadline = time.perf_counter() + duration
+
+    def client(index):
+        rng = random.Random(index)
+        session = requests.Session()
+        session.headers["Authorization"] = f"Bearer conn{index % USERS}-token"
+        names, weights = zip(*ACTIONS)
+        while time.perf_counter() < deadline:
+            action = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                if action == "feed":
+                    rv = session.get(f"{base_url}/api/albums/{album_id}/posts", params={"n": rng.random()}, timeout=timeout)
+                elif action == "comment":
+                    rv = session.post(f"{base_url}/api/posts/{rng.choice(post_ids)}/comment", json={"comment": "bench"}, timeout=timeout)
+                else:
+                    files = {"file": ("bench.jpg", b"\xff\xd8" + os.urandom(16 * 1024), "image/jpeg")}
+                    rv = session.post(f"{base_url}/api/albums/{album_id}/posts", data={"content": "upload", "album_ids": str(album_id)}, files=files, timeout=timeout)
+                ok = rv.status_code < 400
+            except requests.RequestException:
+                ok = False
+            if ok:
+                latencies[action].append((time.perf_counter() - start) * 1000)
+            else:
+                errors[action] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(connections)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    all_ms = [ms for values in latencies.values() for ms in values]
+    return {
+        "overall": summarize(all_ms, per_second=round(len(all_ms) / duration, 1), errors=sum(errors.values())),
+        **{name: summarize(values, errors=errors[name]) for name, values in latencies.items()},
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare concurrent connections per worker for WSGI and ASGI serving.")
+    parser.add_argument("--connections", type=int, default=32)
+    parser.add_argument("--duration", type=int, default=10, help="Seconds of load per mode.")
+    parser.add_argument("--latency-ms", type=int, default=100, help="Latency added by the fake Expo/S3 on every write call.")
+    parser.add_argument("--timeout", type=float, default=30, help="Client timeout per request; slower requests count as errors.")
+    parser.add_argument("--modes", default="wsgi,asgi")
+    parser.add_argument("--dir", default="benchmarks/results", help="Where the scratch database is created.")
+    parser.add_argument("--output", help="Results path (default benchmarks/results/asgi-concurrency-<commit>.json)")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    path = os.path.abspath(os.path.join(args.dir, "asgi-concurrency.db"))
+    album_id, post_ids = _prepare(path)
+    fakes = start_fakes(latency_ms=args.latency_ms)
+    env = {
+        **os.environ, **app_environment(fakes),
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{path}",
+        "JOB_QUEUE_ENABLED": "false",
+        "REQUEST_LOG": "false",
+        "FEED_CACHE_ENABLED": "false",
+    }
+    results = {}
+    for mode in args.modes.split(","):
+        results[mode] = row = run_mode(mode, env, album_id, post_ids, args.connections, args.duration, args.timeout)
+        overall = row["overall"]
+        print(f"[bench] {mode:<5} req/s={overall['per_second']:<7} p50_ms={overall['p50_ms']} p95_ms={overall['p95_ms']} "
+              f"errors={overall['errors']} feed_p95_ms={row['feed']['p95_ms']} comment_p95_ms={row['comment']['p95_ms']} "
+              f"upload_p95_ms={row['upload']['p95_ms']}")
+    fakes.shutdown()
+    output = args.output or os.path.join("benchmarks", "results", f"asgi-concurrency-{git_commit() or 'local'}.json")
+    write_results(output, "asgi_concurrency", results, connections=args.connections, duration_seconds=args.duration,
+                  latency_ms=args.latency_ms)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,51 @@
+import json
+import os
+import subprocess
+from datetime import datetime
+
+# Benchmarks must never talk to Expo: queue pushes instead of sending them inline.
+os.environ.setdefault('JOB_QUEUE_ENABLED', 'true')
+os.environ.setdefault('REQUEST_LOG', 'false')
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies_ms, **extra):
+    return {
+        "n": len(latencies_ms),
+        "mean_ms": round(sum(latencies_ms) / len(latencies_ms), 3) if latencies_ms else None,
+        "p50_ms": round(percentile(latencies_ms, 50), 3) if latencies_ms else None,
+        "p95_ms": round(percentile(latencies_ms, 95), 3) if latencies_ms else None,
+        "p99_ms": round(percentile(latencies_ms, 99), 3) if latencies_ms else None,
+        "max_ms": round(max(latencies_ms), 3) if latencies_ms else None,
+        **extra,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path, name, results, **meta):
+    payload = {
+        "benchmark": name,
+        "commit": git_commit(),
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        **meta,
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(payload, f, indent=2)
+    print(f"[bench] wrote {path}")
+    return payload
@@ -0,0 +1,54 @@
+"""Compare two benchmark result files and fail on regressions.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/endpoints-abc123-sqlite.json benchmarks/results/endpoints-def456-sqlite.json
+"""
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "queries_mean")
+
+
+def compare(baseline, candidate, threshold):
+    regressions = []
+    print(f"{'case':32} {'metric':14} {'baseline':>12} {'candidate':>12} {'change':>9}")
+    for name, base in sorted(baseline["results"].items()):
+        cand = candidate["results"].get(name)
+        if cand is None:
+            print(f"{name:32} missing from candidate")
+            continue
+        for metric in METRICS:
+            before, after = base.get(metric), cand.get(metric)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before if before else 0.0
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions.append((name, metric, change))
+            print(f"{name:32} {metric:14} {before:12.2f} {after:12.2f} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare benchmark results between commits.")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown (0.2 = 20%%).")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"[bench] {baseline.get('commit')} -> {candidate.get('commit')} ({candidate.get('benchmark')})")
+    regressions = compare(baseline, candidate, args.threshold)
+    if regressions:
+        print(f"[bench] {len(regressions)} regression(s) above {args.threshold:.0%}")
+        return 1
+    print("[bench] no regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
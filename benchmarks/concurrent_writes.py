@@ -0,0 +1,132 @@
+"""Concurrent write throughput on SQLite with the stock settings versus the tuned engine profile.
+
+Each profile gets a fresh database file and the same number of worker processes. The workers mimic
+gunicorn workers: they create posts, like them and read the album feed for a fixed time.
+
+Usage:
+    python -m benchmarks.concurrent_writes --workers 8 --duration 10
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import time
+
+from benchmarks.common import summarize, write_results, git_commit
+
+# "default" reproduces the pre-tuning behaviour: rollback journal, full fsync, driver cache and
+# pysqlite's built-in 5 s lock wait.
+PROFILES = {
+    "default": {"SQLITE_JOURNAL_MODE": "DELETE", "SQLITE_SYNCHRONOUS": "FULL", "SQLITE_CACHE_SIZE_KB": "2000", "SQLITE_MMAP_SIZE": "0", "SQLITE_BUSY_TIMEOUT_MS": "5000"},
+    "tuned": {},
+}
+USERS = 50
+
+
+def _prepare(path, env):
+    os.environ.update(env)
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    from app import app, db, User, Group
+    with app.app_context():
+        db.create_all()
+        users = [User(username=f"writer{i}", password="x", first_name="W", last_name="Bench") for i in range(USERS)]
+        album = Group(name="Bench", kind="album")
+        album.members.extend(users)
+        db.session.add(album)
+        db.session.commit()
+        return album.id, [u.id for u in users]
+
+
+def _worker(path, env, album_id, user_ids, start_at, duration, seed_value, out):
+    os.environ.update(env)
+    os.environ.setdefault("SLOW_QUERY_MS", "5000")
+    os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    from sqlalchemy.exc import IntegrityError, OperationalError
+    from app import app, db, Post, PostAlbum, PostLike
+
+    rng = random.Random(seed_value)
+    writes, reads, errors = [], [], 0
+    post_ids = []
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = start_at + duration
+    with app.app_context():
+        while time.time() < deadline:
+            op = rng.random()
+            start = time.perf_counter()
+            try:
+                if op < 0.4 or not post_ids:
+                    post = Post(content="bench", user_id=rng.choice(user_ids), group_id=album_id)
+                    db.session.add(post)
+                    db.session.flush()
+                    db.session.add(PostAlbum(post_id=post.id, album_id=album_id))
+                    db.session.commit()
+                    post_ids.append(post.id)
+                    writes.append((time.perf_counter() - start) * 1000)
+                elif op < 0.7:
+                    db.session.merge(PostLike(post_id=rng.choice(post_ids), user_id=rng.choice(user_ids)))
+                    db.session.commit()
+                    writes.append((time.perf_counter() - start) * 1000)
+                else:
+                    Post.query.filter_by(group_id=album_id).order_by(Post.id.desc()).limit(20).all()
+                    db.session.rollback()
+                    reads.append((time.perf_counter() - start) * 1000)
+            except IntegrityError:
+                db.session.rollback()  # Another worker liked the same post first.
+            except OperationalError:
+                db.session.rollback()
+                errors += 1
+    out.put({"writes": writes, "reads": reads, "errors": errors})
+
+
+def run_profile(name, workers, duration, directory):
+    path = os.path.join(directory, f"concurrent-writes-{name}.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    env = PROFILES[name]
+    ctx = multiprocessing.get_context("spawn")
+    setup = ctx.Pool(1)
+    album_id, user_ids = setup.apply(_prepare, (path, env))
+    setup.close()
+
+    out = ctx.Queue()
+    start_at = time.time() + 5  # Every worker imports the app first, then all start together.
+    procs = [ctx.Process(target=_worker, args=(path, env, album_id, user_ids, start_at, duration, i, out)) for i in range(workers)]
+    for proc in procs:
+        proc.start()
+    parts = [out.get() for _ in procs]
+    for proc in procs:
+        proc.join()
+
+    writes = [ms for part in parts for ms in part["writes"]]
+    reads = [ms for part in parts for ms in part["reads"]]
+    errors = sum(part["errors"] for part in parts)
+    return {
+        "writes": summarize(writes, per_second=round(len(writes) / duration, 1)),
+        "reads": summarize(reads, per_second=round(len(reads) / duration, 1)),
+        "lock_errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare concurrent SQLite write throughput across engine profiles.")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--duration", type=int, default=10, help="Seconds of load per profile.")
+    parser.add_argument("--dir", default="benchmarks/results", help="Where the scratch databases are created.")
+    parser.add_argument("--output", help="Results path (default benchmarks/results/concurrent-writes-<commit>.json)")
+    args = parser.parse_args()
+
+    os.makedirs(args.dir, exist_ok=True)
+    results = {}
+    for name in PROFILES:
+        results[name] = run_profile(name, args.workers, args.duration, args.dir)
+        row = results[name]
+        print(f"[bench] {name:<8} writes/s={row['writes']['per_second']:<8} write_p95_ms={row['writes']['p95_ms']} "
+              f"reads/s={row['reads']['per_second']:<8} read_p95_ms={row['reads']['p95_ms']} lock_errors={row['lock_errors']}")
+    output = args.output or os.path.join("benchmarks", "results", f"concurrent-writes-{git_commit() or 'local'}.json")
+    write_results(output, "concurrent_writes", results, workers=args.workers, duration_seconds=args.duration)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
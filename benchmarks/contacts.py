@@ -0,0 +1,87 @@
+"""Throughput of POST /api/contacts/match for whole address books.
+
+Each request sends --contacts numbers. --match-rate of them belong to seeded users; the rest are
+unknown. Raw numbers are formatted the way phones store them, and hashed requests send sha256
+hex digests.
+
+Usage (after ``python -m benchmarks.seed``):
+    SQLALCHEMY_DATABASE_URI=sqlite:///bench.db python -m benchmarks.contacts --contacts 5000 --requests 20
+"""
+import argparse
+import hashlib
+import random
+import time
+
+from benchmarks.common import summarize, write_results, git_commit
+from app import app, db, User
+from benchmarks.seed import bench_token
+from extensions.query_stats import collect_queries
+
+
+def _format(number, rng):
+    return rng.choice([
+        number,
+        f"({number[:3]}) {number[3:6]}-{number[6:]}",
+        f"{number[:3]}.{number[3:6]}.{number[6:]}",
+    ])
+
+
+def address_book(known, size, match_rate, rng):
+    matched = rng.sample(known, min(len(known), int(size * match_rate)))
+    unknown = [f"9{rng.randrange(10**9):09d}" for _ in range(size - len(matched))]
+    book = matched + unknown
+    rng.shuffle(book)
+    return book
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark bulk contact matching.")
+    parser.add_argument("--contacts", type=int, default=5000, help="Address-book size per request.")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per variant.")
+    parser.add_argument("--match-rate", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Results path (default benchmarks/results/contacts-<commit>-<dialect>.json)")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    with app.app_context():
+        known = [row.phone_number for row in db.session.query(User.phone_number).filter(User.phone_number.is_not(None)).limit(50000)]
+        if not known:
+            raise SystemExit("No users with phone numbers; run benchmarks.seed first.")
+        viewer = db.session.query(User.id).order_by(User.id).first().id
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {bench_token(viewer)}"}
+        for variant in ("raw", "hashed"):
+            latencies, queries, matches = [], [], 0
+            for _ in range(args.requests):
+                book = address_book(known, args.contacts, args.match_rate, rng)
+                if variant == "raw":
+                    body = {"phone_numbers": [_format(n, rng) for n in book]}
+                else:
+                    body = {"phone_hashes": [hashlib.sha256(n.encode()).hexdigest() for n in book]}
+                with collect_queries() as collector:
+                    started = time.perf_counter()
+                    rv = client.post("/api/contacts/match", json=body, headers=headers)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                assert rv.status_code == 200, rv.get_data(as_text=True)
+                queries.append(collector.count)
+                matches += len(rv.get_json()["matches"])
+            total_s = sum(latencies) / 1000
+            results[variant] = summarize(
+                latencies,
+                contacts_per_second=round(args.contacts * len(latencies) / total_s),
+                queries_per_request=max(queries),
+                matches_per_request=round(matches / len(latencies), 1),
+            )
+            row = results[variant]
+            print(f"[bench] {variant:<6} p50_ms={row['p50_ms']} p95_ms={row['p95_ms']} contacts/s={row['contacts_per_second']} "
+                  f"queries={row['queries_per_request']} matches={row['matches_per_request']}")
+        dialect = db.engine.dialect.name
+    output = args.output or f"benchmarks/results/contacts-{git_commit() or 'local'}-{dialect}.json"
+    write_results(output, "contacts", results, contacts=args.contacts, match_rate=args.match_rate, dialect=dialect)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,110 @@
+"""Measure latency percentiles and query counts for the hot API endpoints.
+
+Usage (after ``python -m benchmarks.seed``):
+    SQLALCHEMY_DATABASE_URI=sqlite:///bench.db python -m benchmarks.endpoints --requests 100
+"""
+import argparse
+import random
+import time
+
+from benchmarks.common import summarize, write_results, git_commit
+from app import app, db, Group, GroupMembers, PostAlbum
+from benchmarks.seed import bench_token
+from extensions.query_stats import collect_queries
+
+
+def _sample_memberships(kind, limit, rng):
+    rows = (
+        db.session.query(GroupMembers.group_id, GroupMembers.user_id)
+        .join(Group, Group.id == GroupMembers.group_id)
+        .filter(Group.kind == kind)
+        .order_by(GroupMembers.group_id, GroupMembers.user_id)
+        .limit(limit * 20)
+        .all()
+    )
+    return rng.sample(rows, min(limit, len(rows)))
+
+
+def build_cases(rng, count):
+    groups = _sample_memberships('group', count, rng)
+    albums = _sample_memberships('album', count, rng)
+    album_posts = {}
+    for album_id, _ in albums:
+        if album_id not in album_posts:
+            row = db.session.query(PostAlbum.post_id).filter_by(album_id=album_id).first()
+            album_posts[album_id] = row.post_id if row else None
+    albums_with_posts = [(a, u) for a, u in albums if album_posts.get(a)]
+
+    def auth(uid):
+        return {"Authorization": f"Bearer {bench_token(uid)}"}
+
+    return {
+        "api_group_posts": [("GET", f"/api/groups/{gid}/posts", auth(uid), None, None) for gid, uid in groups],
+        "api_album_posts": [("GET", f"/api/albums/{aid}/posts", auth(uid), None, None) for aid, uid in albums],
+        "api_groups": [("GET", "/api/groups", auth(uid), None, None) for _, uid in groups],
+        "api_like_post": [("POST", f"/api/posts/{album_posts[aid]}/like", auth(uid), None, None) for aid, uid in albums_with_posts],
+        "api_comment_post": [
+            ("POST", f"/api/posts/{album_posts[aid]}/comment", auth(uid), {"comment": "benchmark comment"}, None)
+            for aid, uid in albums_with_posts
+        ],
+        "search_users": [("GET", f"/search_users?q=user{rng.randint(1, 99)}", {}, None, uid) for _, uid in groups],
+    }
+
+
+def run_case(client, method, path, headers, body, session_user):
+    if session_user is not None:
+        with client.session_transaction() as sess:
+            sess['_user_id'] = str(session_user)
+            sess['_fresh'] = True
+    with collect_queries() as queries:
+        started = time.perf_counter()
+        resp = client.open(path, method=method, headers=headers, json=body)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    return elapsed_ms, queries.count, resp.status_code
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark hot endpoints against the configured database.")
+    parser.add_argument("--requests", type=int, default=50, help="Measured requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", action="append", help="Benchmark only these endpoints (repeatable).")
+    parser.add_argument("--output", default=None, help="Results JSON path.")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {}
+    with app.app_context():
+        dialect = db.engine.dialect.name
+        cases = build_cases(rng, args.requests + args.warmup)
+        client = app.test_client()
+        for name, requests_ in cases.items():
+            if args.only and name not in args.only:
+                continue
+            if not requests_:
+                print(f"[bench] {name}: no data, skipped")
+                continue
+            latencies, query_counts, errors = [], [], 0
+            for i in range(args.requests + args.warmup):
+                elapsed_ms, queries, status = run_case(client, *requests_[i % len(requests_)])
+                if i < args.warmup:
+                    continue
+                latencies.append(elapsed_ms)
+                query_counts.append(queries)
+                errors += status >= 400
+            results[name] = summarize(
+                latencies,
+                queries_mean=round(sum(query_counts) / len(query_counts), 1),
+                queries_max=max(query_counts),
+                errors=errors,
+            )
+            r = results[name]
+            print(f"[bench] {name}: p50={r['p50_ms']}ms p95={r['p95_ms']}ms p99={r['p99_ms']}ms queries={r['queries_mean']} errors={errors}")
+        db.session.remove()
+    output = args.output or f"benchmarks/results/endpoints-{git_commit() or 'local'}-{dialect}.json"
+    write_results(output, "endpoints", results, database=dialect, requests=args.requests)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,155 @@
+"""Local stand-ins for Expo push and S3 so load tests never touch real services.
+
+Usage:
+    python -m benchmarks.fakes --port 9100
+Then start the app with the environment it prints.
+"""
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from uuid import uuid4
+from xml.sax.saxutils import escape
+
+FAKE_BUCKET = "groupo-bench"
+
+
+class FakeServices(BaseHTTPRequestHandler):
+    """Expo under /--/api/v2/push/*, a single in-memory S3 bucket under /<bucket>/<key>."""
+
+    protocol_version = "HTTP/1.1"
+    objects = {}
+    tickets = {}
+    lock = threading.Lock()
+    latency_ms = 0
+
+    def _reply(self, status, body=b"", content_type="application/json"):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body).encode()
+        elif isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if status == 200 and content_type != "application/json":
+            self.send_header("ETag", '"fake"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _simulate_latency(self):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+
+    def _s3_key(self):
+        parsed = urlparse(self.path)
+        parts = parsed.path.lstrip("/").split("/", 1)
+        return parts[0], (parts[1] if len(parts) > 1 else ""), parse_qs(parsed.query, keep_blank_values=True)
+
+    def do_POST(self):
+        self._simulate_latency()
+        if self.path.startswith("/--/api/v2/push/send"):
+            messages = json.loads(self._body() or b"[]")
+            if isinstance(messages, dict):
+                messages = [messages]
+            data = []
+            with self.lock:
+                for _ in messages:
+                    ticket_id = uuid4().hex
+                    self.tickets[ticket_id] = {"status": "ok"}
+                    data.append({"status": "ok", "id": ticket_id})
+            return self._reply(200, {"data": data})
+        if self.path.startswith("/--/api/v2/push/getReceipts"):
+            ids = json.loads(self._body() or b"{}").get("ids") or []
+            with self.lock:
+                return self._reply(200, {"data": {i: self.tickets.pop(i) for i in ids if i in self.tickets}})
+        bucket, _, query = self._s3_key()
+        if "delete" in query:
+            body = self._body().decode()
+            keys = [chunk.split("</Key>", 1)[0] for chunk in body.split("<Key>")[1:]]
+            with self.lock:
+                for key in keys:
+                    self.objects.pop((bucket, key), None)
+            return self._reply(200, "<DeleteResult></DeleteResult>", "application/xml")
+        return self._reply(404, {"error": "not found"})
+
+    def do_PUT(self):
+        self._simulate_latency()
+        bucket, key, _ = self._s3_key()
+        with self.lock:
+            self.objects[(bucket, key)] = (self._body(), datetime.now(timezone.utc))
+        return self._reply(200, b"", "application/xml")
+
+    def do_GET(self):
+        bucket, key, query = self._s3_key()
+        if not key and query.get("list-type") == ["2"]:
+            start_after = (query.get("start-after") or [""])[0]
+            max_keys = int((query.get("max-keys") or ["1000"])[0])
+            with self.lock:
+                keys = sorted(k for b, k in self.objects if b == bucket and k > start_after)
+                page = keys[:max_keys]
+                contents = "".join(
+                    f"<Contents><Key>{escape(k)}</Key><LastModified>{self.objects[(bucket, k)][1].strftime('%Y-%m-%dT%H:%M:%S.000Z')}</LastModified>"
+                    f"<Size>{len(self.objects[(bucket, k)][0])}</Size></Contents>"
+                    for k in page
+                )
+            truncated = "true" if len(keys) > max_keys else "false"
+            xml = f'<?xml version="1.0" encoding="UTF-8"?><ListBucketResult><Name>{bucket}</Name><IsTruncated>{truncated}</IsTruncated><KeyCount>{len(page)}</KeyCount>{contents}</ListBucketResult>'
+            return self._reply(200, xml, "application/xml")
+        with self.lock:
+            item = self.objects.get((bucket, key))
+        if item is None:
+            return self._reply(404, "<Error><Code>NoSuchKey</Code></Error>", "application/xml")
+        return self._reply(200, item[0], "application/octet-stream")
+
+    def log_message(self, *args):
+        pass
+
+
+def start_fakes(host="127.0.0.1", port=0, latency_ms=0):
+    FakeServices.latency_ms = latency_ms
+    server = ThreadingHTTPServer((host, port), FakeServices)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def app_environment(server):
+    host, port = server.server_address[:2]
+    base = f"http://{host}:{port}"
+    return {
+        "EXPO_PUSH_URL": f"{base}/--/api/v2/push/send",
+        "EXPO_RECEIPTS_URL": f"{base}/--/api/v2/push/getReceipts",
+        "RENDER": "true",
+        "S3_ENDPOINT_URL": base,
+        "S3_BUCKET_NAME": FAKE_BUCKET,
+        "AWS_ACCESS_KEY_ID": "fake",
+        "AWS_SECRET_ACCESS_KEY": "fake",
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run fake Expo and S3 servers for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Artificial latency added to every write call.")
+    args = parser.parse_args()
+
+    server = start_fakes(args.host, args.port, args.latency_ms)
+    print("[fakes] serving Expo and S3 stand-ins; start the app with:")
+    for key, value in app_environment(server).items():
+        print(f"export {key}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
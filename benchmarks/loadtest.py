@@ -0,0 +1,244 @@
+"""Drive a running app with many concurrent virtual users and report throughput and tail latency.
+
+Each virtual user logs in as a seeded account, then loops over weighted actions from a scenario
+file (``benchmarks/scenarios/*.json``) with think time between them.
+
+Usage (app running against a seeded database and ``python -m benchmarks.fakes``):
+    python -m benchmarks.loadtest --scenario benchmarks/scenarios/mixed.json --base-url http://127.0.0.1:8000
+"""
+import argparse
+import io
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+
+import requests
+
+from benchmarks.common import summarize, write_results, git_commit
+
+# Smallest valid JPEG-ish payload; the app stores uploads as opaque bytes.
+FAKE_IMAGE = b"\xff\xd8\xff\xe0" + b"\x00" * 1020 + b"\xff\xd9"
+
+
+def load_scenario(path):
+    with open(path) as f:
+        scenario = json.load(f)
+    scenario.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    scenario.setdefault("virtual_users", 10)
+    scenario.setdefault("duration_seconds", 30)
+    scenario.setdefault("ramp_up_seconds", 0)
+    scenario.setdefault("think_time_ms", [0, 0])
+    scenario.setdefault("user_pool", {})
+    if not scenario.get("actions"):
+        raise ValueError(f"Scenario {path} defines no actions")
+    return scenario
+
+
+class Recorder:
+    """Thread-safe per-action latency and error collection."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    def record(self, action, elapsed_ms, status):
+        ok = status is not None and status < 400
+        with self.lock:
+            self.status_codes[action][str(status) if status is not None else "exception"] += 1
+            if ok:
+                self.latencies[action].append(elapsed_ms)
+            else:
+                self.errors[action] += 1
+
+    def report(self, wall_seconds):
+        results = {}
+        total_ok = total_err = 0
+        for action in sorted(set(self.latencies) | set(self.errors)):
+            ok, err = len(self.latencies[action]), self.errors[action]
+            total_ok += ok
+            total_err += err
+            results[action] = summarize(
+                self.latencies[action],
+                errors=err,
+                error_rate=round(err / (ok + err), 4) if ok + err else 0.0,
+                throughput_rps=round((ok + err) / wall_seconds, 2) if wall_seconds else None,
+                status_codes=dict(self.status_codes[action]),
+            )
+        all_latencies = [ms for values in self.latencies.values() for ms in values]
+        results["_total"] = summarize(
+            all_latencies,
+            errors=total_err,
+            error_rate=round(total_err / (total_ok + total_err), 4) if total_ok + total_err else 0.0,
+            throughput_rps=round((total_ok + total_err) / wall_seconds, 2) if wall_seconds else None,
+        )
+        return results
+
+
+class VirtualUser:
+    def __init__(self, index, scenario, base_url, recorder, rng):
+        self.index = index
+        self.scenario = scenario
+        self.base_url = base_url.rstrip("/")
+        self.recorder = recorder
+        self.rng = rng
+        self.session = requests.Session()
+        pool = scenario["user_pool"]
+        first, count = pool.get("first", 1), pool.get("count", 100)
+        self.username = f"{pool.get('prefix', 'user')}{first + (index % count)}"
+        self.password = pool.get("password", "password123")
+        self.token = None
+        self.group_ids = []
+        self.album_ids = []
+        self.post_ids = []
+
+    def request(self, action, method, path, **kwargs):
+        headers = kwargs.pop("headers", {})
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        start = time.perf_counter()
+        try:
+            resp = self.session.request(method, self.base_url + path, headers=headers, timeout=30, **kwargs)
+        except requests.RequestException:
+            self.recorder.record(action, (time.perf_counter() - start) * 1000, None)
+            return None
+        self.recorder.record(action, (time.perf_counter() - start) * 1000, resp.status_code)
+        return resp
+
+    def _json(self, resp):
+        if resp is None or resp.status_code >= 400:
+            return {}
+        try:
+            return resp.json()
+        except ValueError:
+            return {}
+
+    def do_login(self):
+        data = self._json(self.request("login", "POST", "/api/login", json={"username": self.username, "password": self.password}))
+        if data.get("token"):
+            self.token = data["token"]
+
+    def do_list_groups(self):
+        data = self._json(self.request("list_groups", "GET", "/api/groups"))
+        self.group_ids = [grp["id"] for grp in data.get("groups", [])] or self.group_ids
+
+    def do_list_albums(self):
+        data = self._json(self.request("list_albums", "GET", "/api/albums"))
+        self.album_ids = [a["id"] for a in data.get("albums", [])] or self.album_ids
+
+    def _remember_posts(self, data):
+        ids = [p["id"] for p in data.get("posts", []) if "id" in p]
+        if ids:
+            self.post_ids = ids[:50]
+
+    def do_feed_group(self):
+        if self.group_ids:
+            self._remember_posts(self._json(self.request("feed_group", "GET", f"/api/groups/{self.rng.choice(self.group_ids)}/posts")))
+
+    def do_feed_album(self):
+        if self.album_ids:
+            self._remember_posts(self._json(self.request("feed_album", "GET", f"/api/albums/{self.rng.choice(self.album_ids)}/posts")))
+
+    def do_like(self):
+        if self.post_ids:
+            self.request("like", "POST", f"/api/posts/{self.rng.choice(self.post_ids)}/like")
+
+    def do_comment(self):
+        if self.post_ids:
+            self.request("comment", "POST", f"/api/posts/{self.rng.choice(self.post_ids)}/comment", json={"comment": f"load test {self.index}"})
+
+    def do_post_media(self):
+        if self.album_ids:
+            files = {"file": ("load.jpg", io.BytesIO(FAKE_IMAGE), "image/jpeg")}
+            album_id = self.rng.choice(self.album_ids)
+            # album_ids keeps the multipart request off the JSON fallback, as the mobile client does.
+            self.request("post_media", "POST", f"/api/albums/{album_id}/posts", data={"content": "load test", "album_ids": str(album_id)}, files=files)
+
+    def do_push_register(self):
+        self.request("push_register", "POST", "/api/push/register", json={"token": f"ExponentPushToken[load-{self.index}]", "platform": "ios"})
+
+    def run(self, deadline, stop):
+        self.do_login()
+        if not self.token:
+            return
+        self.do_list_groups()
+        self.do_list_albums()
+        actions = list(self.scenario["actions"])
+        weights = [self.scenario["actions"][a] for a in actions]
+        think_lo, think_hi = self.scenario["think_time_ms"]
+        while not stop.is_set() and time.monotonic() < deadline:
+            action = self.rng.choices(actions, weights)[0]
+            getattr(self, f"do_{action}")()
+            if think_hi:
+                stop.wait(self.rng.uniform(think_lo, think_hi) / 1000)
+
+
+def run_scenario(scenario, base_url, seed_value=42):
+    unknown = [a for a in scenario["actions"] if not hasattr(VirtualUser, f"do_{a}")]
+    if unknown:
+        raise ValueError(f"Unknown actions in scenario: {', '.join(unknown)}")
+    recorder = Recorder()
+    stop = threading.Event()
+    vus = scenario["virtual_users"]
+    ramp = scenario["ramp_up_seconds"]
+    start = time.monotonic()
+    deadline = start + ramp + scenario["duration_seconds"]
+    threads = []
+    for i in range(vus):
+        vu = VirtualUser(i, scenario, base_url, recorder, random.Random(seed_value + i))
+        thread = threading.Thread(target=vu.run, args=(deadline, stop), daemon=True)
+        thread.start()
+        threads.append(thread)
+        if ramp:
+            time.sleep(ramp / vus)
+    try:
+        for thread in threads:
+            thread.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+    return recorder.report(time.monotonic() - start)
+
+
+def print_report(results):
+    print(f"{'action':<16}{'n':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err%':>8}")
+    for action, row in results.items():
+        def fmt(v):
+            return f"{v:.1f}" if v is not None else "-"
+        print(f"{action:<16}{row['n']:>8}{fmt(row['throughput_rps']):>9}{fmt(row['p50_ms']):>9}{fmt(row['p95_ms']):>9}{fmt(row['p99_ms']):>9}{row['error_rate'] * 100:>7.2f}%")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run a concurrent load test against a running app.")
+    parser.add_argument("--scenario", required=True, help="Path to a scenario JSON file.")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--virtual-users", type=int, help="Override the scenario's virtual user count.")
+    parser.add_argument("--duration", type=int, help="Override the scenario's duration in seconds.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--max-error-rate", type=float, help="Exit non-zero when the overall error rate exceeds this fraction.")
+    parser.add_argument("--output", help="Results path (default benchmarks/results/load-<scenario>-<commit>.json)")
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    if args.virtual_users:
+        scenario["virtual_users"] = args.virtual_users
+    if args.duration:
+        scenario["duration_seconds"] = args.duration
+
+    results = run_scenario(scenario, args.base_url, args.seed)
+    print_report(results)
+    output = args.output or os.path.join("benchmarks", "results", f"load-{scenario['name']}-{git_commit() or 'local'}.json")
+    write_results(output, f"load:{scenario['name']}", results, scenario=scenario, base_url=args.base_url)
+    if args.max_error_rate is not None and results["_total"]["error_rate"] > args.max_error_rate:
+        print(f"[load] error rate {results['_total']['error_rate']:.2%} exceeds {args.max_error_rate:.2%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
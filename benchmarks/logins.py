@@ -0,0 +1,108 @@
+"""Login throughput under a sign-in burst, with feed reads running alongside.
+
+Threads share one app process, as in a gunicorn gthread worker. Half of them log in repeatedly and
+the other half read an album feed. The "unbounded" profile gives bcrypt as many slots as there are
+login threads, which matches hashing inline on each request thread. The "bounded" profile uses the
+configured PASSWORD_HASH_* settings.
+
+Usage:
+    python -m benchmarks.logins --threads 16 --duration 10 --rounds 12
+"""
+import argparse
+import os
+import threading
+import time
+
+from benchmarks.common import summarize, write_results, git_commit
+
+PASSWORD = "bench-password"
+
+
+def _prepare(rounds):
+    import app as app_module
+    from app import app, db, User, Group, Post, PostAlbum
+    from extensions.passwords import PasswordHasher
+
+    hashed = PasswordHasher(rounds=rounds, workers=1).hash(PASSWORD)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f"login{i}", password=hashed, first_name="L", last_name="Bench", api_token=f"login{i}-token") for i in range(20)]
+        album = Group(name="Bench", kind="album")
+        album.members.extend(users)
+        db.session.add(album)
+        db.session.flush()
+        for i in range(50):
+            post = Post(content=f"post {i}", user_id=users[i % 20].id, group_id=album.id)
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.commit()
+        return app_module, album.id
+
+
+def run_profile(app_module, album_id, hasher, threads, duration):
+    app_module.password_hasher = hasher
+    client = app_module.app.test_client()
+    logins, feeds, rejected = [], [], [0]
+    deadline = time.perf_counter() + duration
+
+    def login_loop(i):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            rv = client.post("/api/login", json={"username": f"login{i % 20}", "password": PASSWORD})
+            if rv.status_code == 503:
+                rejected[0] += 1
+            else:
+                logins.append((time.perf_counter() - start) * 1000)
+
+    def feed_loop(i):
+        headers = {"Authorization": f"Bearer login{i % 20}-token"}
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            # A fresh query string each time keeps the feed cache out of the measurement.
+            client.get(f"/api/albums/{album_id}/posts?fields=id,content&n={time.perf_counter_ns()}", headers=headers)
+            feeds.append((time.perf_counter() - start) * 1000)
+
+    workers = [threading.Thread(target=login_loop if i % 2 else feed_loop, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return {
+        "logins": summarize(logins, per_second=round(len(logins) / duration, 1), rejected=rejected[0]),
+        "feeds": summarize(feeds, per_second=round(len(feeds) / duration, 1)),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Measure login throughput and feed latency during a login burst.")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--duration", type=int, default=10, help="Seconds of load per profile.")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt cost factor of the stored hashes.")
+    parser.add_argument("--output", help="Results path (default benchmarks/results/logins-<commit>.json)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite:///bench-logins.db")
+    from extensions.passwords import PasswordHasher, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+
+    app_module, album_id = _prepare(args.rounds)
+    login_threads = args.threads // 2
+    profiles = {
+        "unbounded": PasswordHasher(rounds=args.rounds, workers=login_threads, max_pending=login_threads),
+        "bounded": PasswordHasher(rounds=args.rounds, workers=PASSWORD_HASH_WORKERS, max_pending=PASSWORD_HASH_MAX_PENDING),
+    }
+    results = {}
+    with app_module.app.app_context():
+        for name, hasher in profiles.items():
+            results[name] = row = run_profile(app_module, album_id, hasher, args.threads, args.duration)
+            print(f"[bench] {name:<10} logins/s={row['logins']['per_second']:<7} login_p95_ms={row['logins']['p95_ms']} "
+                  f"rejected={row['logins']['rejected']:<5} feeds/s={row['feeds']['per_second']:<7} feed_p95_ms={row['feeds']['p95_ms']}")
+    output = args.output or os.path.join("benchmarks", "results", f"logins-{git_commit() or 'local'}.json")
+    write_results(output, "logins", results, threads=args.threads, duration_seconds=args.duration, rounds=args.rounds,
+                  hash_workers=PASSWORD_HASH_WORKERS, hash_max_pending=PASSWORD_HASH_MAX_PENDING)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+"""Bulk-load a deterministic synthetic dataset for benchmarks.
+
+Usage:
+    SQLALCHEMY_DATABASE_URI=sqlite:///bench.db python -m benchmarks.seed --scale small --reset
+"""
+import argparse
+import random
+from array import array
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import common  # noqa: F401  (sets benchmark environment defaults)
+from sqlalchemy import insert, text
+
+from app import app, db, bcrypt, User, Group, GroupMembers, Post, PostAlbum, PostLike, Comment, DeviceToken, _backfill_comment_counts, _hash_phone_number
+
+SCALES = {
+    "tiny": dict(users=500, groups=50, albums_per_group=3, members_per_group=10, posts=5_000, comments=10_000, likes=10_000),
+    "small": dict(users=10_000, groups=1_000, albums_per_group=3, members_per_group=20, posts=100_000, comments=200_000, likes=300_000),
+    "large": dict(users=100_000, groups=10_000, albums_per_group=3, members_per_group=25, posts=2_000_000, comments=3_000_000, likes=5_000_000),
+}
+CHUNK = 5_000
+BENCH_PASSWORD = "password123"
+
+
+def bench_token(user_id):
+    return f"bench-token-{user_id}"
+
+
+def _bulk(table, rows):
+    buffer = []
+    total = 0
+    for row in rows:
+        buffer.append(row)
+        if len(buffer) >= CHUNK:
+            db.session.execute(insert(table), buffer)
+            db.session.commit()
+            total += len(buffer)
+            buffer = []
+    if buffer:
+        db.session.execute(insert(table), buffer)
+        db.session.commit()
+        total += len(buffer)
+    return total
+
+
+def seed(scale, seed_value=42):
+    cfg = SCALES[scale]
+    rng = random.Random(seed_value)
+    epoch = datetime(2024, 1, 1)
+    counts = {}
+    timings = {}
+
+    def step(name, table, rows):
+        started = time.perf_counter()
+        counts[name] = _bulk(table, rows)
+        timings[name] = round(time.perf_counter() - started, 2)
+        print(f"[bench] seeded {name}={counts[name]} in {timings[name]}s")
+
+    # One real hash shared by every user keeps seeding fast while login still works.
+    password_hash = bcrypt.generate_password_hash(BENCH_PASSWORD).decode('utf-8')
+    step("users", User.__table__, ({
+        "id": i, "username": f"user{i}", "password": password_hash, "first_name": f"First{i}", "last_name": f"Last{i % 997}",
+        "phone_number": f"555{i:07d}", "phone_hash": _hash_phone_number(f"555{i:07d}"), "api_token": bench_token(i), "created_at": epoch,
+    } for i in range(1, cfg["users"] + 1)))
+
+    members = {}
+    albums = {}
+    next_group_id = cfg["groups"] + 1
+    group_rows, membership_rows = [], []
+    for gid in range(1, cfg["groups"] + 1):
+        owner = rng.randint(1, cfg["users"])
+        size = max(2, int(rng.gauss(cfg["members_per_group"], cfg["members_per_group"] / 3)))
+        group_members = list({owner, *rng.sample(range(1, cfg["users"] + 1), min(size, cfg["users"]))})
+        members[gid] = group_members
+        group_rows.append({"id": gid, "name": f"Group {gid}", "kind": "group", "owner_id": owner, "parent_group_id": None})
+        albums[gid] = []
+        for a in range(cfg["albums_per_group"]):
+            albums[gid].append(next_group_id)
+            group_rows.append({"id": next_group_id, "name": f"Album {gid}.{a}", "kind": "album", "owner_id": owner, "parent_group_id": gid})
+            members[next_group_id] = group_members
+            next_group_id += 1
+    step("groups", Group.__table__, group_rows)
+    step("group_members", GroupMembers.__table__, (
+        {"group_id": gid, "user_id": uid} for gid, uids in members.items() for uid in uids
+    ))
+
+    # Feed sizes follow a long tail: a few groups are much busier than the rest.
+    group_ids = list(albums.keys())
+    cum_weights, running = [], 0.0
+    for rank in range(len(group_ids)):
+        running += 1 / (rank + 1) ** 0.8
+        cum_weights.append(running)
+    album_group = {album_id: gid for gid, ids in albums.items() for album_id in ids}
+    # Flat arrays instead of dicts keep millions of posts affordable in memory.
+    post_album = array('i', [0]) * (cfg["posts"] + 1)
+    post_likes = array('i', [0]) * (cfg["posts"] + 1)
+    mean_likes = cfg["likes"] / cfg["posts"]
+
+    def post_rows():
+        for pid in range(1, cfg["posts"] + 1):
+            gid = rng.choices(group_ids, cum_weights=cum_weights)[0]
+            album_id = rng.choice(albums[gid])
+            post_album[pid] = album_id
+            post_likes[pid] = min(int(rng.expovariate(1 / mean_likes)) if mean_likes else 0, len(members[album_id]))
+            media = ",".join(f"/uploads/bench_{pid}_{n}.jpg" for n in range(rng.choice((0, 1, 1, 2, 4))))
+            yield {
+                "id": pid, "content": f"Post {pid} " + "lorem ipsum " * rng.randint(1, 8), "image_urls": media,
+                "user_id": rng.choice(members[album_id]), "group_id": album_id, "likes": post_likes[pid],
+                "created_at": epoch + timedelta(seconds=pid * 30),
+            }
+    step("posts", Post.__table__, post_rows())
+
+    def post_album_rows():
+        for pid in range(1, cfg["posts"] + 1):
+            album_id = post_album[pid]
+            yield {"post_id": pid, "album_id": album_id}
+            if rng.random() < 0.2:
+                other = rng.choice(albums[album_group[album_id]])
+                if other != album_id:
+                    yield {"post_id": pid, "album_id": other}
+    step("post_album", PostAlbum.__table__, post_album_rows())
+
+    def comment_rows():
+        for cid in range(1, cfg["comments"] + 1):
+            pid = rng.randint(1, cfg["posts"])
+            yield {
+                "id": cid, "content": f"Comment {cid}", "user_id": rng.choice(members[post_album[pid]]), "post_id": pid,
+                "created_at": epoch + timedelta(seconds=pid * 30 + cid % 3600),
+            }
+    step("comments", Comment.__table__, comment_rows())
+    started = time.perf_counter()
+    _backfill_comment_counts()
+    timings["comment_counts"] = round(time.perf_counter() - started, 2)
+
+    def like_rows():
+        for pid in range(1, cfg["posts"] + 1):
+            if post_likes[pid]:
+                # Likers are distinct per post, so no global (post, user) set is needed.
+                for uid in rng.sample(members[post_album[pid]], post_likes[pid]):
+                    yield {"post_id": pid, "user_id": uid}
+    step("post_like", PostLike.__table__, like_rows())
+
+    step("device_tokens", DeviceToken.__table__, (
+        {"id": uid, "user_id": uid, "token": f"ExponentPushToken[bench-{uid}]", "platform": "ios"}
+        for uid in range(1, cfg["users"] + 1) if uid % 3
+    ))
+
+    if db.engine.dialect.name == 'postgresql':
+        # Explicit ids leave the sequences behind.
+        for table in ('user', 'group', 'post', 'comment', 'device_token'):
+            db.session.execute(text(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), (SELECT MAX(id) FROM \"{table}\"))"))
+        db.session.commit()
+    return {"scale": scale, "seed": seed_value, "counts": counts, "seconds": timings}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Seed a synthetic dataset for benchmarks.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Drop and recreate the schema first.")
+    args = parser.parse_args()
+
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+            db.create_all()
+        elif User.query.first() is not None:
+            print("[bench] database is not empty; pass --reset to reseed.")
+            return 1
+        summary = seed(args.scale, args.seed)
+    print(f"[bench] seed complete: {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,88 @@
+"""Compare JSON encode time and bytes on the wire for real feed payloads.
+
+Feeds are fetched through the app from a seeded database, then re-encoded with the stdlib encoder
+Flask used before (sorted keys, ASCII escapes) and with orjson, and compressed with gzip and brotli.
+
+Usage (after ``python -m benchmarks.seed``):
+    SQLALCHEMY_DATABASE_URI=sqlite:///bench.db python -m benchmarks.serialization --feeds 20
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from benchmarks.common import summarize, write_results, git_commit
+from app import app, db
+from benchmarks.endpoints import build_cases
+from extensions.compression import brotli
+
+ENCODERS = {
+    "stdlib": lambda obj: json.dumps(obj, separators=(",", ":"), sort_keys=True, ensure_ascii=True).encode(),
+    "orjson": lambda obj: app.json.dumps_bytes(obj),
+}
+
+
+def _compressors():
+    compressors = {f"gzip-{level}": (lambda data, level=level: gzip.compress(data, compresslevel=level)) for level in (1, 6, 9)}
+    if brotli is not None:
+        compressors.update({f"br-{q}": (lambda data, q=q: brotli.compress(data, quality=q)) for q in (4, 5, 11)})
+    return compressors
+
+
+def _timed(fn, payloads, repeat):
+    samples = []
+    for _ in range(repeat):
+        for payload in payloads:
+            start = time.perf_counter()
+            fn(payload)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark feed JSON encoding and compression.")
+    parser.add_argument("--feeds", type=int, default=20, help="Group and album feeds to sample (each).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    payloads = []
+    with app.app_context():
+        cases = build_cases(rng, args.feeds)
+        client = app.test_client()
+        for name in ("api_group_posts", "api_album_posts"):
+            for method, path, headers, _, _ in cases[name]:
+                resp = client.open(path, method=method, headers=headers)
+                if resp.status_code == 200:
+                    payloads.append(json.loads(resp.get_data()))
+        db.session.remove()
+    if not payloads:
+        print("[bench] no feeds returned; seed the database first")
+        return 1
+
+    results = {"encode": {}, "wire": {}}
+    encoded = {}
+    for name, encode in ENCODERS.items():
+        results["encode"][name] = summarize(_timed(encode, payloads, args.repeat))
+        encoded[name] = [encode(p) for p in payloads]
+        print(f"[bench] encode {name}: p50={results['encode'][name]['p50_ms']}ms p95={results['encode'][name]['p95_ms']}ms")
+
+    raw = encoded["orjson"]
+    raw_bytes = sum(len(b) for b in raw)
+    results["wire"]["identity"] = {"bytes": raw_bytes, "ratio": 1.0}
+    for name, compress in _compressors().items():
+        sizes = sum(len(compress(b)) for b in raw)
+        timing = summarize(_timed(compress, raw, 1))
+        results["wire"][name] = {"bytes": sizes, "ratio": round(sizes / raw_bytes, 4), "compress_p50_ms": timing["p50_ms"], "compress_p95_ms": timing["p95_ms"]}
+        print(f"[bench] {name}: {sizes} bytes ({results['wire'][name]['ratio']:.1%} of {raw_bytes}) p50={timing['p50_ms']}ms")
+
+    output = args.output or f"benchmarks/results/serialization-{git_commit() or 'local'}.json"
+    write_results(output, "serialization", results, feeds=len(payloads), payload_bytes_mean=raw_bytes // len(payloads))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
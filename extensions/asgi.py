@@ -0,0 +1,44 @@
+# app/extensions/asgi.py
+import os
+
+from a2wsgi import WSGIMiddleware
+
+from extensions.db_engine import DB_MAX_OVERFLOW, DB_POOL_SIZE
+
+# Threads per ASGI worker that run Flask views. Each thread may hold a pooled DB connection, so the default
+# matches DB_POOL_SIZE + DB_MAX_OVERFLOW; more threads than that wait up to DB_POOL_TIMEOUT for a
+# connection and then fail.
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', DB_POOL_SIZE + DB_MAX_OVERFLOW))
+
+
+class WSGIAdapter:
+    """Serve a WSGI app over ASGI.
+
+    HTTP goes through a2wsgi's WSGIMiddleware, which runs each request on a pool of ``threads``. This
+    class only adds the ``lifespan`` scope, so startup and shutdown hooks run once per worker.
+    """
+
+    def __init__(self, wsgi_app, threads=ASGI_THREADS, on_startup=(), on_shutdown=()):
+        self.bridge = WSGIMiddleware(wsgi_app, workers=threads)
+        self.on_startup = list(on_startup)
+        self.on_shutdown = list(on_shutdown)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+        else:
+            await self.bridge(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                for hook in self.on_startup:
+                    hook()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for hook in self.on_shutdown:
+                    hook()
+                self.bridge.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,109 @@
+# app/extensions/batch.py
+import contextvars
+import os
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import g
+from werkzeug.exceptions import HTTPException
+
+from extensions.query_stats import collect_queries
+
+# POST /api/batch runs up to BATCH_MAX_OPS sub-requests against the normal view functions in one HTTP request.
+BATCH_MAX_OPS = int(os.environ.get('BATCH_MAX_OPS', 20))
+# Work budget for the whole batch; ops that have not started once it is spent come back as 503.
+BATCH_MAX_SECONDS = float(os.environ.get('BATCH_MAX_SECONDS', 10))
+BATCH_MAX_QUERIES = int(os.environ.get('BATCH_MAX_QUERIES', 500))
+# Threads used for "parallel": true batches of reads. 1 keeps every batch sequential.
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+READ_METHODS = {'GET', 'HEAD'}
+
+
+class BatchError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_ops(payload):
+    """Validate the request body and return ``(ops, parallel)``; raises BatchError."""
+    if not isinstance(payload, dict) or not isinstance(payload.get('ops'), list) or not payload['ops']:
+        raise BatchError('ops must be a non-empty list')
+    ops = payload['ops']
+    if len(ops) > BATCH_MAX_OPS:
+        raise BatchError(f'At most {BATCH_MAX_OPS} ops per batch', status=413)
+    for index, op in enumerate(ops):
+        if not isinstance(op, dict) or not isinstance(op.get('path'), str):
+            raise BatchError(f'ops[{index}] needs a path')
+        path = op['path'].split('?', 1)[0]
+        if not path.startswith('/api/') or path.rstrip('/') == '/api/batch':
+            raise BatchError(f'ops[{index}]: only /api/ routes other than /api/batch can be batched')
+        op['method'] = str(op.get('method', 'GET')).upper()
+    return ops, bool(payload.get('parallel'))
+
+
+def _dispatch(app, db, op):
+    """Run one op through URL matching and its view function, skipping the per-request hooks."""
+    with app.test_request_context(op['path'], method=op['method'], json=op.get('body')):
+        try:
+            try:
+                rv = app.dispatch_request()
+            except Exception as exc:
+                # Registered errorhandlers (PasswordHasherBusy -> 503, ...) answer for ops too; the rest re-raise.
+                rv = app.handle_user_exception(exc)
+            if isinstance(rv, HTTPException):
+                return {'status': rv.code, 'body': {'error': rv.description}}
+            response = app.make_response(rv)
+        except Exception:
+            db.session.rollback()
+            traceback.print_exc()
+            return {'status': 500, 'body': {'error': 'Internal server error'}}
+        data = response.get_data()
+        if response.is_json:
+            payload = app.json.loads(data) if data else None
+        else:
+            payload = data.decode('utf-8', 'replace')
+        return {'status': response.status_code, 'body': payload}
+
+
+def _dispatch_in_own_context(app, db, op, user):
+    # Every op gets its own app context, and so its own g and DB session: the request teardown hooks
+    # that run when the op's request context pops then see the op's g, never the /api/batch request's.
+    with app.app_context():
+        g.batch_user = db.session.merge(user, load=False)
+        try:
+            return _dispatch(app, db, op)
+        finally:
+            db.session.remove()
+
+
+def run_batch(app, db, ops, user, parallel=False):
+    """Execute ``ops`` for ``user`` and return one ``{id, status, body}`` per op, in order.
+
+    ``user`` is authenticated once and merged into each op's session without a reload. Ops run one
+    after another, or with ``parallel`` and only read ops, over BATCH_MAX_WORKERS threads.
+    """
+    deadline = time.monotonic() + BATCH_MAX_SECONDS
+    results = [None] * len(ops)
+    with collect_queries() as collector:
+        def over_budget():
+            return time.monotonic() > deadline or collector.count > BATCH_MAX_QUERIES
+
+        if parallel and BATCH_MAX_WORKERS > 1 and all(op['method'] in READ_METHODS for op in ops):
+            def run(op):
+                if over_budget():
+                    return None
+                return _dispatch_in_own_context(app, db, op, user)
+
+            with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(ops))) as pool:
+                # copy_context keeps the batch's query collector visible in the worker threads.
+                futures = [pool.submit(contextvars.copy_context().run, run, op) for op in ops]
+                results = [future.result() for future in futures]
+        else:
+            for index, op in enumerate(ops):
+                if over_budget():
+                    break
+                results[index] = _dispatch_in_own_context(app, db, op, user)
+    skipped = {'status': 503, 'body': {'error': 'Batch work limit exceeded'}}
+    return [{'id': op.get('id', index), **(result or skipped)} for index, (op, result) in enumerate(zip(ops, results))]
@@ -0,0 +1,91 @@
+# app/extensions/compression.py
+import gzip
+import os
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Optional: without it only gzip is offered.
+    brotli = None
+
+COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true') == 'true'
+# Below this size the encoding overhead outweighs the savings.
+COMPRESS_MIN_BYTES = int(os.environ.get('COMPRESS_MIN_BYTES', 1024))
+COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 5))
+# Streamed bodies are flushed once this much input has gone in since the last flush, so the compressor
+# sees more than one small chunk (e.g. one post of a streamed feed) per flush.
+COMPRESS_STREAM_FLUSH_BYTES = int(os.environ.get('COMPRESS_STREAM_FLUSH_BYTES', 8 * 1024))
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/msgpack', 'text/html', 'text/plain', 'text/css', 'application/javascript'}
+
+
+def available_encodings():
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def choose_encoding(accept_encodings):
+    """Best encoding the client accepts (q > 0), preferring brotli on ties; None for identity."""
+    return accept_encodings.best_match(available_encodings())
+
+
+def compress_bytes(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+
+
+def compress_stream(chunks, encoding, flush_bytes=None):
+    """Compress an iterable of byte chunks, flushing every ``flush_bytes`` of input so streamed responses keep flowing."""
+    flush_bytes = COMPRESS_STREAM_FLUSH_BYTES if flush_bytes is None else flush_bytes
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=COMPRESS_BROTLI_QUALITY)
+        compress, flush, finish = compressor.process, compressor.flush, compressor.finish
+    else:
+        compressor = zlib.compressobj(COMPRESS_GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+        compress, flush, finish = compressor.compress, lambda: compressor.flush(zlib.Z_SYNC_FLUSH), compressor.flush
+    pending = 0
+    for chunk in chunks:
+        out = compress(chunk)
+        pending += len(chunk)
+        if pending >= flush_bytes:
+            out += flush()
+            pending = 0
+        if out:
+            yield out
+    yield finish()
+
+
+def _encode_chunks(chunks):
+    for chunk in chunks:
+        yield chunk.encode('utf-8') if isinstance(chunk, str) else chunk
+
+
+def init_compression(app):
+    @app.after_request
+    def _compress_response(response):
+        if not COMPRESS_ENABLED or request.method == 'HEAD':
+            return response
+        if response.status_code < 200 or response.status_code in (204, 206, 304) or 'Content-Encoding' in response.headers:
+            return response
+        # Range responses describe byte offsets of the identity body, and file responses are sent as-is.
+        if 'Content-Range' in response.headers or response.direct_passthrough:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = compress_stream(_encode_chunks(response.response), encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < COMPRESS_MIN_BYTES:
+                return response
+            response.set_data(compress_bytes(data, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
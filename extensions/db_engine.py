@@ -0,0 +1,71 @@
+# app/extensions/db_engine.py
+import os
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+# SQLite: WAL lets readers proceed while one writer commits; busy_timeout makes concurrent writers
+# from other gunicorn workers wait for the lock instead of failing with "database is locked".
+SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 64 * 1024))
+SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+
+# Postgres: per-process pool. Size it so workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below max_connections.
+# ASGI_THREADS (extensions/asgi.py) defaults to DB_POOL_SIZE + DB_MAX_OVERFLOW so every view thread can get a connection.
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 10))
+DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 10))
+DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 30000))
+DB_IDLE_IN_TRANSACTION_TIMEOUT_MS = int(os.environ.get('DB_IDLE_IN_TRANSACTION_TIMEOUT_MS', 60000))
+
+
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``uri``; pass the result to app.config before creating SQLAlchemy(app)."""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend == 'sqlite':
+        # The driver-level timeout is the same wait as busy_timeout, applied before the pragma runs.
+        return {'connect_args': {'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    if backend == 'postgresql':
+        return {
+            'pool_size': DB_POOL_SIZE,
+            'max_overflow': DB_MAX_OVERFLOW,
+            'pool_timeout': DB_POOL_TIMEOUT,
+            'pool_recycle': DB_POOL_RECYCLE,
+            'pool_pre_ping': True,
+            'connect_args': {
+                'application_name': 'groupo',
+                'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS} '
+                           f'-c idle_in_transaction_session_timeout={DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}',
+            },
+        }
+    return {'pool_pre_ping': True}
+
+
+def sqlite_pragmas():
+    pragmas = [
+        ('busy_timeout', SQLITE_BUSY_TIMEOUT_MS),
+        ('journal_mode', SQLITE_JOURNAL_MODE),
+        ('synchronous', SQLITE_SYNCHRONOUS),
+        ('cache_size', -SQLITE_CACHE_SIZE_KB),  # Negative values are KiB rather than pages.
+        ('temp_store', 'MEMORY'),
+    ]
+    if SQLITE_MMAP_SIZE:
+        pragmas.append(('mmap_size', SQLITE_MMAP_SIZE))
+    return pragmas
+
+
+@event.listens_for(Engine, 'connect')
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in sqlite_pragmas():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
@@ -0,0 +1,211 @@
+# app/extensions/db_replicas.py
+import hashlib
+import os
+import threading
+import time
+
+from flask import g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import Column, Float, String, Table, create_engine, event, select, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql.expression import Select
+
+from extensions.db_engine import engine_options
+
+# Comma-separated replica URIs. Empty means every statement goes to the primary.
+SQLALCHEMY_REPLICA_URIS = os.environ.get('SQLALCHEMY_REPLICA_URIS', '')
+# After a write, the same client reads from the primary for this long so it sees its own changes.
+# The window is kept in the replica_sticky table on the primary, so every worker honours it.
+REPLICA_STICKY_SECONDS = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+REPLICA_HEALTH_INTERVAL_SECONDS = float(os.environ.get('REPLICA_HEALTH_INTERVAL_SECONDS', 10))
+READ_ONLY_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+STICKY_COOKIE = 'groupo_primary_until'
+
+
+class Replica:
+    def __init__(self, uri):
+        self.uri = uri
+        self.engine = create_engine(uri, **engine_options(uri))
+        self.healthy = None  # Probed on first use.
+        self.checked_at = 0.0
+        event.listen(self.engine, 'handle_error', self._on_error)
+
+    def _on_error(self, context):
+        if context.is_disconnect or context.connection is None:
+            self.mark_down()
+
+    def mark_down(self):
+        self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def check(self):
+        try:
+            with self.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            self.healthy = True
+        except Exception as exc:
+            print(f"[db] replica {self.engine.url.render_as_string(hide_password=True)} unhealthy: {exc}")
+            self.healthy = False
+        self.checked_at = time.monotonic()
+        return self.healthy
+
+
+class MemoryStickyStore:
+    """Read-your-writes windows for this process only; used when init_replicas() is given no database."""
+
+    def __init__(self):
+        self._until = {}
+
+    def stick(self, key, until):
+        if len(self._until) > 10_000:
+            now = time.time()
+            self._until = {k: v for k, v in self._until.items() if v > now}
+        self._until[key] = until
+
+    def is_sticky(self, key):
+        return self._until.get(key, 0) > time.time()
+
+
+class DatabaseStickyStore:
+    """Read-your-writes windows in a primary-DB table, keyed by a hash of the client's credentials.
+
+    Statements use ``db.engine`` directly, so they never go through the routing session or the request's
+    transaction. Expired rows are deleted every STICKY_PRUNE_EVERY writes.
+    """
+
+    STICKY_PRUNE_EVERY = 1000
+
+    def __init__(self, db):
+        self.db = db
+        self.table = Table(
+            'replica_sticky', db.metadata,
+            Column('client_hash', String(64), primary_key=True),
+            Column('until', Float, nullable=False),
+            keep_existing=True,
+        )
+        self._writes = 0
+
+    @staticmethod
+    def _hash(key):
+        return hashlib.sha256(str(key).encode('utf-8')).hexdigest()
+
+    def stick(self, key, until):
+        t, client_hash = self.table, self._hash(key)
+        with self.db.engine.begin() as conn:
+            updated = conn.execute(t.update().where(t.c.client_hash == client_hash).values(until=until)).rowcount
+        if not updated:
+            try:
+                with self.db.engine.begin() as conn:
+                    conn.execute(t.insert().values(client_hash=client_hash, until=until))
+            except IntegrityError:
+                pass  # Another worker opened the same window at the same moment.
+        self._writes += 1
+        if self._writes % self.STICKY_PRUNE_EVERY == 0:
+            with self.db.engine.begin() as conn:
+                conn.execute(t.delete().where(t.c.until < time.time()))
+
+    def is_sticky(self, key):
+        t = self.table
+        with self.db.engine.connect() as conn:
+            until = conn.execute(select(t.c.until).where(t.c.client_hash == self._hash(key))).scalar()
+        return until is not None and until > time.time()
+
+
+class ReplicaRouter:
+    """Round-robin over healthy replicas. An unhealthy replica is re-probed every REPLICA_HEALTH_INTERVAL_SECONDS."""
+
+    def __init__(self):
+        self.replicas = []
+        self._next = 0
+        self._lock = threading.Lock()
+        self.sticky_store = MemoryStickyStore()
+
+    def configure(self, uris):
+        self.dispose()
+        self.replicas = [Replica(uri) for uri in uris if uri]
+
+    def dispose(self):
+        for replica in self.replicas:
+            replica.engine.dispose()
+        self.replicas = []
+
+    def pick(self):
+        if not self.replicas:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        for replica in self.replicas[start:] + self.replicas[:start]:
+            if replica.healthy:
+                return replica.engine
+            stale = replica.healthy is None or now - replica.checked_at >= REPLICA_HEALTH_INTERVAL_SECONDS
+            if stale and replica.check():
+                return replica.engine
+        return None
+
+    def stick(self, key, until):
+        self.sticky_store.stick(key, until)
+
+    def is_sticky(self, key):
+        return key is not None and self.sticky_store.is_sticky(key)
+
+
+router = ReplicaRouter()
+
+
+def _client_key():
+    return request.headers.get('Authorization') or session.get('_user_id')
+
+
+def use_primary(view):
+    """Route every statement of this read-only view to the primary (e.g. status polling that must not lag)."""
+    view.use_primary = True
+    return view
+
+
+def _reads_from_replica():
+    return has_request_context() and g.get('db_read_replica', False)
+
+
+class RoutingSession(Session):
+    """Sends SELECTs issued while serving a read-only request to a replica; flushes and DML stay on the primary."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and isinstance(clause, Select) and _reads_from_replica():
+            engine = router.pick()
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def init_replicas(app, db=None, uris=None):
+    """Configure routing; with ``db``, read-your-writes windows are shared through its primary database."""
+    if uris is None:
+        uris = [u.strip() for u in SQLALCHEMY_REPLICA_URIS.split(',') if u.strip()]
+    router.configure(uris)
+    if db is not None:
+        router.sticky_store = DatabaseStickyStore(db)
+
+    @app.before_request
+    def _route_reads():
+        view = app.view_functions.get(request.endpoint)
+        sticky_until = request.cookies.get(STICKY_COOKIE, type=float) or 0
+        g.db_read_replica = (
+            bool(router.replicas)
+            and request.method in READ_ONLY_METHODS
+            and not getattr(view, 'use_primary', False)
+            and sticky_until <= time.time()
+            and not router.is_sticky(_client_key())
+        )
+
+    @app.after_request
+    def _stick_writers(response):
+        if router.replicas and request.method not in READ_ONLY_METHODS and response.status_code < 400:
+            until = time.time() + REPLICA_STICKY_SECONDS
+            key = _client_key()
+            if key:
+                router.stick(key, until)
+            # The cookie spares browsers the sticky-table lookup; token clients rely on the table alone.
+            response.set_cookie(STICKY_COOKIE, str(until), max_age=int(REPLICA_STICKY_SECONDS) + 1, httponly=True, samesite='Lax')
+        return response
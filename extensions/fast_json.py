@@ -0,0 +1,32 @@
+# app/extensions/fast_json.py
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# orjson emits UTF-8 rather than \u escapes and does not sort keys; both are valid JSON and cheaper.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson. Falls back to the stdlib for pretty-printing (debug mode)."""
+
+    sort_keys = False
+
+    def dumps_bytes(self, obj):
+        # Passthrough keeps Flask's formats for datetimes (HTTP date) and dataclasses.
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs.get('indent') or kwargs.get('sort_keys'):
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj) + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,176 @@
+# app/extensions/feed_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from extensions.metrics import record_cache
+
+# Rendered feed responses are cached per (group, query, viewer bits) under a per-group version.
+# Writes bump the version, so stale entries are never read again and simply age out.
+FEED_CACHE_ENABLED = os.environ.get('FEED_CACHE_ENABLED', 'true') == 'true'
+# Optional shared tier (and shared versions) for multi-worker deployments, e.g. redis://localhost:6379/0.
+FEED_CACHE_REDIS_URL = os.environ.get('FEED_CACHE_REDIS_URL')
+# Without a shared backend other workers never see this worker's version bumps, so keep entries short-lived.
+FEED_CACHE_TTL_SECONDS = int(os.environ.get('FEED_CACHE_TTL_SECONDS', 60 if FEED_CACHE_REDIS_URL else 5))
+FEED_CACHE_LRU_SIZE = int(os.environ.get('FEED_CACHE_LRU_SIZE', 1024))
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class MemoryBackend:
+    """In-process stand-in for the shared backend; same interface as RedisBackend."""
+
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._values.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = (value, time.monotonic() + ttl if ttl else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int((self._values.get(key) or (0, None))[0]) + 1
+            self._values[key] = (value, None)
+            return value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class RedisBackend:
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("FEED_CACHE_REDIS_URL is set but the redis package is not installed.") from exc
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, value, ex=ttl)
+
+    def incr(self, key):
+        return self._client.incr(key)
+
+    def clear(self):
+        for pattern in ('feed:*', 'feedver:*'):
+            for key in self._client.scan_iter(pattern):
+                self._client.delete(key)
+
+
+class FeedCache:
+    def __init__(self, backend=None, lru_size=FEED_CACHE_LRU_SIZE, ttl=FEED_CACHE_TTL_SECONDS, enabled=FEED_CACHE_ENABLED):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.local = LRUCache(lru_size)
+        # Versions always live in the backend so every tier agrees on what is current.
+        self.backend = backend or MemoryBackend()
+        self.shared = backend is not None
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+
+    def version(self, group_id):
+        return int(self.backend.get(f'feedver:{group_id}') or 0)
+
+    def bump(self, group_ids):
+        for group_id in set(group_ids):
+            if group_id is not None:
+                self.backend.incr(f'feedver:{group_id}')
+
+    def key(self, group_id, *parts):
+        digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+        return f'feed:{group_id}:v{self.version(group_id)}:{digest}'
+
+    def get_or_build(self, group_id, parts, build):
+        """Return ``(body_bytes, hit)``; ``build()`` runs at most once per key per process at a time."""
+        if not self.enabled:
+            return build(), False
+        key = self.key(group_id, *parts)
+        body = self._lookup(key)
+        if body is not None:
+            record_cache('feed', True)
+            return body, True
+
+        with self._inflight_lock:
+            waiter = self._inflight.get(key)
+            if waiter is None:
+                self._inflight[key] = threading.Event()
+        if waiter is not None:
+            # Another thread is already rendering this feed: wait for it instead of re-running the queries.
+            waiter.wait(timeout=10)
+            body = self._lookup(key)
+            if body is not None:
+                record_cache('feed', True)
+                return body, True
+
+        record_cache('feed', False)
+        try:
+            body = build()
+            self.local.set(key, body, self.ttl)
+            if self.shared:
+                self.backend.set(key, body, self.ttl)
+            return body, False
+        finally:
+            if waiter is None:
+                with self._inflight_lock:
+                    self._inflight.pop(key).set()
+
+    def _lookup(self, key):
+        body = self.local.get(key)
+        if body is None and self.shared:
+            body = self.backend.get(key)
+            if body is not None:
+                self.local.set(key, body, self.ttl)
+        return body
+
+    def clear(self):
+        self.local.clear()
+        self.backend.clear()
+
+
+feed_cache = FeedCache(RedisBackend(FEED_CACHE_REDIS_URL) if FEED_CACHE_REDIS_URL else None)
@@ -0,0 +1,21 @@
+# app/extensions/http_client.py
+import os
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Connections kept open per host. Size it to the threads that may call out at once (ASGI_THREADS, gthread threads).
+HTTP_POOL_MAXSIZE = int(os.environ.get('HTTP_POOL_MAXSIZE', 32))
+
+
+def make_session(pool_maxsize=HTTP_POOL_MAXSIZE):
+    """A requests Session that reuses TCP/TLS connections across calls and threads."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared by every outbound call to Expo; a fresh requests.post() would pay a new TLS handshake each time.
+http_session = make_session()
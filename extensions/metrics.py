@@ -0,0 +1,161 @@
+# app/extensions/metrics.py
+import os
+import time
+from functools import wraps
+
+from flask import Response, g, request
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client import REGISTRY
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+# Under gunicorn, set PROMETHEUS_MULTIPROC_DIR so every worker writes its samples to a shared
+# directory and /metrics aggregates them (see gunicorn.conf.py).
+MULTIPROCESS = bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+if MULTIPROCESS:
+    # gunicorn.conf.py recreates it on start, but scripts and uvicorn import the app without that hook.
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+REQUEST_LATENCY = Histogram(
+    'groupo_http_request_duration_seconds', 'HTTP request latency.', ['method', 'route', 'status'],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    'groupo_http_requests_in_flight', 'Requests currently being handled.', multiprocess_mode='livesum',
+)
+DB_QUERY_LATENCY = Histogram(
+    'groupo_db_query_duration_seconds', 'SQL statement latency.',
+    buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'groupo_db_pool_connections_checked_out', 'Pooled DB connections currently in use.', multiprocess_mode='livesum',
+)
+DB_POOL_CONNECTIONS = Gauge(
+    'groupo_db_pool_connections_open', 'DB connections opened by the pool.', multiprocess_mode='livesum',
+)
+S3_LATENCY = Histogram('groupo_s3_operation_duration_seconds', 'S3 call latency.', ['operation'])
+S3_ERRORS = Counter('groupo_s3_errors_total', 'Failed S3 calls.', ['operation'])
+PUSH_LATENCY = Histogram('groupo_push_send_duration_seconds', 'Expo push request latency.')
+PUSH_MESSAGES = Counter('groupo_push_messages_total', 'Push messages by outcome.', ['result'])
+PASSWORD_HASH_LATENCY = Histogram(
+    'groupo_password_hash_duration_seconds', 'bcrypt hash/verify latency, including time queued for a worker.', ['operation'],
+)
+PASSWORD_HASH_REJECTED = Counter('groupo_password_hash_rejected_total', 'Hash/verify calls refused because every slot was taken.')
+CACHE_REQUESTS = Counter('groupo_cache_requests_total', 'Cache lookups; hit ratio = hit / (hit + miss).', ['cache', 'result'])
+
+
+def observe_s3(operation):
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            except Exception:
+                S3_ERRORS.labels(operation).inc()
+                raise
+            finally:
+                S3_LATENCY.labels(operation).observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+def record_cache(cache, hit):
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('metrics_query_start')
+    if starts:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; pop its start time so later ones pair up.
+    conn = context.connection
+    starts = conn.info.get('metrics_query_start') if conn is not None else None
+    if starts:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - starts.pop())
+
+
+@event.listens_for(Pool, 'connect')
+def _pool_connect(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.inc()
+
+
+@event.listens_for(Pool, 'close')
+def _pool_close(dbapi_connection, connection_record):
+    DB_POOL_CONNECTIONS.dec()
+
+
+@event.listens_for(Pool, 'checkout')
+def _pool_checkout(dbapi_connection, connection_record, connection_proxy):
+    DB_POOL_CHECKED_OUT.inc()
+
+
+@event.listens_for(Pool, 'checkin')
+def _pool_checkin(dbapi_connection, connection_record):
+    DB_POOL_CHECKED_OUT.dec()
+
+
+def mark_process_dead(pid=None):
+    """Drop this worker's live gauges from the shared directory; servers call it as a worker exits."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+def _scrape():
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def init_metrics(app):
+    @app.before_request
+    def _start_request_metrics():
+        g.metrics_started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+
+    def _observe(started, status):
+        REQUESTS_IN_FLIGHT.dec()
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REQUEST_LATENCY.labels(request.method, route, str(status)).observe(time.perf_counter() - started)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        if response.is_streamed and 'metrics_started' in g:
+            # Streamed bodies are produced after this hook; observe once the stream ends, at teardown.
+            g.metrics_status = response.status_code
+            return response
+        started = g.pop('metrics_started', None)
+        if started is not None:
+            _observe(started, response.status_code)
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc):
+        # Reached with metrics_started still set after a streamed response, or when a handler raised.
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return
+        status = g.pop('metrics_status', None)
+        if status is not None:
+            _observe(started, status)
+        else:
+            REQUESTS_IN_FLIGHT.dec()
+
+    @app.route('/metrics')
+    def metrics():
+        token = os.environ.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization', '') != f'Bearer {token}':
+            return Response('Unauthorized\n', status=401, mimetype='text/plain')
+        return Response(_scrape(), mimetype=CONTENT_TYPE_LATEST)
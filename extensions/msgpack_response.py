@@ -0,0 +1,72 @@
+# app/extensions/msgpack_response.py
+from collections import Counter
+
+from flask import request
+
+try:
+    import msgpack
+except ImportError:  # Optional: without it clients always get JSON.
+    msgpack = None
+
+MSGPACK_MIMETYPE = 'application/msgpack'
+# Ext type carrying an index into the payload's string table.
+STRING_REF = 1
+# Shorter strings cost no more inline than as a reference.
+MIN_INTERN_LENGTH = 4
+
+
+def wants_msgpack():
+    if msgpack is None:
+        return False
+    return request.accept_mimetypes.best_match(['application/json', MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+
+
+def _count_strings(value, counts):
+    if isinstance(value, str):
+        if len(value) >= MIN_INTERN_LENGTH:
+            counts[value] += 1
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _count_strings(key, counts)
+            _count_strings(item, counts)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _count_strings(item, counts)
+
+
+def _replace_strings(value, refs):
+    if isinstance(value, str):
+        return refs.get(value, value)
+    if isinstance(value, dict):
+        return {_replace_strings(k, refs): _replace_strings(v, refs) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_strings(v, refs) for v in value]
+    return value
+
+
+def packb(payload):
+    """Encode as two concatenated msgpack objects: the string table (an array), then the payload.
+
+    Strings (keys included) that repeat in the payload are written as ext type 1 whose body is the
+    msgpack-encoded index into the table, so a feed's usernames, album names and keys are sent once.
+    """
+    counts = Counter()
+    _count_strings(payload, counts)
+    strings = [s for s, n in counts.items() if n > 1]
+    refs = {s: msgpack.ExtType(STRING_REF, msgpack.packb(i)) for i, s in enumerate(strings)}
+    return msgpack.packb(strings) + msgpack.packb(_replace_strings(payload, refs))
+
+
+def unpackb(data):
+    """Inverse of packb, for Python clients and tests."""
+    strings = []
+
+    def ext_hook(code, body):
+        if code == STRING_REF:
+            return strings[msgpack.unpackb(body)]
+        return msgpack.ExtType(code, body)
+
+    unpacker = msgpack.Unpacker(ext_hook=ext_hook, strict_map_key=False)
+    unpacker.feed(data)
+    strings.extend(next(unpacker))
+    return next(unpacker)
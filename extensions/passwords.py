@@ -0,0 +1,65 @@
+# app/extensions/passwords.py
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt as _bcrypt
+
+from extensions.metrics import PASSWORD_HASH_LATENCY, PASSWORD_HASH_REJECTED
+
+# bcrypt cost factor (log2 rounds) for new hashes. Hashes with another cost are upgraded on the next login.
+BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+# bcrypt releases the GIL, so these threads hash in parallel with each other and with request threads.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+# Hashes running or queued at once; past this a request waits up to PASSWORD_HASH_WAIT_SECONDS, then gets a 503.
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', PASSWORD_HASH_WORKERS * 4))
+PASSWORD_HASH_WAIT_SECONDS = float(os.environ.get('PASSWORD_HASH_WAIT_SECONDS', 0.5))
+PASSWORD_HASH_RETRY_AFTER_SECONDS = 1
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Every hashing slot is taken; the caller should answer 503 with Retry-After."""
+
+
+def hash_cost(hashed):
+    """Cost factor of a ``$2b$12$...`` hash, or None if it is not a bcrypt hash."""
+    parts = (hashed or '').split('$')
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    def __init__(self, rounds=BCRYPT_LOG_ROUNDS, workers=PASSWORD_HASH_WORKERS,
+                 max_pending=PASSWORD_HASH_MAX_PENDING, wait_seconds=PASSWORD_HASH_WAIT_SECONDS):
+        self.rounds = rounds
+        self.wait_seconds = wait_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _run(self, operation, fn, *args):
+        started = time.perf_counter()
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            PASSWORD_HASH_REJECTED.inc()
+            raise PasswordHasherBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+            PASSWORD_HASH_LATENCY.labels(operation).observe(time.perf_counter() - started)
+
+    def hash(self, password):
+        salt = _bcrypt.gensalt(self.rounds)
+        return self._run('hash', _bcrypt.hashpw, password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, hashed, password):
+        if not hashed or hash_cost(hashed) is None:
+            return False
+        return self._run('verify', _bcrypt.checkpw, (password or '').encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed):
+        return hash_cost(hashed) != self.rounds
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,170 @@
+# app/extensions/profiler.py
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import abort, g, jsonify, request, send_from_directory
+
+# Profiling is opt-in: send "X-Profile: <PROFILE_TOKEN>" on a request, or set a sample rate.
+PROFILE_TOKEN = os.environ.get('PROFILE_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_DIR = os.environ.get('PROFILE_DIR', 'profiles')
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+PROFILE_KEEP = int(os.environ.get('PROFILE_KEEP', 50))
+
+_SLUG = re.compile(r'[^A-Za-z0-9]+')
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread at a fixed interval."""
+
+    def __init__(self, thread_id, interval_ms=None):
+        self.thread_id = thread_id
+        self.interval = (interval_ms or PROFILE_INTERVAL_MS) / 1000
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+                self.samples += 1
+
+    def collapsed(self):
+        """Brendan Gregg's folded format, one ``frame;frame;frame count`` line per stack."""
+        lines = []
+        for stack, count in self.stacks.most_common():
+            frames = ';'.join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+            lines.append(f"{frames} {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name):
+        frames, index = [], {}
+        samples, weights = [], []
+        interval_ms = self.interval * 1000
+        for stack, count in self.stacks.items():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(count * interval_ms)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+            "name": name,
+            "exporter": "groupo-profiler",
+        }
+
+
+def _profile_dir():
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    return os.path.abspath(PROFILE_DIR)
+
+
+def write_profile(profiler, label):
+    directory = _profile_dir()
+    stem = f"{datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')}_{_SLUG.sub('-', label).strip('-')}_{profiler.duration_ms:.0f}ms"
+    with open(os.path.join(directory, f"{stem}.folded"), 'w') as f:
+        f.write(profiler.collapsed())
+    with open(os.path.join(directory, f"{stem}.speedscope.json"), 'w') as f:
+        json.dump(profiler.speedscope(label), f)
+    _prune(directory)
+    return stem
+
+
+def _prune(directory):
+    stems = sorted({name.split('.', 1)[0] for name in os.listdir(directory)}, reverse=True)
+    for stem in stems[PROFILE_KEEP:]:
+        for suffix in ('.folded', '.speedscope.json'):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def _authorized(value):
+    return bool(PROFILE_TOKEN) and value == PROFILE_TOKEN
+
+
+def init_profiler(app):
+    @app.before_request
+    def _maybe_start_profiler():
+        if request.path.startswith('/admin/profiles'):
+            return
+        requested = _authorized(request.headers.get('X-Profile'))
+        if requested or (PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE):
+            g.profiler = SamplingProfiler(threading.get_ident()).start()
+
+    @app.after_request
+    def _write_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            route = request.url_rule.rule if request.url_rule else request.path
+            stem = write_profile(profiler, f"{request.method} {route}")
+            response.headers['X-Profile-Id'] = stem
+            print(f"[profile] wrote {stem} samples={profiler.samples}")
+        return response
+
+    @app.teardown_request
+    def _stop_profiler(exc):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+
+    def _require_admin():
+        auth = request.headers.get('Authorization', '').replace('Bearer ', '').strip()
+        if not _authorized(auth):
+            abort(404)
+
+    @app.route('/admin/profiles')
+    def list_profiles():
+        _require_admin()
+        directory = _profile_dir()
+        profiles = []
+        for name in sorted(os.listdir(directory), reverse=True):
+            path = os.path.join(directory, name)
+            profiles.append({"name": name, "size": os.path.getsize(path)})
+        return jsonify({"profiles": profiles})
+
+    @app.route('/admin/profiles/<path:name>')
+    def download_profile(name):
+        _require_admin()
+        return send_from_directory(_profile_dir(), name, as_attachment=True)
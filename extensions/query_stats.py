@@ -0,0 +1,154 @@
+# app/extensions/query_stats.py
+import os
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+# A statement shape repeated this many times in one request is reported as a likely N+1.
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('N_PLUS_ONE_THRESHOLD', 5))
+REQUEST_LOG_ENABLED = os.environ.get('REQUEST_LOG', 'true') != 'false'
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_collectors: ContextVar[tuple] = ContextVar('query_collectors', default=())
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+)\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """Normalize SQL so the same query with different parameters maps to one shape."""
+    shape = _STRING_LITERAL.sub('?', statement)
+    shape = _NUMBER_LITERAL.sub('?', shape)
+    shape = _PLACEHOLDER_LIST.sub('(?)', shape)
+    return _WHITESPACE.sub(' ', shape).strip()
+
+
+def _call_site():
+    # Innermost frame in project code, skipping this module and installed packages.
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(_PROJECT_ROOT) and filename != os.path.abspath(__file__) and 'site-packages' not in filename:
+            return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{frame.lineno} in {frame.name}"
+    return "unknown"
+
+
+class QueryCollector:
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes = Counter()
+        self.slow = []
+
+    def record(self, statement, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.shapes[statement_shape(statement)] += 1
+
+    def n_plus_one(self, threshold=None):
+        threshold = threshold or N_PLUS_ONE_THRESHOLD
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+
+@contextmanager
+def collect_queries():
+    """Collect every statement executed in this context; nests inside per-request collection."""
+    collector = QueryCollector()
+    token = _collectors.set(_collectors.get() + (collector,))
+    try:
+        yield collector
+    finally:
+        _collectors.reset(token)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    collectors = _collectors.get()
+    for collector in collectors:
+        collector.record(statement, duration_ms)
+    if duration_ms >= SLOW_QUERY_MS:
+        site = _call_site()
+        for collector in collectors:
+            collector.slow.append((duration_ms, site))
+        print(f"[sql] slow duration_ms={duration_ms:.1f} site={site} statement={_WHITESPACE.sub(' ', statement)[:500]}")
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; count it and drop its start time here.
+    conn = context.connection
+    starts = conn.info.get('query_start') if conn is not None else None
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+    for collector in _collectors.get():
+        collector.record(context.statement or '', duration_ms)
+
+
+def init_query_stats(app):
+    @app.before_request
+    def _start_query_stats():
+        g.request_started = time.perf_counter()
+        g.query_stats_token = _collectors.set(_collectors.get() + (QueryCollector(),))
+
+    def _report(collector, status):
+        total_ms = (time.perf_counter() - g.request_started) * 1000
+        suspects = collector.n_plus_one()
+        if REQUEST_LOG_ENABLED:
+            print(
+                f"[request] method={request.method} path={request.path} status={status} "
+                f"duration_ms={total_ms:.1f} queries={collector.count} db_ms={collector.total_ms:.1f} "
+                f"slow={len(collector.slow)} n_plus_one={len(suspects)}"
+            )
+            for shape, count in suspects:
+                print(f"[sql] n+1 suspect path={request.path} count={count} statement={shape[:300]}")
+        return total_ms
+
+    @app.after_request
+    def _finish_query_stats(response):
+        if response.is_streamed and 'query_stats_token' in g:
+            # A streamed body runs its SQL after this hook (stream_with_context keeps the request open),
+            # so the stats are reported at teardown once the stream ends. Headers are gone by then.
+            g.query_stats_status = response.status_code
+            return response
+        token = g.pop('query_stats_token', None)
+        if token is None:
+            return response
+        collector = _collectors.get()[-1]
+        _collectors.reset(token)
+        total_ms = _report(collector, response.status_code)
+        timing = f'db;dur={collector.total_ms:.1f};desc="{collector.count} queries", app;dur={total_ms:.1f}'
+        existing = response.headers.get('Server-Timing')
+        response.headers['Server-Timing'] = f"{existing}, {timing}" if existing else timing
+        return response
+
+    @app.teardown_request
+    def _discard_query_stats(exc):
+        # Reached with the token still set after a streamed response, or when a handler raised and
+        # after_request was skipped; either way don't leak the collector into the next request.
+        token = g.pop('query_stats_token', None)
+        if token is None:
+            return
+        collector = _collectors.get()[-1]
+        _collectors.reset(token)
+        status = g.pop('query_stats_status', None)
+        if status is not None:
+            _report(collector, status)
@@ -1,10 +1,20 @@
 import boto3
 import os
+from urllib.parse import urlparse, unquote
 from uuid import uuid4
+from functools import lru_cache
 from io import BytesIO
 from botocore.config import Config
 from werkzeug.utils import secure_filename
 from extensions.uploads import allowed_file
+from extensions.metrics import observe_s3
+from extensions.tracing import instrument_boto3_client
+
+# Connections each cached client keeps open to S3; match it to the threads that upload or presign at once.
+S3_MAX_POOL_CONNECTIONS = int(os.environ.get("S3_MAX_POOL_CONNECTIONS", 32))
+# Prepended to every uploaded key, so this app's objects can be told apart from anything else in the bucket.
+S3_UPLOAD_PREFIX = os.environ.get("S3_UPLOAD_PREFIX", "")
+
 
 def _get_s3():
     access_key = os.environ.get("AWS_ACCESS_KEY_ID")
@@ -13,17 +23,30 @@ def _get_s3():
     region = os.environ.get("AWS_REGION", "us-east-1")
     if not all([access_key, secret_key, bucket]):
         return None, None
+    # S3_ENDPOINT_URL points at an S3-compatible server (e.g. the load-test fake), which needs path-style URLs.
+    endpoint_url = os.environ.get("S3_ENDPOINT_URL")
+    return _s3_client(access_key, secret_key, region, endpoint_url), bucket
+
+
+@lru_cache(maxsize=4)
+def _s3_client(access_key, secret_key, region, endpoint_url):
+    # boto3 clients are thread-safe and slow to build; one per configuration keeps its connection pool warm.
     client = boto3.client(
         "s3",
         aws_access_key_id=access_key,
         aws_secret_access_key=secret_key,
         region_name=region,
-        endpoint_url=f"https://s3.{region}.amazonaws.com",
-        config=Config(signature_version="s3v4"),
+        endpoint_url=endpoint_url or f"https://s3.{region}.amazonaws.com",
+        config=Config(
+            signature_version="s3v4",
+            s3={"addressing_style": "path"} if endpoint_url else {},
+            max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+        ),
     )
-    return client, bucket
+    return instrument_boto3_client(client)
 
 
+@observe_s3('upload')
 def upload_file_to_s3(files):
     client, bucket = _get_s3()
     if not client or not bucket:
@@ -33,7 +56,7 @@ def upload_file_to_s3(files):
     for file in files:
         if file and allowed_file(file.filename):
             # Make filename unique to avoid collisions.
-            filename = f"{uuid4().hex}_{secure_filename(file.filename)}"
+            filename = f"{S3_UPLOAD_PREFIX}{uuid4().hex}_{secure_filename(file.filename)}"
             client.upload_fileobj(
                 file,
                 bucket,
@@ -51,6 +74,7 @@ def upload_file_to_s3(files):
     return keys
 
 
+@observe_s3('upload')
 def upload_bytes_to_s3(items):
     client, bucket = _get_s3()
     if not client or not bucket:
@@ -65,6 +89,7 @@ def upload_bytes_to_s3(items):
         if not allowed_file(filename):
             print(f"[upload] skipped disallowed extension: {filename}")
             continue
+        filename = f"{S3_UPLOAD_PREFIX}{filename}"
         client.upload_fileobj(
             BytesIO(data),
             bucket,
@@ -77,6 +102,7 @@ def upload_bytes_to_s3(items):
     return keys
 
 
+@observe_s3('presign')
 def presign_keys(keys, expires=None):
     client, bucket = _get_s3()
     if not client or not bucket:
@@ -93,3 +119,54 @@ def presign_keys(keys, expires=None):
         )
         urls.append(presigned)
     return urls
+
+
+@observe_s3('delete')
+def delete_keys(keys):
+    client, bucket = _get_s3()
+    if not client or not bucket:
+        raise RuntimeError("S3 not configured (missing AWS keys or bucket name).")
+    keys = list(keys)
+    deleted = 0
+    # DeleteObjects accepts at most 1000 keys per request.
+    for start in range(0, len(keys), 1000):
+        batch = keys[start:start + 1000]
+        resp = client.delete_objects(
+            Bucket=bucket,
+            Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+        )
+        errors = resp.get("Errors") or []
+        for err in errors:
+            print(f"[upload] S3 delete failed key={err.get('Key')} code={err.get('Code')}")
+        deleted += len(batch) - len(errors)
+    return deleted
+
+
+@observe_s3('list')
+def list_objects_page(start_after=None, max_keys=1000, prefix=""):
+    """Return one page of ``(key, last_modified)`` pairs under ``prefix`` in key order and whether more pages follow."""
+    client, bucket = _get_s3()
+    if not client or not bucket:
+        raise RuntimeError("S3 not configured (missing AWS keys or bucket name).")
+    params = {"Bucket": bucket, "MaxKeys": max_keys}
+    if prefix:
+        params["Prefix"] = prefix
+    if start_after:
+        params["StartAfter"] = start_after
+    resp = client.list_objects_v2(**params)
+    objects = [(obj["Key"], obj["LastModified"]) for obj in resp.get("Contents") or []]
+    return objects, bool(resp.get("IsTruncated"))
+
+
+def extract_key(url, bucket):
+    """Object key of a (presigned) S3 URL for ``bucket``, virtual-hosted or path style, else None."""
+    parsed = urlparse(url)
+    host = parsed.netloc
+    path = parsed.path.lstrip("/")
+    if not host or not path or not bucket:
+        return None
+    if host.startswith(f"{bucket}."):
+        return unquote(path)
+    if (host.startswith("s3.") or host.startswith("s3-")) and path.startswith(f"{bucket}/"):
+        return unquote(path[len(bucket) + 1:])
+    return None
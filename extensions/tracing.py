@@ -0,0 +1,206 @@
+# app/extensions/tracing.py
+"""Minimal span tracing with W3C ``traceparent`` propagation.
+
+Spans are written as OTLP-style JSON lines (traceId, spanId, parentSpanId,
+startTimeUnixNano, ...), so they can be replayed into an OpenTelemetry
+collector. The sampling decision is made once per trace at the root
+(head-based). Unsampled traces only cost a context-var lookup per span.
+"""
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+TRACE_SAMPLE_RATE = float(os.environ.get('TRACE_SAMPLE_RATE', 0))
+TRACE_EXPORTER = os.environ.get('TRACE_EXPORTER', 'file')  # file, console
+TRACE_FILE = os.environ.get('TRACE_FILE', 'traces.jsonl')
+
+_TRACEPARENT = re.compile(r'^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$')
+_current: ContextVar = ContextVar('current_span', default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'sampled', 'name', 'kind', 'attributes', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, name, trace_id, parent_id, sampled, kind='internal', attributes=None):
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.name = name
+        self.kind = kind
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key, value):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.sampled:
+            _export(self)
+
+    @property
+    def traceparent(self):
+        return f"00-{self.trace_id}-{self.span_id}-{'01' if self.sampled else '00'}"
+
+
+def _export(span):
+    record = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "parentSpanId": span.parent_id or "",
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": span.start_ns,
+        "endTimeUnixNano": span.end_ns,
+        "attributes": span.attributes,
+        "status": {"code": "ERROR", "message": span.error} if span.error else {"code": "OK"},
+    }
+    line = json.dumps(record, default=str)
+    with _export_lock:
+        if TRACE_EXPORTER == 'console':
+            print(f"[trace] {line}", file=sys.stderr)
+        else:
+            with open(TRACE_FILE, 'a') as f:
+                f.write(line + "\n")
+
+
+def parse_traceparent(value):
+    match = _TRACEPARENT.match((value or '').strip().lower())
+    if not match:
+        return None
+    return match.group(1), match.group(2), match.group(3) == '01'
+
+
+def current_span():
+    return _current.get()
+
+
+def current_traceparent():
+    span = _current.get()
+    return span.traceparent if span else None
+
+
+def begin_span(name, kind='internal', traceparent=None, **attributes):
+    """Start a span under the current one (or ``traceparent``) and make it current; returns (span, token)."""
+    parent = _current.get()
+    remote = parse_traceparent(traceparent) if traceparent else None
+    if remote:
+        trace_id, parent_id, sampled = remote
+    elif parent:
+        trace_id, parent_id, sampled = parent.trace_id, parent.span_id, parent.sampled
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+        sampled = random.random() < TRACE_SAMPLE_RATE
+    span = Span(name, trace_id, parent_id, sampled, kind, attributes if sampled else None)
+    return span, _current.set(span)
+
+
+def finish_span(span, token, error=None):
+    if error is not None and span.sampled:
+        span.error = f"{type(error).__name__}: {error}"
+    span.end()
+    _current.reset(token)
+
+
+@contextmanager
+def start_span(name, kind='internal', traceparent=None, **attributes):
+    span, token = begin_span(name, kind, traceparent, **attributes)
+    try:
+        yield span
+    except Exception as exc:
+        finish_span(span, token, exc)
+        raise
+    finish_span(span, token)
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    parent = _current.get()
+    if parent is None or not parent.sampled:
+        return
+    span, token = begin_span('db.query', kind='client', **{"db.system": conn.dialect.name, "db.statement": statement[:1000]})
+    conn.info.setdefault('trace_spans', []).append((span, token))
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get('trace_spans')
+    if spans:
+        finish_span(*spans.pop())
+
+
+@event.listens_for(Engine, 'handle_error')
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; end its span here so it stops being current.
+    conn = context.connection
+    spans = conn.info.get('trace_spans') if conn is not None else None
+    if spans:
+        finish_span(*spans.pop(), error=context.original_exception)
+
+
+def instrument_boto3_client(client):
+    """Wrap every API call made by a boto3 client in a span."""
+    def before_call(model, context, **kwargs):
+        parent = _current.get()
+        if parent is not None and parent.sampled:
+            context['trace_span'] = begin_span(
+                f"aws.{model.service_model.service_name}.{model.name}", kind='client',
+                **{"rpc.system": "aws-api", "rpc.method": model.name},
+            )
+
+    def after_call(context, **kwargs):
+        if 'trace_span' in context:
+            finish_span(*context.pop('trace_span'))
+
+    def after_call_error(context, exception=None, **kwargs):
+        if 'trace_span' in context:
+            finish_span(*context.pop('trace_span'), error=exception)
+
+    client.meta.events.register('before-call.*.*', before_call)
+    client.meta.events.register('after-call.*.*', after_call)
+    client.meta.events.register('after-call-error.*.*', after_call_error)
+    return client
+
+
+def init_tracing(app):
+    @app.before_request
+    def _start_request_span():
+        g.trace_span = begin_span(
+            f"HTTP {request.method}", kind='server', traceparent=request.headers.get('traceparent'),
+            **{"http.method": request.method, "http.target": request.path},
+        )
+
+    @app.after_request
+    def _tag_request_span(response):
+        trace = g.get('trace_span')
+        if trace:
+            span = trace[0]
+            route = request.url_rule.rule if request.url_rule else 'unmatched'
+            span.name = f"HTTP {request.method} {route}"
+            span.set_attribute("http.route", route)
+            span.set_attribute("http.status_code", response.status_code)
+            response.headers['traceparent'] = span.traceparent
+        return response
+
+    @app.teardown_request
+    def _end_request_span(exc):
+        trace = g.pop('trace_span', None)
+        if trace:
+            finish_span(*trace, error=exc)
@@ -27,3 +27,15 @@ def save_files(files, upload_dir):
             file.save(path)
             urls.append(url_for('uploaded_file', filename=filename))
     return urls
+
+
+def delete_files(filenames, upload_dir):
+    deleted = 0
+    for filename in filenames:
+        path = os.path.join(upload_dir, secure_filename(filename))
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            continue
+    return deleted
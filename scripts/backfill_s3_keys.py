@@ -1,35 +1,15 @@
 #!/usr/bin/env python3
 import argparse
 import os
-from urllib.parse import urlparse, unquote
 
 from app import app, db, Post
+from extensions.s3_upload import extract_key
 
 
 def is_http_url(value: str) -> bool:
     return value.startswith("http://") or value.startswith("https://")
 
 
-def extract_key(url: str, bucket: str) -> str | None:
-    parsed = urlparse(url)
-    host = parsed.netloc
-    path = parsed.path.lstrip("/")
-    if not host or not path:
-        return None
-
-    if bucket and host.startswith(f"{bucket}."):
-        return unquote(path)
-
-    if host.startswith("s3.") or host.startswith("s3-") or host.startswith("s3."):
-        if bucket and path.startswith(f"{bucket}/"):
-            return unquote(path[len(bucket) + 1 :])
-
-    if ".s3." in host and bucket and host.startswith(f"{bucket}."):
-        return unquote(path)
-
-    return None
-
-
 def normalize_image_urls(image_urls: str, bucket: str) -> tuple[str, int]:
     if not image_urls:
         return image_urls, 0
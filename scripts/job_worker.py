@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+import argparse
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+from app import app, db, Job, run_pending_jobs, requeue_stale_jobs
+
+
+def work(worker_id: str, poll_interval: float, batch: int, burst: bool) -> None:
+    last_stale_check = 0.0
+    while True:
+        with app.app_context():
+            try:
+                if time.monotonic() - last_stale_check > 60:
+                    requeued = requeue_stale_jobs()
+                    if requeued:
+                        print(f"[jobs] {worker_id} requeued stale jobs={requeued}")
+                    last_stale_check = time.monotonic()
+                processed = run_pending_jobs(worker_id, limit=batch)
+            except Exception as exc:
+                print(f"[jobs] {worker_id} loop error exc={exc}")
+                processed = 0
+            finally:
+                db.session.remove()
+        if not processed:
+            if burst:
+                return
+            time.sleep(poll_interval)
+
+
+def _process_main(worker_id: str, poll_interval: float, batch: int, burst: bool) -> None:
+    # Connections must not be shared with the parent process.
+    with app.app_context():
+        db.engine.dispose()
+    work(worker_id, poll_interval, batch, burst)
+
+
+def retry_dead() -> int:
+    with app.app_context():
+        count = Job.query.filter_by(status='dead').update(
+            {Job.status: 'queued', Job.attempts: 0, Job.finished_at: None}, synchronize_session=False
+        )
+        db.session.commit()
+    print(f"[jobs] requeued dead jobs={count}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run background jobs from the database queue.")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("JOB_WORKER_CONCURRENCY", 2)))
+    parser.add_argument("--mode", choices=("threads", "processes"), default="threads")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when the queue is empty.")
+    parser.add_argument("--batch", type=int, default=10, help="Jobs claimed per poll by each worker.")
+    parser.add_argument("--burst", action="store_true", help="Exit once the queue is drained.")
+    parser.add_argument("--retry-dead", action="store_true", help="Requeue dead-lettered jobs and exit.")
+    args = parser.parse_args()
+
+    if args.retry_dead:
+        return retry_dead()
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    worker_ids = [f"{prefix}:{i}" for i in range(args.concurrency)]
+    if args.mode == "processes":
+        ctx = multiprocessing.get_context("spawn")
+        workers = [
+            ctx.Process(target=_process_main, args=(wid, args.poll_interval, args.batch, args.burst))
+            for wid in worker_ids
+        ]
+    else:
+        workers = [
+            threading.Thread(target=work, args=(wid, args.poll_interval, args.batch, args.burst), daemon=True)
+            for wid in worker_ids
+        ]
+    print(f"[jobs] starting {len(workers)} {args.mode} workers")
+    for w in workers:
+        w.start()
+    try:
+        for w in workers:
+            w.join()
+    except KeyboardInterrupt:
+        print("[jobs] shutting down")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+import argparse
+
+from app import app, run_media_gc
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Delete uploaded media no longer referenced by any post.")
+    parser.add_argument("--max-pages", type=int, default=0, help="Stop after this many pages and resume next run (0 = no limit).")
+    parser.add_argument("--grace-hours", type=float, default=None, help="Keep unreferenced objects younger than this (defaults to MEDIA_GC_GRACE_SECONDS).")
+    parser.add_argument("--dry-run", action="store_true", help="Report garbage without deleting anything.")
+    args = parser.parse_args()
+
+    grace_seconds = int(args.grace_hours * 3600) if args.grace_hours is not None else None
+    with app.app_context():
+        stats = run_media_gc(max_pages=args.max_pages or None, grace_seconds=grace_seconds, dry_run=args.dry_run)
+    mode = "DRY-RUN" if args.dry_run else "APPLY"
+    print(
+        f"[{mode}] pages={stats['pages']} marked={stats['marked']} scanned={stats['scanned']} "
+        f"garbage={stats['garbage']} phase={stats['phase']}"
+    )
+    if stats["unresolved"]:
+        print("S3 was not swept: some posts still hold full S3 URLs. Run scripts/backfill_s3_keys.py --apply first.")
+    if stats["phase"] != "idle":
+        print("Run again to continue from the checkpoint.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from app import app, db, flush_pending_notifications, NOTIFY_COALESCE_SECONDS
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Drain the coalesced like/comment notification buffer.")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between flushes.")
+    parser.add_argument("--once", action="store_true", help="Flush due notifications once and exit.")
+    args = parser.parse_args()
+
+    if NOTIFY_COALESCE_SECONDS <= 0:
+        print("[notify] NOTIFY_COALESCE_SECONDS is 0; pushes are sent inline and nothing is buffered.")
+
+    while True:
+        with app.app_context():
+            try:
+                sent = flush_pending_notifications()
+                if sent:
+                    print(f"[notify] flushed digests={sent}")
+            finally:
+                db.session.remove()
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import argparse
+
+from app import app, db, AccountDeletion, User, enqueue_job, purge_account
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Show or resume account deletions.")
+    parser.add_argument("--resume", action="store_true", help="Resume unfinished deletions in this process.")
+    parser.add_argument("--enqueue", action="store_true", help="Re-enqueue unfinished deletions for the job worker.")
+    parser.add_argument("--batch-size", type=int, default=0, help="Rows per batch (0 = ACCOUNT_PURGE_BATCH_SIZE).")
+    args = parser.parse_args()
+
+    with app.app_context():
+        pending = AccountDeletion.query.filter(AccountDeletion.status != 'done').order_by(AccountDeletion.created_at.asc()).all()
+        for record in pending:
+            print(
+                f"[purge] user_id={record.user_id} status={record.status} stage={record.stage or '-'} "
+                f"rows={record.rows_deleted} media={record.media_deleted} updated_at={record.updated_at.isoformat()}"
+            )
+        for record in pending:
+            if args.resume:
+                purge_account(record.user_id, batch_size=args.batch_size or None)
+            elif args.enqueue:
+                # The original job may already be done or dead, so resume under a fresh key.
+                key = f"purge_account:{record.user_id}:{record.updated_at.isoformat()}"
+                owner = db.session.get(User, record.user_id)
+                enqueue_job('purge_account', {"user_id": record.user_id}, idempotency_key=key, user=owner)
+        print(f"[purge] unfinished={len(pending)}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
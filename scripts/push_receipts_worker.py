@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+import argparse
+import time
+
+from app import app, db, process_push_receipts
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Poll Expo push receipts and prune dead device tokens.")
+    parser.add_argument("--interval", type=float, default=300.0, help="Seconds between receipt polls.")
+    parser.add_argument("--once", action="store_true", help="Process ready receipts once and exit.")
+    args = parser.parse_args()
+
+    while True:
+        with app.app_context():
+            try:
+                stats = process_push_receipts()
+            finally:
+                db.session.remove()
+        if stats["checked"] or stats["expired"]:
+            rate = f"{stats['success_rate']:.1%}" if stats["success_rate"] is not None else "n/a"
+            print(
+                f"[notify] receipts checked={stats['checked']} ok={stats['ok']} error={stats['error']} "
+                f"pruned={stats['pruned']} disabled={stats['disabled']} expired={stats['expired']} success_rate={rate}"
+            )
+        if args.once:
+            return 0
+        time.sleep(args.interval)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,42 @@
+import os
+from contextlib import contextmanager
+
+import pytest
+
+# Keep the test suite off the local development database.
+os.environ.setdefault('SQLALCHEMY_DATABASE_URI', 'sqlite:///:memory:')
+# Minimum bcrypt cost: hashing is exercised, not its strength.
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '4')
+
+from app import db, User  # noqa: E402
+from extensions.feed_cache import feed_cache  # noqa: E402
+from extensions.query_stats import collect_queries  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _clear_feed_cache():
+    # Every test recreates the schema, so ids (and cache keys) repeat across tests.
+    feed_cache.clear()
+
+
+@pytest.fixture
+def make_user():
+    """``make_user('alice')`` adds a user whose API token is ``alice-token`` to the session; the caller commits."""
+    def make(username, phone_number=None):
+        user = User(username=username, password='x', first_name=username.title(), last_name='Test',
+                    api_token=f'{username}-token', phone_number=phone_number)
+        db.session.add(user)
+        return user
+    return make
+
+
+@pytest.fixture
+def assert_max_queries():
+    """``with assert_max_queries(5): client.get(...)`` fails if more than 5 SQL statements run."""
+    @contextmanager
+    def check(limit):
+        with collect_queries() as collector:
+            yield collector
+        shapes = "\n".join(f"  {count}x {shape}" for shape, count in collector.shapes.most_common())
+        assert collector.count <= limit, f"{collector.count} queries executed (max {limit}):\n{shapes}"
+    return check
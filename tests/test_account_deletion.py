@@ -0,0 +1,103 @@
+import pytest
+import app as app_module
+from app import (
+    app, db, User, Group, Post, Comment, PostLike, PostAlbum, DeviceToken, AccountDeletion, Job,
+    run_pending_jobs, purge_account,
+)
+
+
+@pytest.fixture
+def seeded(monkeypatch, tmp_path, make_user):
+    app.config['TESTING'] = True
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', True)
+    monkeypatch.setattr(app_module, 'ACCOUNT_PURGE_BATCH_SIZE', 2)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        leaving, friend = make_user('leaving'), make_user('friend')
+        album = Group(name='Album', kind='album')
+        album.members.extend([leaving, friend])
+        db.session.add(album)
+        db.session.flush()
+        for i in range(5):
+            (tmp_path / f'photo{i}.jpg').write_bytes(b'x')
+            post = Post(content=f'post {i}', user_id=leaving.id, group_id=album.id, image_urls=f'/uploads/photo{i}.jpg')
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+            db.session.add(PostLike(post_id=post.id, user_id=friend.id))
+            db.session.add_all([Comment(content='hi', user_id=friend.id, post_id=post.id) for _ in range(3)])
+        friends_post = Post(content='mine', user_id=friend.id, group_id=album.id)
+        db.session.add(friends_post)
+        db.session.flush()
+        db.session.add(Comment(content='bye', user_id=leaving.id, post_id=friends_post.id))
+        db.session.add(DeviceToken(user_id=leaving.id, token='tok'))
+        db.session.commit()
+        yield {"client": app.test_client(), "user_id": leaving.id, "tmp_path": tmp_path}
+
+
+def test_delete_revokes_immediately_and_purges_in_background(seeded):
+    client, user_id = seeded["client"], seeded["user_id"]
+    rv = client.delete('/api/me', headers={'Authorization': 'Bearer leaving-token'})
+    assert rv.status_code == 200
+    assert client.get('/api/me', headers={'Authorization': 'Bearer leaving-token'}).status_code == 401
+    # Nothing has been purged yet.
+    assert Post.query.filter_by(user_id=user_id).count() == 5
+
+    job = Job.query.filter_by(name='purge_account').one()
+    assert job.user_id == user_id
+
+    run_pending_jobs('test')
+
+    assert db.session.get(User, user_id) is None
+    db.session.refresh(job)
+    assert job.status == 'done' and job.user_id is None
+    assert Post.query.filter_by(user_id=user_id).count() == 0
+    assert Comment.query.count() == 0
+    assert PostLike.query.count() == 0
+    assert PostAlbum.query.count() == 0
+    assert DeviceToken.query.count() == 0
+    assert list(seeded["tmp_path"].iterdir()) == []
+    record = db.session.get(AccountDeletion, user_id)
+    assert record.status == 'done'
+    assert record.media_deleted == 5
+
+
+def test_delete_without_queue_purges_inline_up_to_a_bound(seeded, monkeypatch, capsys):
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', False)
+    monkeypatch.setattr(app_module, 'ACCOUNT_PURGE_INLINE_BATCHES', 4)
+    client, user_id = seeded["client"], seeded["user_id"]
+    assert client.delete('/api/me', headers={'Authorization': 'Bearer leaving-token'}).status_code == 200
+    assert db.session.get(User, user_id).deleted_at is not None
+    record = db.session.get(AccountDeletion, user_id)
+    assert record.status == 'running'
+    assert 0 < record.rows_deleted
+    assert 'WARNING' in capsys.readouterr().out
+
+    purge_account(user_id)
+    assert db.session.get(User, user_id) is None
+
+
+def test_delete_without_queue_purges_small_accounts_inline(seeded, monkeypatch):
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', False)
+    client, user_id = seeded["client"], seeded["user_id"]
+    assert client.delete('/api/me', headers={'Authorization': 'Bearer leaving-token'}).status_code == 200
+    db.session.expire_all()
+    assert db.session.get(User, user_id) is None
+    assert Post.query.filter_by(user_id=user_id).count() == 0
+    assert db.session.get(AccountDeletion, user_id).status == 'done'
+
+
+def test_purge_resumes_from_recorded_stage(seeded):
+    user_id = seeded["user_id"]
+    db.session.add(AccountDeletion(user_id=user_id, status='running', stage='posts'))
+    db.session.commit()
+    # Earlier stages are skipped, so the comments on the user's posts must already be gone.
+    Comment.query.filter(Comment.post_id.in_(db.session.query(Post.id).filter_by(user_id=user_id))).delete(synchronize_session=False)
+    PostLike.query.delete()
+    PostAlbum.query.delete()
+    db.session.commit()
+    purge_account(user_id)
+    assert Post.query.filter_by(user_id=user_id).count() == 0
+    assert db.session.get(AccountDeletion, user_id).status == 'done'
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from app import app, db, User, Group, Post, PostAlbum
+from extensions.asgi import WSGIAdapter
+
+
+@pytest.fixture
+def album_id():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice = User(username='alice', password='x', first_name='Alice', last_name='Test', api_token='alice-token')
+        album = Group(name='Trip', kind='album')
+        album.members.append(alice)
+        db.session.add(album)
+        db.session.flush()
+        for i in range(3):
+            post = Post(content=f'post {i}', user_id=alice.id, group_id=album.id)
+            db.session.add(post)
+            db.session.flush()
+            db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.commit()
+        yield album.id
+
+
+def call(asgi_app, method, path, body=b'', headers=()):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query.encode(), 'http_version': '1.1',
+        'headers': [(b'host', b'testserver'), (b'authorization', b'Bearer alice-token'),
+                    (b'content-length', str(len(body)).encode()), *headers],
+        'server': ('testserver', 80), 'client': ('127.0.0.1', 5000),
+    }
+    incoming = [{'type': 'http.request', 'body': body[:10], 'more_body': True}, {'type': 'http.request', 'body': body[10:]}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(asgi_app(scope, receive, send))
+    start, chunks = sent[0], [m for m in sent[1:]]
+    assert not chunks[-1].get('more_body', False)
+    return start['status'], dict(start['headers']), chunks
+
+
+def test_feed_over_asgi_matches_wsgi(album_id):
+    expected = app.test_client().get(f'/api/albums/{album_id}/posts', headers={'Authorization': 'Bearer alice-token'}).get_json()
+    status, headers, chunks = call(WSGIAdapter(app, threads=2), 'GET', f'/api/albums/{album_id}/posts')
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert json.loads(b''.join(c['body'] for c in chunks)) == expected
+
+
+def test_json_body_and_streamed_response(album_id):
+    asgi_app = WSGIAdapter(app, threads=2)
+    body = json.dumps({'content': 'sent over asgi'}).encode()
+    status, _, _ = call(asgi_app, 'POST', f'/api/albums/{album_id}/posts', body, [(b'content-type', b'application/json')])
+    assert status == 200
+
+    status, _, chunks = call(asgi_app, 'GET', f'/api/albums/{album_id}/posts?stream=true&fields=id,content')
+    assert status == 200
+    assert len([c for c in chunks if c['body']]) > 1
+    posts = json.loads(b''.join(c['body'] for c in chunks))['posts']
+    assert posts[0]['content'] == 'sent over asgi' and len(posts) == 4
+
+
+def test_lifespan_runs_hooks():
+    calls = []
+    asgi_app = WSGIAdapter(app, threads=1, on_startup=[lambda: calls.append('up')], on_shutdown=[lambda: calls.append('down')])
+    incoming = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        sent.append(message['type'])
+
+    asyncio.run(asgi_app({'type': 'lifespan'}, receive, send))
+    assert calls == ['up', 'down']
+    assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+
+def test_worker_drops_its_gauges_on_shutdown(monkeypatch):
+    import asgi
+    from extensions import metrics
+    dead = []
+    monkeypatch.setattr(metrics, 'MULTIPROCESS', True)
+    monkeypatch.setattr(metrics.multiprocess, 'mark_process_dead', dead.append)
+    assert metrics.mark_process_dead in asgi.app.on_shutdown
+    metrics.mark_process_dead()
+    assert dead == [os.getpid()]
@@ -0,0 +1,109 @@
+import pytest
+import app as app_module
+import extensions.batch as batch_module
+from app import app, db, User, Group, Post, PostAlbum
+from extensions.passwords import PasswordHasher
+from extensions.query_stats import _collectors, collect_queries
+
+
+@pytest.fixture
+def client(make_user):
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice, bob = make_user('alice'), make_user('bob')
+        group = Group(name='Family', kind='group')
+        group.members.extend([alice, bob])
+        db.session.add(group)
+        db.session.flush()
+        album = Group(name='Trip', kind='album', owner_id=alice.id, parent_group_id=group.id)
+        album.members.extend([alice, bob])
+        db.session.add(album)
+        db.session.flush()
+        post = Post(content='hello', user_id=alice.id, group_id=album.id)
+        db.session.add(post)
+        db.session.flush()
+        db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.commit()
+        yield app.test_client(), group.id, album.id, post.id
+
+
+HEADERS = {'Authorization': 'Bearer alice-token'}
+
+
+def test_batch_runs_ops_in_order_with_one_auth_lookup(client):
+    c, group_id, album_id, post_id = client
+    ops = [
+        {'id': 'me', 'path': '/api/me'},
+        {'id': 'feed', 'path': f'/api/albums/{album_id}/posts?fields=id,likes'},
+        {'id': 'like', 'method': 'POST', 'path': f'/api/posts/{post_id}/like'},
+        {'id': 'comment', 'method': 'POST', 'path': f'/api/posts/{post_id}/comment', 'body': {'comment': 'hi'}},
+        {'id': 'missing', 'path': '/api/posts/999999/comments'},
+    ]
+    with collect_queries() as collector:
+        rv = c.post('/api/batch', json={'ops': ops}, headers=HEADERS)
+    assert rv.status_code == 200
+    results = {r['id']: r for r in rv.get_json()['results']}
+    assert [r['id'] for r in rv.get_json()['results']] == ['me', 'feed', 'like', 'comment', 'missing']
+    assert results['me']['body']['user']['username'] == 'alice'
+    assert results['feed']['body']['posts'] == [{'id': post_id, 'likes': 0}]
+    assert results['like']['status'] == 200
+    assert results['comment']['body']['comment_count'] == 1
+    assert results['missing']['status'] == 404
+    auth_lookups = [shape for shape in collector.shapes if 'WHERE user.api_token' in shape]
+    assert sum(collector.shapes[shape] for shape in auth_lookups) == 1
+
+
+def test_parallel_reads_match_sequential(client):
+    c, group_id, album_id, _ = client
+    ops = [{'path': '/api/groups'}, {'path': f'/api/albums/{album_id}/posts'}, {'path': f'/api/groups/{group_id}/members'}]
+    sequential = c.post('/api/batch', json={'ops': ops}, headers=HEADERS).get_json()['results']
+    parallel = c.post('/api/batch', json={'ops': ops, 'parallel': True}, headers=HEADERS).get_json()['results']
+    assert [r['status'] for r in parallel] == [200, 200, 200]
+    assert parallel == sequential
+
+
+def test_batch_limits(client, monkeypatch):
+    c, _, _, _ = client
+    monkeypatch.setattr(batch_module, 'BATCH_MAX_OPS', 2)
+    assert c.post('/api/batch', json={'ops': [{'path': '/api/me'}] * 3}, headers=HEADERS).status_code == 413
+    assert c.post('/api/batch', json={'ops': [{'path': '/api/batch'}]}, headers=HEADERS).status_code == 400
+    assert c.post('/api/batch', json={'ops': [{'path': '/groups'}]}, headers=HEADERS).status_code == 400
+    assert c.post('/api/batch', json={'ops': []}, headers=HEADERS).status_code == 400
+    assert c.post('/api/batch', json={'ops': [{'path': '/api/me'}]}).status_code == 401
+
+    monkeypatch.setattr(batch_module, 'BATCH_MAX_QUERIES', 0)
+    results = c.post('/api/batch', json={'ops': [{'path': '/api/groups'}, {'path': '/api/me'}]}, headers=HEADERS).get_json()['results']
+    assert [r['status'] for r in results] == [200, 503]
+
+
+def test_query_budget_covers_every_op(client, monkeypatch):
+    c, _, _, _ = client
+    with collect_queries() as single:
+        c.post('/api/batch', json={'ops': [{'path': '/api/groups'}]}, headers=HEADERS)
+    # Enough for the first op and the auth lookup, far short of ten ops.
+    monkeypatch.setattr(batch_module, 'BATCH_MAX_QUERIES', single.count)
+    rv = c.post('/api/batch', json={'ops': [{'path': '/api/groups'}] * 10}, headers=HEADERS)
+    statuses = [r['status'] for r in rv.get_json()['results']]
+    assert statuses[0] == 200 and statuses[-1] == 503
+    # The batch request itself still finishes normally.
+    assert 'Server-Timing' in rv.headers
+    assert _collectors.get() == ()
+
+
+def test_ops_use_error_handlers(client, monkeypatch):
+    c, _, _, _ = client
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, wait_seconds=0.01)
+    monkeypatch.setattr(app_module, 'password_hasher', hasher)
+    User.query.filter_by(username='alice').one().password = hasher.hash('x')
+    db.session.commit()
+    body = {'current_password': 'x', 'new_password': 'battery staple'}
+    hasher._slots.acquire()
+    try:
+        rv = c.post('/api/batch', json={'ops': [{'method': 'POST', 'path': '/api/me/password', 'body': body}]}, headers=HEADERS)
+    finally:
+        hasher._slots.release()
+    result = rv.get_json()['results'][0]
+    assert result['status'] == 503
+    assert 'try again' in result['body']['error']
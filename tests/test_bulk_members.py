@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+import app as app_module
+from app import app, db, Group
+from extensions.query_stats import collect_queries
+
+
+HEADERS = {'Authorization': 'Bearer alice-token'}
+
+
+@pytest.fixture
+def client(make_user):
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice = make_user('alice', '5550000001')
+        bob = make_user('bob', '5550000002')
+        make_user('carol', '5550000003')
+        make_user('gone', '5550000004').deleted_at = datetime.utcnow()
+        for i in range(40):
+            make_user(f'guest{i}', f'55510{i:05d}')
+        group = Group(name='Team', kind='group')
+        group.members.extend([alice, bob])
+        db.session.add(group)
+        db.session.flush()
+        first = Group(name='First', kind='album', parent_group_id=group.id)
+        first.members.append(alice)
+        second = Group(name='Second', kind='album', parent_group_id=group.id)
+        second.members.extend([alice, bob])
+        db.session.add_all([first, second])
+        db.session.commit()
+        yield app.test_client()
+
+
+def _group(name):
+    return Group.query.filter_by(name=name).one()
+
+
+def _usernames(group):
+    db.session.expire_all()
+    return sorted(m.username for m in _group(group).members)
+
+
+def test_group_bulk_add_reports_each_entry(client):
+    group = _group('Team')
+    rv = client.post(f'/api/groups/{group.id}/members/bulk', headers=HEADERS, json={
+        'usernames': ['carol', 'bob', 'nobody', 'gone', '', 7],
+        'phone_numbers': ['(555) 000-0003', '555-100-0000', '123'],
+    })
+    assert rv.status_code == 200
+    body = rv.get_json()
+    assert [(r.get('username', r.get('phone_number')), r['status']) for r in body['results']] == [
+        ('carol', 'added'), ('bob', 'already_member'), ('nobody', 'not_found'), ('gone', 'not_found'),
+        ('', 'invalid'), (7, 'invalid'),
+        ('(555) 000-0003', 'added'), ('555-100-0000', 'added'), ('123', 'invalid'),
+    ]
+    assert body['added'] == 2
+    assert _usernames('Team') == ['alice', 'bob', 'carol', 'guest0']
+    assert _usernames('First') == ['alice', 'carol', 'guest0']
+    assert _usernames('Second') == ['alice', 'bob', 'carol', 'guest0']
+
+
+def test_forty_members_in_constant_queries(client):
+    group = _group('Team')
+    with collect_queries() as collector:
+        rv = client.post(f'/api/groups/{group.id}/members/bulk', headers=HEADERS, json={
+            'usernames': [f'guest{i}' for i in range(20)],
+            'phone_numbers': [f'55510{i:05d}' for i in range(20, 40)],
+        })
+    assert rv.status_code == 200
+    assert rv.get_json()['added'] == 40
+    inserts = [shape for shape in collector.shapes if shape.startswith('INSERT')]
+    assert len(inserts) == 1
+    assert collector.count <= 8
+    assert len(_usernames('First')) == 41
+
+
+def test_album_bulk_add(client):
+    album = _group('First')
+    rv = client.post(f'/api/albums/{album.id}/members/bulk', headers=HEADERS, json={'usernames': ['bob', 'alice']})
+    assert [r['status'] for r in rv.get_json()['results']] == ['added', 'already_member']
+    assert _usernames('First') == ['alice', 'bob']
+    assert _usernames('Team') == ['alice', 'bob']
+
+
+def test_bulk_add_validation(client, monkeypatch):
+    group, album = _group('Team'), _group('First')
+    url = f'/api/groups/{group.id}/members/bulk'
+    assert client.post(url, headers=HEADERS, json={}).status_code == 400
+    assert client.post(url, headers=HEADERS, json={'usernames': 'carol'}).status_code == 400
+    assert client.post(f'/api/groups/{album.id}/members/bulk', headers=HEADERS, json={'usernames': ['carol']}).status_code == 400
+    assert client.post(f'/api/albums/{group.id}/members/bulk', headers=HEADERS, json={'usernames': ['carol']}).status_code == 400
+    assert client.post(url, headers={'Authorization': 'Bearer carol-token'}, json={'usernames': ['carol']}).status_code == 403
+    monkeypatch.setattr(app_module, 'MEMBERS_BULK_MAX', 2)
+    assert client.post(url, headers=HEADERS, json={'usernames': ['carol'], 'phone_numbers': ['1', '2']}).status_code == 413
@@ -0,0 +1,87 @@
+import pytest
+import app as app_module
+from app import app, db, User, Group, Post, PostAlbum, Comment, purge_account, _backfill_comment_counts
+
+
+def auth(name):
+    return {'Authorization': f'Bearer {name}-token'}
+
+
+@pytest.fixture
+def client(monkeypatch, make_user):
+    app.config['TESTING'] = True
+    monkeypatch.setattr(app_module, 'COMMENT_PREVIEW_COUNT', 3)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice, bob, _ = make_user('alice'), make_user('bob'), make_user('eve')
+        album = Group(name='Trip', kind='album', owner_id=None)
+        album.members.extend([alice, bob])
+        db.session.add(album)
+        db.session.flush()
+        post = Post(content='hello', user_id=alice.id, group_id=album.id)
+        db.session.add(post)
+        db.session.flush()
+        db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.commit()
+        yield app.test_client(), album.id, post.id
+
+
+def _comment(c, post_id, text, user='bob'):
+    rv = c.post(f'/api/posts/{post_id}/comment', json={'comment': text}, headers=auth(user))
+    assert rv.status_code == 200
+    return rv.get_json()
+
+
+def test_comment_count_is_maintained(client):
+    c, _, post_id = client
+    first = _comment(c, post_id, 'one')
+    assert _comment(c, post_id, 'two')['comment_count'] == 2
+    c.delete(f"/api/comments/{first['comment']['id']}", headers=auth('bob'))
+    assert db.session.get(Post, post_id).comment_count == 1
+
+
+def test_feed_embeds_only_latest_comments(client):
+    c, album_id, post_id = client
+    for i in range(5):
+        _comment(c, post_id, f'c{i}')
+    post = c.get(f'/api/albums/{album_id}/posts', headers=auth('alice')).get_json()['posts'][0]
+    assert post['comment_count'] == 5
+    assert [cm['content'] for cm in post['comments']] == ['c2', 'c3', 'c4']
+
+
+def test_comments_endpoint_paginates_newest_first(client):
+    c, _, post_id = client
+    for i in range(7):
+        _comment(c, post_id, f'c{i}')
+    seen, cursor = [], None
+    while True:
+        query = f'?limit=3&before_id={cursor}' if cursor else '?limit=3'
+        page = c.get(f'/api/posts/{post_id}/comments{query}', headers=auth('alice')).get_json()
+        assert page['comment_count'] == 7
+        seen.append([cm['content'] for cm in page['comments']])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+    assert seen == [['c6', 'c5', 'c4'], ['c3', 'c2', 'c1'], ['c0']]
+
+
+def test_comments_endpoint_requires_membership(client):
+    c, _, post_id = client
+    assert c.get(f'/api/posts/{post_id}/comments', headers=auth('eve')).status_code == 403
+
+
+def test_purge_and_backfill_keep_counts_in_step(client):
+    c, _, post_id = client
+    _comment(c, post_id, 'mine', user='alice')
+    _comment(c, post_id, 'bye')
+    _comment(c, post_id, 'bye again')
+    purge_account(User.query.filter_by(username='bob').one().id)
+    db.session.expire_all()
+    assert db.session.get(Post, post_id).comment_count == 1
+
+    Post.query.update({Post.comment_count: 0})
+    db.session.commit()
+    _backfill_comment_counts()
+    db.session.expire_all()
+    assert db.session.get(Post, post_id).comment_count == Comment.query.filter_by(post_id=post_id).count() == 1
@@ -0,0 +1,84 @@
+import gzip
+import zlib
+from datetime import datetime
+
+import brotli
+import pytest
+from app import app, db, User, Group, Post, PostAlbum
+from extensions.compression import compress_stream
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token')
+        album = Group(name='Album', kind='album')
+        album.members.append(user)
+        db.session.add(album)
+        db.session.flush()
+        posts = [Post(content=f'post number {i} with some repetitive text', user_id=user.id, group_id=album.id) for i in range(40)]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all([PostAlbum(post_id=p.id, album_id=album.id) for p in posts])
+        db.session.commit()
+        yield app.test_client(), album.id
+
+
+def test_large_json_is_gzipped_when_accepted(client):
+    c, album_id = client
+    headers = {'Authorization': 'Bearer viewer-token', 'Accept-Encoding': 'gzip'}
+    rv = c.get(f'/api/albums/{album_id}/posts', headers=headers)
+    assert rv.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in rv.headers['Vary']
+    body = gzip.decompress(rv.get_data())
+    assert len(body) > len(rv.get_data())
+    assert app.json.loads(body)['posts'][0]['content'].startswith('post number 39')
+
+
+def test_brotli_is_preferred(client):
+    c, album_id = client
+    headers = {'Authorization': 'Bearer viewer-token', 'Accept-Encoding': 'gzip, br'}
+    rv = c.get(f'/api/albums/{album_id}/posts', headers=headers)
+    assert rv.headers['Content-Encoding'] == 'br'
+    assert app.json.loads(brotli.decompress(rv.get_data()))['posts'][0]['content'].startswith('post number 39')
+
+
+def test_identity_without_accept_encoding_or_below_threshold(client):
+    c, album_id = client
+    rv = c.get(f'/api/albums/{album_id}/posts', headers={'Authorization': 'Bearer viewer-token'})
+    assert 'Content-Encoding' not in rv.headers
+    rv = c.get('/api/me', headers={'Authorization': 'Bearer viewer-token', 'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in rv.headers
+
+
+def test_stream_compression_round_trips():
+    chunks = [b'{"posts":[', b'{"id":1}', b',{"id":2}', b']}']
+    compressed = b''.join(compress_stream(iter(chunks), 'gzip'))
+    assert zlib.decompress(compressed, 31) == b''.join(chunks)
+
+
+def test_stream_flushes_in_blocks_not_per_chunk():
+    chunks = [b'{"id":%d,"content":"post number %d with some repetitive text"},' % (i, i) for i in range(400)]
+    per_chunk = list(compress_stream(iter(chunks), 'gzip', flush_bytes=1))
+    blocked = list(compress_stream(iter(chunks), 'gzip', flush_bytes=4096))
+    assert zlib.decompress(b''.join(blocked), 31) == b''.join(chunks)
+    assert len(blocked) < 10
+    assert len(b''.join(blocked)) < len(b''.join(per_chunk)) / 2
+
+
+def test_range_and_file_responses_are_not_compressed(client):
+    c, _ = client
+    rv = c.get('/static/styles.css', headers={'Accept-Encoding': 'gzip', 'Range': 'bytes=0-10'})
+    assert rv.status_code == 206
+    assert 'Content-Encoding' not in rv.headers
+    assert len(rv.get_data()) == 11
+    rv = c.get('/static/styles.css', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in rv.headers
+
+
+def test_orjson_provider_keeps_flask_datetime_format():
+    with app.app_context():
+        assert app.json.loads(app.json.dumps({'at': datetime(2024, 1, 2, 3, 4, 5)}))['at'] == 'Tue, 02 Jan 2024 03:04:05 GMT'
@@ -0,0 +1,73 @@
+import hashlib
+from datetime import datetime
+
+import pytest
+import app as app_module
+from app import app, db, User, _backfill_phone_hashes
+from extensions.query_stats import collect_queries
+
+
+def sha(number):
+    return hashlib.sha256(number.encode()).hexdigest()
+
+
+HEADERS = {'Authorization': 'Bearer alice-token'}
+
+
+@pytest.fixture
+def client(make_user):
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        make_user('alice', '5550000001')
+        make_user('bob', '5550000002')
+        make_user('carol', '5550000003')
+        make_user('gone', '5550000004').deleted_at = datetime.utcnow()
+        db.session.commit()
+        yield app.test_client()
+
+
+def _matched(rv):
+    assert rv.status_code == 200
+    return sorted((m['contact'], m['user']['username']) for m in rv.get_json()['matches'])
+
+
+def test_matches_formatted_numbers_and_hashes(client):
+    rv = client.post('/api/contacts/match', headers=HEADERS, json={
+        'phone_numbers': ['(555) 000-0002', '555.000.0002', '5550000001', '5550000004', '123', None],
+        'phone_hashes': [sha('5550000003'), sha('5559999999'), 'not-a-hash'],
+    })
+    assert _matched(rv) == [('(555) 000-0002', 'bob'), ('555.000.0002', 'bob'), (sha('5550000003'), 'carol')]
+    assert 'phone_number' not in rv.get_json()['matches'][0]['user']
+
+
+def test_lookups_are_chunked(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'CONTACTS_MATCH_CHUNK', 2)
+    numbers = [f'555000{i:04d}' for i in range(2, 8)]
+    with collect_queries() as collector:
+        rv = client.post('/api/contacts/match', headers=HEADERS, json={'phone_numbers': numbers})
+    assert [u for _, u in _matched(rv)] == ['bob', 'carol']
+    assert sum(n for shape, n in collector.shapes.items() if 'user.phone_hash IN' in shape) == 3
+
+
+def test_too_many_contacts(client, monkeypatch):
+    monkeypatch.setattr(app_module, 'CONTACTS_MATCH_MAX', 3)
+    rv = client.post('/api/contacts/match', headers=HEADERS, json={'phone_numbers': ['5550000002'] * 2, 'phone_hashes': ['x'] * 2})
+    assert rv.status_code == 413
+    assert client.post('/api/contacts/match', headers=HEADERS, json={'phone_numbers': '5550000002'}).status_code == 400
+
+
+def test_phone_hash_follows_phone_number(client):
+    client.patch('/api/me', headers={'Authorization': 'Bearer bob-token'}, json={'phone_number': '+1 (555) 777-8888'})
+    bob = User.query.filter_by(username='bob').one()
+    assert bob.phone_hash == sha('15557778888')
+    client.patch('/api/me', headers={'Authorization': 'Bearer bob-token'}, json={'phone_number': ''})
+    db.session.refresh(bob)
+    assert bob.phone_hash is None
+
+    db.session.execute(User.__table__.update().values(phone_hash=None))
+    db.session.commit()
+    _backfill_phone_hashes()
+    db.session.expire_all()
+    assert User.query.filter_by(username='carol').one().phone_hash == sha('5550000003')
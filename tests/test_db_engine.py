@@ -0,0 +1,20 @@
+from sqlalchemy import create_engine, text
+
+from extensions.db_engine import engine_options
+
+
+def test_sqlite_file_gets_wal_and_busy_timeout(tmp_path):
+    uri = f"sqlite:///{tmp_path / 'tuned.db'}"
+    engine = create_engine(uri, **engine_options(uri))
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+    engine.dispose()
+
+
+def test_postgres_gets_pool_profile_and_timeouts():
+    options = engine_options('postgresql://groupo:secret@db/groupo')
+    assert options['pool_pre_ping'] is True
+    assert options['pool_size'] == 5 and options['max_overflow'] == 10
+    assert 'statement_timeout=30000' in options['connect_args']['options']
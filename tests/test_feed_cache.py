@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+from app import app, db, User, Group, Post, PostAlbum, purge_account
+from extensions.feed_cache import FeedCache, MemoryBackend
+from extensions.query_stats import collect_queries
+
+
+@pytest.fixture
+def client(make_user):
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice, bob = make_user('alice'), make_user('bob')
+        group = Group(name='Family', kind='group')
+        group.members.extend([alice, bob])
+        db.session.add(group)
+        db.session.flush()
+        album = Group(name='Trip', kind='album', owner_id=alice.id, parent_group_id=group.id)
+        album.members.extend([alice, bob])
+        db.session.add(album)
+        db.session.flush()
+        post = Post(content='hello', user_id=alice.id, group_id=album.id)
+        db.session.add(post)
+        db.session.flush()
+        db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.commit()
+        yield app.test_client(), group.id, album.id, post.id
+
+
+def auth(name):
+    return {'Authorization': f'Bearer {name}-token'}
+
+
+def test_repeat_feed_request_is_served_from_cache(client):
+    c, _, album_id, _ = client
+    first = c.get(f'/api/albums/{album_id}/posts', headers=auth('alice'))
+    assert first.headers['X-Cache'] == 'miss'
+    with collect_queries() as collector:
+        second = c.get(f'/api/albums/{album_id}/posts', headers=auth('bob'))
+    assert second.headers['X-Cache'] == 'hit'
+    assert second.get_json() == first.get_json()
+    assert collector.count <= 4  # auth and membership only
+
+
+def test_like_and_comment_invalidate_album_and_parent_group(client):
+    c, group_id, album_id, post_id = client
+    c.get(f'/api/albums/{album_id}/posts', headers=auth('alice'))
+    c.get(f'/api/groups/{group_id}/posts', headers=auth('alice'))
+
+    c.post(f'/api/posts/{post_id}/like', headers=auth('bob'))
+    rv = c.get(f'/api/albums/{album_id}/posts', headers=auth('alice'))
+    assert rv.headers['X-Cache'] == 'miss'
+    assert rv.get_json()['posts'][0]['likes'] == 1
+
+    c.post(f'/api/posts/{post_id}/comment', json={'comment': 'nice'}, headers=auth('bob'))
+    rv = c.get(f'/api/groups/{group_id}/posts', headers=auth('alice'))
+    assert rv.headers['X-Cache'] == 'miss'
+    assert [cm['content'] for cm in rv.get_json()['posts'][0]['comments']] == ['nice']
+
+
+def test_group_alias_is_not_shared_between_viewers(client):
+    c, group_id, _, _ = client
+    c.post(f'/api/groups/{group_id}/update', json={'name': 'The Fam'}, headers=auth('bob'))
+    assert c.get(f'/api/groups/{group_id}/posts', headers=auth('alice')).get_json()['group']['name'] == 'Family'
+    assert c.get(f'/api/groups/{group_id}/posts', headers=auth('bob')).get_json()['group']['name'] == 'The Fam'
+
+
+def test_album_feed_keeps_group_aliases_per_viewer(client):
+    c, group_id, album_id, _ = client
+    alice = User.query.filter_by(username='alice').one()
+    post = Post(content='from the group', user_id=alice.id, group_id=group_id)
+    db.session.add(post)
+    db.session.flush()
+    db.session.add(PostAlbum(post_id=post.id, album_id=album_id))
+    db.session.commit()
+
+    def names(user):
+        return {p['content']: p['group_name'] for p in c.get(f'/api/albums/{album_id}/posts', headers=auth(user)).get_json()['posts']}
+
+    c.post(f'/api/groups/{group_id}/update', json={'name': 'The Fam'}, headers=auth('alice'))
+    assert names('alice')['from the group'] == 'The Fam'
+    assert names('bob')['from the group'] == 'Family'
+    c.post(f'/api/groups/{group_id}/update', json={'name': 'Kin'}, headers=auth('alice'))
+    assert names('alice')['from the group'] == 'Kin'
+
+
+def test_account_purge_invalidates_feeds(client):
+    c, group_id, album_id, _ = client
+    assert len(c.get(f'/api/albums/{album_id}/posts', headers=auth('bob')).get_json()['posts']) == 1
+    purge_account(User.query.filter_by(username='alice').one().id)
+    rv = c.get(f'/api/albums/{album_id}/posts', headers=auth('bob'))
+    assert rv.headers['X-Cache'] == 'miss'
+    assert rv.get_json()['posts'] == []
+
+
+def test_concurrent_misses_build_once():
+    cache = FeedCache(MemoryBackend(), lru_size=10, ttl=60, enabled=True)
+    calls = []
+
+    def build():
+        calls.append(1)
+        time.sleep(0.05)
+        return b'{}'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build(1, ('feed',), build))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(hit for _, hit in results) == [False] + [True] * 7
+
+
+def test_bump_changes_key_and_shared_tier_fills_local():
+    backend = MemoryBackend()
+    writer, reader = FeedCache(backend, ttl=60, enabled=True), FeedCache(backend, ttl=60, enabled=True)
+    writer.get_or_build(7, ('feed',), lambda: b'v0')
+    assert reader.get_or_build(7, ('feed',), lambda: b'rebuilt') == (b'v0', True)
+    writer.bump([7])
+    assert reader.get_or_build(7, ('feed',), lambda: b'v1') == (b'v1', False)
@@ -0,0 +1,128 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+import app as app_module
+from app import app, db, User, Group, DeviceToken, Job, JOB_HANDLERS, job_handler, enqueue_job, run_pending_jobs, requeue_stale_jobs
+
+calls = []
+
+
+@job_handler('test_flaky')
+def flaky_job(value, fail_times=0):
+    calls.append(value)
+    if len(calls) <= fail_times:
+        raise RuntimeError('boom')
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    app.config['TESTING'] = True
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', True)
+    monkeypatch.setattr(app_module, 'JOB_RETRY_BASE_SECONDS', 0)
+    calls.clear()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='owner', password='x', first_name='O', last_name='Test', api_token='owner-token')
+        db.session.add(user)
+        db.session.commit()
+        yield {"client": app.test_client(), "user": user}
+
+
+def test_enqueue_returns_immediately_and_worker_runs_job(queue):
+    job = enqueue_job('test_flaky', {"value": 1}, user=queue["user"])
+    assert calls == []
+    assert job.status == 'queued'
+    assert run_pending_jobs('w1') == 1
+    assert calls == [1]
+    rv = queue["client"].get(f'/api/jobs/{job.id}', headers={'Authorization': 'Bearer owner-token'})
+    assert rv.get_json()["job"]["status"] == 'done'
+
+
+def test_post_returns_push_job_owned_by_the_poster(queue):
+    owner = queue["user"]
+    member = User(username='member', password='x', first_name='M', last_name='Test', api_token='member-token')
+    album = Group(name='Album', kind='album')
+    album.members.extend([owner, member])
+    db.session.add_all([member, album])
+    db.session.flush()
+    db.session.add(DeviceToken(user_id=member.id, token='ExponentPushToken[member]'))
+    db.session.commit()
+    rv = queue["client"].post(f'/api/albums/{album.id}/posts', json={'content': 'hi'}, headers={'Authorization': 'Bearer owner-token'})
+    job_id = rv.get_json()["notify_job_id"]
+    assert db.session.get(Job, job_id).user_id == owner.id
+    rv = queue["client"].get(f'/api/jobs/{job_id}', headers={'Authorization': 'Bearer owner-token'})
+    assert rv.get_json()["job"]["name"] == 'send_push'
+    assert queue["client"].get(f'/api/jobs/{job_id}', headers={'Authorization': 'Bearer member-token'}).status_code == 404
+
+
+def test_retries_then_dead_letters(queue):
+    job = enqueue_job('test_flaky', {"value": 2, "fail_times": 10}, max_attempts=3)
+    for _ in range(3):
+        run_pending_jobs('w1')
+    db.session.refresh(job)
+    assert job.status == 'dead'
+    assert job.attempts == 3
+    assert 'boom' in job.last_error
+
+
+def test_retry_uses_exponential_backoff(queue, monkeypatch):
+    monkeypatch.setattr(app_module, 'JOB_RETRY_BASE_SECONDS', 10)
+    job = enqueue_job('test_flaky', {"value": 3, "fail_times": 1})
+    run_pending_jobs('w1')
+    db.session.refresh(job)
+    assert job.status == 'queued'
+    assert job.run_at > datetime.utcnow() + timedelta(seconds=5)
+    # Not due yet, so nothing is claimed.
+    assert run_pending_jobs('w1') == 0
+
+
+def test_idempotency_key_deduplicates(queue):
+    first = enqueue_job('test_flaky', {"value": 4}, idempotency_key='once')
+    second = enqueue_job('test_flaky', {"value": 4}, idempotency_key='once')
+    assert first.id == second.id
+    assert Job.query.count() == 1
+
+
+def test_stale_running_jobs_are_requeued(queue):
+    job = enqueue_job('test_flaky', {"value": 5})
+    job.status = 'running'
+    job.locked_at = datetime.utcnow() - timedelta(hours=1)
+    db.session.commit()
+    assert requeue_stale_jobs() == 1
+    assert run_pending_jobs('w1') == 1
+
+
+def test_inline_mode_runs_handler_synchronously(queue, monkeypatch):
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', False)
+    assert enqueue_job('test_flaky', {"value": 6}) is None
+    assert calls == [6]
+    assert 'test_flaky' in JOB_HANDLERS
+
+
+def test_failed_push_is_retried_and_partial_failure_requeues_the_rest(queue, monkeypatch):
+    class Resp:
+        text = ''
+
+        def __init__(self, status_code):
+            self.status_code = status_code
+
+        def json(self):
+            return {"data": []}
+
+    down = {'tok-a', 'tok-b'}
+    monkeypatch.setattr(app_module, 'EXPO_PUSH_BATCH_SIZE', 1)
+    monkeypatch.setattr('app.http_session.post', lambda url, json=None, timeout=None: Resp(503 if json[0]["to"] in down else 200))
+
+    job = enqueue_job('send_push', {"tokens": ['tok-a', 'tok-b'], "title": "t", "body": "b", "data": {}})
+    run_pending_jobs('w1')
+    db.session.refresh(job)
+    assert job.status == 'queued' and job.attempts == 1
+
+    down.discard('tok-a')
+    run_pending_jobs('w1')
+    db.session.refresh(job)
+    assert job.status == 'done'
+    follow_up = Job.query.filter(Job.id != job.id).one()
+    assert json.loads(follow_up.payload)["tokens"] == ['tok-b']
@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import app as app_module
+from app import app, db, User, Group, Post, MediaGCState, MediaReference, run_media_gc
+
+
+@pytest.fixture
+def storage(monkeypatch, tmp_path):
+    app.config['TESTING'] = True
+    monkeypatch.setitem(app.config, 'UPLOAD_FOLDER', str(tmp_path))
+    monkeypatch.setattr(app_module, 'MEDIA_GC_PAGE_SIZE', 2)
+    old = time.time() - 3 * 24 * 3600
+    for name in ('kept.jpg', 'orphan.jpg', 'fresh.jpg'):
+        (tmp_path / name).write_bytes(b'x')
+        if name != 'fresh.jpg':
+            os.utime(tmp_path / name, (old, old))
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='u', password='x', first_name='U', last_name='Test')
+        album = Group(name='A', kind='album')
+        db.session.add_all([user, album])
+        db.session.flush()
+        db.session.add(Post(content='p', user_id=user.id, group_id=album.id, image_urls='/uploads/kept.jpg,s3-kept.jpg'))
+        for i in range(4):
+            db.session.add(Post(content=f'text {i}', user_id=user.id, group_id=album.id))
+        db.session.commit()
+        yield tmp_path
+
+
+def test_local_sweep_keeps_referenced_and_recent_files(storage):
+    stats = run_media_gc(dry_run=True)
+    assert stats["garbage"] == 1
+    assert (storage / 'orphan.jpg').exists()
+
+    stats = run_media_gc()
+    assert stats["phase"] == 'idle'
+    assert sorted(p.name for p in storage.iterdir()) == ['fresh.jpg', 'kept.jpg']
+
+
+def test_run_resumes_from_checkpoint(storage):
+    stats = run_media_gc(max_pages=1)
+    assert stats["phase"] == 'mark'
+    assert db.session.get(MediaGCState, 1).mark_cursor > 0
+    while run_media_gc(max_pages=1)["phase"] != 'idle':
+        pass
+    assert not (storage / 'orphan.jpg').exists()
+
+
+@pytest.fixture
+def bucket(storage, monkeypatch):
+    old = datetime.now(timezone.utc) - timedelta(days=3)
+    objects = [('orphan-a', old), ('orphan-b', old), ('s3-kept.jpg', old), ('s3-legacy.jpg', old), ('z-other-app', old)]
+    deleted = []
+
+    def fake_list(start_after=None, max_keys=1000, prefix=""):
+        remaining = [o for o in objects if o[0].startswith(prefix) and (start_after is None or o[0] > start_after)]
+        return remaining[:max_keys], len(remaining) > max_keys
+
+    monkeypatch.setenv('S3_BUCKET_NAME', 'groupo-media')
+    monkeypatch.setattr(app_module, 'USE_S3', True)
+    monkeypatch.setattr(app_module, 'MEDIA_GC_S3_PREFIX', '')
+    monkeypatch.setattr(app_module, 'list_objects_page', fake_list)
+    monkeypatch.setattr(app_module, 'delete_keys', lambda keys: deleted.extend(keys) or len(keys))
+    post = Post.query.filter(Post.image_urls.is_not(None)).one()
+    post.image_urls += ',https://groupo-media.s3.amazonaws.com/s3-legacy.jpg?X-Amz-Signature=abc'
+    db.session.commit()
+    return deleted
+
+
+def test_s3_sweep_pages_through_bucket(bucket):
+    run_media_gc()
+    assert bucket == ['orphan-a', 'orphan-b', 'z-other-app']
+
+
+def test_s3_sweep_stays_under_prefix(bucket, monkeypatch):
+    monkeypatch.setattr(app_module, 'MEDIA_GC_S3_PREFIX', 'orphan-')
+    run_media_gc()
+    assert bucket == ['orphan-a', 'orphan-b']
+
+    bucket.clear()
+    monkeypatch.setattr(app_module, 'MEDIA_GC_S3_PREFIX', None)
+    assert run_media_gc()["phase"] == 'idle'
+    assert bucket == []
+
+
+def test_unresolved_urls_block_s3_sweep(bucket):
+    post = Post.query.filter(Post.image_urls.is_not(None)).one()
+    post.image_urls += ',https://cdn.example.com/s3-kept.jpg'
+    db.session.commit()
+    stats = run_media_gc()
+    assert stats["unresolved"] and stats["phase"] == 'idle'
+    assert bucket == []
+
+
+def test_dry_run_writes_nothing(storage):
+    db.session.add(MediaReference(key='local:from-last-run.jpg'))
+    db.session.commit()
+    run_media_gc(dry_run=True)
+    db.session.expire_all()
+    assert [r.key for r in MediaReference.query] == ['local:from-last-run.jpg']
+    assert db.session.get(MediaGCState, 1) is None
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import text
+
+from app import app, db, User
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token'))
+        db.session.commit()
+        yield app.test_client()
+
+
+def test_metrics_exposes_route_latency_and_db_stats(client):
+    client.get('/api/me', headers={'Authorization': 'Bearer viewer-token'})
+    rv = client.get('/metrics')
+    assert rv.status_code == 200
+    body = rv.get_data(as_text=True)
+    assert 'groupo_http_request_duration_seconds_count{method="GET",route="/api/me",status="200"}' in body
+    assert 'groupo_db_query_duration_seconds_count' in body
+    assert 'groupo_http_requests_in_flight' in body
+
+
+def test_failed_statement_does_not_leave_a_start_time(client):
+    with db.engine.connect() as conn:
+        with pytest.raises(Exception):
+            conn.execute(text('SELECT * FROM no_such_table'))
+        assert conn.info.get('metrics_query_start') == []
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setenv('METRICS_TOKEN', 'secret')
+    assert client.get('/metrics').status_code == 401
+    assert client.get('/metrics', headers={'Authorization': 'Bearer secret'}).status_code == 200
+
+
+def test_multiprocess_dir_is_created_on_import(tmp_path):
+    path = tmp_path / 'metrics'
+    subprocess.run([sys.executable, '-c', 'import extensions.metrics'], check=True,
+                   env={**os.environ, 'PROMETHEUS_MULTIPROC_DIR': str(path)})
+    assert path.is_dir()
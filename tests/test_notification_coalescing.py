@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+import app as app_module
+from app import app, db, User, Group, Post, DeviceToken, PendingNotification, flush_pending_notifications
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = datetime(2024, 1, 1, 12, 0, 0)
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+@pytest.fixture
+def env(monkeypatch, make_user):
+    app.config['TESTING'] = True
+    clock = FakeClock()
+    sent = []
+
+    class Resp:
+        status_code = 200
+        text = ''
+
+        def json(self):
+            return {"data": []}
+
+    monkeypatch.setattr(app_module, 'NOTIFY_COALESCE_SECONDS', 60)
+    monkeypatch.setattr(app_module, 'notify_clock', clock)
+    monkeypatch.setattr('app.http_session.post', lambda url, json=None, timeout=None: sent.extend(json) or Resp())
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        owner = make_user('owner')
+        likers = [make_user(f'fan{i:02d}') for i in range(13)]
+        album = Group(name='Beach', kind='album')
+        album.members.extend([owner] + likers)
+        db.session.add(album)
+        db.session.flush()
+        post = Post(content='sunset', user_id=owner.id, group_id=album.id)
+        db.session.add(post)
+        db.session.add(DeviceToken(user_id=owner.id, token='tok-owner'))
+        db.session.commit()
+        yield {"client": app.test_client(), "clock": clock, "sent": sent, "post": post, "likers": likers}
+
+
+def test_likes_are_coalesced_into_one_digest(env):
+    client, clock, sent = env["client"], env["clock"], env["sent"]
+    for liker in env["likers"]:
+        client.post(f'/api/posts/{env["post"].id}/like', headers={'Authorization': f'Bearer {liker.username}-token'})
+        clock.advance(2)
+    assert sent == []
+
+    assert flush_pending_notifications() == 0
+    clock.advance(60)
+    # Simulate a worker restart: the buffer lives in the database, not in memory.
+    db.session.remove()
+    assert flush_pending_notifications() == 1
+    assert len(sent) == 1
+    assert sent[0]["to"] == 'tok-owner'
+    assert sent[0]["body"] == 'fan00 and 12 others liked your post in Beach'
+    assert PendingNotification.query.count() == 0
+
+
+def test_single_like_keeps_original_wording(env):
+    client, clock, sent = env["client"], env["clock"], env["sent"]
+    client.post(f'/api/posts/{env["post"].id}/like', headers={'Authorization': 'Bearer fan00-token'})
+    clock.advance(61)
+    flush_pending_notifications()
+    assert [p["body"] for p in sent] == ['fan00 liked your post in Beach']
+
+
+def test_deleted_comment_leaves_the_digest(env):
+    client, clock, sent = env["client"], env["clock"], env["sent"]
+    post_id = env["post"].id
+    ids = []
+    for name in ('fan00', 'fan01'):
+        rv = client.post(f'/api/posts/{post_id}/comment', json={'comment': f'hi from {name}'}, headers={'Authorization': f'Bearer {name}-token'})
+        ids.append(rv.get_json()["comment"]["id"])
+    client.delete(f'/api/comments/{ids[1]}', headers={'Authorization': 'Bearer fan01-token'})
+    clock.advance(61)
+    flush_pending_notifications()
+    owner_pushes = [p for p in sent if p["to"] == 'tok-owner']
+    assert [p["body"] for p in owner_pushes] == ['fan00: hi from fan00']
+
+    rv = client.post(f'/api/posts/{post_id}/comment', json={'comment': 'gone soon'}, headers={'Authorization': 'Bearer fan02-token'})
+    assert PendingNotification.query.count() > 0
+    client.delete(f'/api/comments/{rv.get_json()["comment"]["id"]}', headers={'Authorization': 'Bearer fan02-token'})
+    assert PendingNotification.query.count() == 0
+
+
+def test_post_deleted_from_the_web_drops_its_digest(env):
+    client, clock, sent = env["client"], env["clock"], env["sent"]
+    post_id = env["post"].id
+    client.post(f'/api/posts/{post_id}/like', headers={'Authorization': 'Bearer fan00-token'})
+    assert PendingNotification.query.count() == 1
+    User.query.filter_by(username='owner').one().password = app_module.password_hasher.hash('pw')
+    db.session.commit()
+    client.post('/login', data={'username': 'owner', 'password': 'pw'})
+    assert client.post(f'/delete_post/{post_id}').status_code == 200
+    assert PendingNotification.query.count() == 0
+    clock.advance(61)
+    assert flush_pending_notifications() == 0
+    assert sent == []
@@ -0,0 +1,68 @@
+import pytest
+from app import app, db, Group, Post, PostAlbum, DeviceToken, _recipient_tokens
+
+
+@pytest.fixture
+def setup(make_user):
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice, bob, carol = make_user('alice'), make_user('bob'), make_user('carol')
+        group = Group(name='Trip', kind='group')
+        group.members.extend([alice, bob, carol])
+        db.session.add(group)
+        db.session.flush()
+        albums = []
+        for name in ('Day 1', 'Day 2', 'Day 3'):
+            album = Group(name=name, kind='album', owner_id=alice.id, parent_group_id=group.id)
+            album.members.extend([alice, bob, carol])
+            albums.append(album)
+        db.session.add_all(albums)
+        db.session.add_all([
+            DeviceToken(user_id=alice.id, token='tok-alice'),
+            DeviceToken(user_id=bob.id, token='tok-bob'),
+            DeviceToken(user_id=carol.id, token='tok-carol'),
+        ])
+        db.session.commit()
+        yield {"client": app.test_client(), "alice": alice, "bob": bob, "carol": carol, "group": group, "albums": albums}
+
+
+def test_recipients_are_deduplicated_across_albums(setup):
+    tokens = _recipient_tokens(setup["alice"], group_ids=[a.id for a in setup["albums"]])
+    assert sorted(tokens) == ['tok-bob', 'tok-carol']
+
+
+def test_muted_group_silences_its_albums(setup):
+    client = setup["client"]
+    rv = client.post(f'/api/groups/{setup["group"].id}/mute', headers={'Authorization': 'Bearer bob-token'})
+    assert rv.get_json()["muted"] is True
+    tokens = _recipient_tokens(setup["alice"], group_ids=[a.id for a in setup["albums"]])
+    assert tokens == ['tok-carol']
+
+    client.delete(f'/api/groups/{setup["group"].id}/mute', headers={'Authorization': 'Bearer bob-token'})
+    tokens = _recipient_tokens(setup["alice"], group_ids=[setup["albums"][0].id])
+    assert sorted(tokens) == ['tok-bob', 'tok-carol']
+
+
+def test_comment_sends_one_push_per_device(setup, monkeypatch):
+    sent = []
+
+    class Resp:
+        status_code = 200
+        text = ''
+
+        def json(self):
+            return {"data": []}
+
+    monkeypatch.setattr('app.http_session.post', lambda url, json=None, timeout=None: sent.extend(json) or Resp())
+    albums = setup["albums"]
+    post = Post(content='hello', user_id=setup["alice"].id, group_id=albums[0].id)
+    db.session.add(post)
+    db.session.commit()
+    db.session.add_all([PostAlbum(post_id=post.id, album_id=a.id) for a in albums])
+    db.session.commit()
+
+    rv = setup["client"].post(f'/api/posts/{post.id}/comment', json={'comment': 'nice'}, headers={'Authorization': 'Bearer bob-token'})
+    assert rv.status_code == 200
+    assert sorted(p["to"] for p in sent) == ['tok-alice', 'tok-carol']
@@ -0,0 +1,74 @@
+import threading
+
+import bcrypt
+import pytest
+
+import app as app_module
+from app import app, db, User
+from extensions.passwords import PasswordHasher, hash_cost
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        yield app.test_client()
+
+
+def _register(c, username='alice', password='correct horse'):
+    body = {'username': username, 'password': password, 'first_name': 'Alice', 'last_name': 'Test'}
+    rv = c.post('/api/register', json=body)
+    assert rv.status_code == 200
+    return rv.get_json()['token']
+
+
+def test_register_login_and_change_password(client):
+    token = _register(client)
+    assert hash_cost(User.query.one().password) == app_module.password_hasher.rounds
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'wrong'}).status_code == 401
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'correct horse'}).status_code == 200
+
+    headers = {'Authorization': f'Bearer {token}'}
+    body = {'current_password': 'correct horse', 'new_password': 'battery staple'}
+    assert client.post('/api/me/password', json=body, headers=headers).status_code == 200
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'battery staple'}).status_code == 200
+
+
+def test_login_upgrades_hash_cost(client):
+    old_hash = bcrypt.hashpw(b'correct horse', bcrypt.gensalt(5)).decode()
+    db.session.add(User(username='alice', password=old_hash, first_name='Alice', last_name='Test'))
+    db.session.commit()
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'correct horse'}).status_code == 200
+    db.session.expire_all()
+    upgraded = User.query.one().password
+    assert upgraded != old_hash and hash_cost(upgraded) == app_module.password_hasher.rounds
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'correct horse'}).status_code == 200
+
+
+def test_saturated_hasher_returns_503(client, monkeypatch):
+    _register(client)
+    hasher = PasswordHasher(rounds=4, workers=1, max_pending=1, wait_seconds=0.01)
+    monkeypatch.setattr(app_module, 'password_hasher', hasher)
+    hasher._slots.acquire()
+    try:
+        rv = client.post('/api/login', json={'username': 'alice', 'password': 'correct horse'})
+    finally:
+        hasher._slots.release()
+    assert rv.status_code == 503
+    assert rv.headers['Retry-After'] == '1'
+    assert client.post('/api/login', json={'username': 'alice', 'password': 'correct horse'}).status_code == 200
+
+
+def test_hasher_runs_concurrent_calls_on_its_workers():
+    hasher = PasswordHasher(rounds=4, workers=2, max_pending=8, wait_seconds=5)
+    hashed = hasher.hash('secret')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(hasher.verify(hashed, 'secret'))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [True] * 8
+    assert not hasher.verify('not-a-hash', 'secret')
@@ -0,0 +1,51 @@
+import json
+import time
+
+import pytest
+import extensions.profiler as profiler
+from app import app, db, User
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    app.config['TESTING'] = True
+    monkeypatch.setattr(profiler, 'PROFILE_TOKEN', 'prof-secret')
+    monkeypatch.setattr(profiler, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(profiler, 'PROFILE_INTERVAL_MS', 1)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token'))
+        db.session.commit()
+        yield app.test_client()
+
+
+def test_sampling_profiler_captures_busy_function():
+    import threading
+
+    def busy():
+        end = time.perf_counter() + 0.05
+        while time.perf_counter() < end:
+            pass
+
+    p = profiler.SamplingProfiler(threading.get_ident(), interval_ms=1).start()
+    busy()
+    p.stop()
+    assert 'busy (test_profiler.py' in p.collapsed()
+    doc = p.speedscope('busy')
+    assert doc["profiles"][0]["type"] == 'sampled'
+
+
+def test_profile_header_writes_downloadable_profile(client):
+    rv = client.get('/api/me', headers={'Authorization': 'Bearer viewer-token', 'X-Profile': 'prof-secret'})
+    stem = rv.headers['X-Profile-Id']
+    listing = client.get('/admin/profiles', headers={'Authorization': 'Bearer prof-secret'}).get_json()
+    assert f"{stem}.speedscope.json" in [p["name"] for p in listing["profiles"]]
+    download = client.get(f'/admin/profiles/{stem}.speedscope.json', headers={'Authorization': 'Bearer prof-secret'})
+    assert json.loads(download.data)["exporter"] == 'groupo-profiler'
+
+
+def test_profiling_requires_token(client):
+    rv = client.get('/api/me', headers={'Authorization': 'Bearer viewer-token', 'X-Profile': 'wrong'})
+    assert 'X-Profile-Id' not in rv.headers
+    assert client.get('/admin/profiles', headers={'Authorization': 'Bearer wrong'}).status_code == 404
@@ -0,0 +1,92 @@
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import app as app_module
+from app import app, db, User, DeviceToken, PushTicket, _send_push, process_push_receipts
+
+
+class ExpoStub(BaseHTTPRequestHandler):
+    """Minimal stand-in for Expo's send and getReceipts endpoints."""
+
+    receipts = {}
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.path.endswith('/send'):
+            data = []
+            for message in body:
+                ticket_id = f"ticket-{message['to']}"
+                if message['to'] == 'tok-bad-format':
+                    data.append({"status": "error", "message": "not a token", "details": {"error": "DeviceNotRegistered"}})
+                else:
+                    data.append({"status": "ok", "id": ticket_id})
+            payload = {"data": data}
+        else:
+            payload = {"data": {i: self.receipts[i] for i in body["ids"] if i in self.receipts}}
+        raw = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def expo(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ExpoStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_port}/--/api/v2/push'
+    monkeypatch.setenv('EXPO_PUSH_URL', f'{base}/send')
+    monkeypatch.setenv('EXPO_RECEIPTS_URL', f'{base}/getReceipts')
+    monkeypatch.setattr(app_module, 'PUSH_MAX_FAILURES', 2)
+    ExpoStub.receipts = {
+        'ticket-tok-good': {"status": "ok"},
+        'ticket-tok-gone': {"status": "error", "details": {"error": "DeviceNotRegistered"}},
+        'ticket-tok-flaky': {"status": "error", "details": {"error": "MessageRateExceeded"}},
+    }
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='u', password='x', first_name='U', last_name='Test')
+        db.session.add(user)
+        db.session.flush()
+        for token in ('tok-good', 'tok-gone', 'tok-flaky', 'tok-bad-format', 'tok-pending'):
+            db.session.add(DeviceToken(user_id=user.id, token=token))
+        db.session.commit()
+        yield
+    server.shutdown()
+
+
+def test_receipts_prune_dead_tokens_and_report_success_rate(expo):
+    _send_push(['tok-good', 'tok-gone', 'tok-flaky', 'tok-bad-format', 'tok-pending'], 't', 'b', {})
+    # Ticket-level errors are applied immediately.
+    assert DeviceToken.query.filter_by(token='tok-bad-format').count() == 0
+    assert PushTicket.query.count() == 4
+
+    # Nothing is read before the receipt delay has passed.
+    assert process_push_receipts()["checked"] == 0
+
+    stats = process_push_receipts(now=datetime.utcnow() + timedelta(minutes=20))
+    assert stats["checked"] == 3
+    assert stats["ok"] == 1
+    assert stats["pruned"] == 1
+    assert stats["success_rate"] == pytest.approx(1 / 3)
+    assert DeviceToken.query.filter_by(token='tok-gone').count() == 0
+    assert DeviceToken.query.filter_by(token='tok-flaky').one().failure_count == 1
+    # The ticket without a receipt yet stays queued for the next poll.
+    assert [t.token for t in PushTicket.query.all()] == ['tok-pending']
+
+
+def test_repeated_failures_disable_token(expo):
+    for _ in range(2):
+        _send_push(['tok-flaky'], 't', 'b', {})
+        process_push_receipts(now=datetime.utcnow() + timedelta(minutes=20))
+    assert DeviceToken.query.filter_by(token='tok-flaky').one().disabled_at is not None
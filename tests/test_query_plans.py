@@ -0,0 +1,92 @@
+"""EXPLAIN QUERY PLAN every statement the hot endpoints issue and fail on full table scans."""
+import re
+
+import pytest
+from sqlalchemy import event
+
+from app import app, db, User, Group, Post, PostAlbum, Comment, DeviceToken, HOT_INDEXES
+
+# "SCAN post" is a full table scan; "SCAN post USING INDEX ...", "SEARCH ..." and scans of
+# materialized subqueries ("SCAN anon_1", "SCAN (subquery-3)") are not.
+FULL_SCAN = re.compile(r'^SCAN (\w+)(?!.*\bUSING (COVERING )?INDEX\b)')
+
+ENDPOINTS = [
+    ('get', '/api/groups', None),
+    ('get', '/api/albums', None),
+    ('get', '/api/groups/{group}/posts', None),
+    ('get', '/api/albums/{album}/posts', None),
+    ('get', '/api/groups/{group}/members', None),
+    ('get', '/api/albums/{album}/members', None),
+    ('get', '/api/me', None),
+    ('get', '/api/posts/{post}/comments', None),
+    ('post', '/api/posts/{post}/like', None),
+    ('post', '/api/posts/{post}/comment', {'comment': 'plan check'}),
+    ('post', '/api/push/register', {'token': 'ExponentPushToken[plan]'}),
+    ('post', '/api/contacts/match', {'phone_numbers': [f'555000{i:04d}' for i in range(50)]}),
+]
+
+
+@pytest.fixture
+def seeded():
+    app.config['TESTING'] = True
+    with app.app_context():
+        if db.engine.dialect.name != 'sqlite':
+            pytest.skip('query plan checks use SQLite EXPLAIN QUERY PLAN')
+        db.drop_all()
+        db.create_all()
+        users = [User(username=f'plan{i}', password='x', first_name=f'P{i}', last_name='Test', api_token=f'plan{i}-token') for i in range(20)]
+        db.session.add_all(users)
+        db.session.flush()
+        group = Group(name='Group', kind='group')
+        group.members.extend(users[:10])
+        db.session.add(group)
+        db.session.flush()
+        album = Group(name='Album', kind='album', owner_id=users[0].id, parent_group_id=group.id)
+        album.members.extend(users[:10])
+        db.session.add(album)
+        db.session.flush()
+        posts = [Post(content=f'post {i}', user_id=users[i % 10].id, group_id=album.id) for i in range(50)]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all([PostAlbum(post_id=p.id, album_id=album.id) for p in posts])
+        db.session.add_all([Comment(content='c', user_id=users[2].id, post_id=p.id) for p in posts])
+        db.session.add_all([DeviceToken(user_id=u.id, token=f'ExponentPushToken[{u.id}]') for u in users])
+        db.session.commit()
+        yield app.test_client(), {'group': group.id, 'album': album.id, 'post': posts[0].id}
+
+
+def _full_scans(statements):
+    failures = []
+    with db.engine.connect() as conn:
+        for statement, params in dict.fromkeys(statements):
+            if not statement.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            plan = [row[3] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, params).fetchall()]
+            scans = [step for step in plan if (m := FULL_SCAN.match(step)) and m.group(1) in db.metadata.tables]
+            if scans:
+                failures.append(f"{', '.join(scans)}\n    {' '.join(statement.split())}")
+    return failures
+
+
+@pytest.mark.parametrize('method,path,body', ENDPOINTS, ids=[f'{m} {p}' for m, p, _ in ENDPOINTS])
+def test_endpoint_queries_use_indexes(seeded, method, path, body):
+    client, ids = seeded
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany:
+            statements.append((statement, tuple(parameters) if isinstance(parameters, (list, tuple)) else parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        rv = getattr(client, method)(path.format(**ids), json=body, headers={'Authorization': 'Bearer plan1-token'})
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert rv.status_code == 200
+    failures = _full_scans(statements)
+    assert not failures, 'full table scans:\n' + '\n'.join(failures)
+
+
+def test_hot_indexes_are_declared_on_models(seeded):
+    declared = {index.name for table in db.metadata.tables.values() for index in table.indexes}
+    assert {name for name, _, _ in HOT_INDEXES} <= declared
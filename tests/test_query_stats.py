@@ -0,0 +1,66 @@
+import pytest
+from sqlalchemy import text
+
+from app import app, db, User, Group, Post
+from extensions.query_stats import collect_queries, statement_shape
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token')
+        album = Group(name='Album', kind='album')
+        album.members.append(user)
+        db.session.add(album)
+        db.session.flush()
+        db.session.add_all([Post(content=f'post {i}', user_id=user.id, group_id=album.id) for i in range(10)])
+        db.session.commit()
+        yield app.test_client()
+
+
+def test_statement_shape_ignores_parameters():
+    a = statement_shape("SELECT * FROM post WHERE id IN (?, ?, ?) AND group_id = 4")
+    b = statement_shape("SELECT * FROM post WHERE id IN (?) AND group_id = 17")
+    assert a == b
+
+
+def test_server_timing_header(client):
+    rv = client.get('/api/me', headers={'Authorization': 'Bearer viewer-token'})
+    assert 'db;dur=' in rv.headers['Server-Timing']
+    assert 'queries' in rv.headers['Server-Timing']
+
+
+def test_feed_n_plus_one_is_detected(client):
+    with collect_queries() as collector:
+        client.get('/api/albums/1/posts', headers={'Authorization': 'Bearer viewer-token'})
+    assert collector.n_plus_one()
+
+
+def test_me_query_budget(client, assert_max_queries):
+    with assert_max_queries(3):
+        client.get('/api/me', headers={'Authorization': 'Bearer viewer-token'})
+
+
+def test_streamed_feed_queries_are_reported_when_the_stream_ends(client, capsys, monkeypatch):
+    monkeypatch.setattr('extensions.query_stats.REQUEST_LOG_ENABLED', True)
+    with collect_queries() as collector:
+        rv = client.get('/api/albums/1/posts?stream=true', headers={'Authorization': 'Bearer viewer-token'})
+        assert len(rv.get_json()['posts']) == 10
+    lines = [line for line in capsys.readouterr().out.splitlines() if line.startswith('[request]')]
+    assert len(lines) == 1
+    assert f"queries={collector.count} " in lines[0]
+    assert 'n_plus_one=0' not in lines[0]
+
+
+def test_failed_statement_does_not_leave_a_start_time(client):
+    with collect_queries() as collector:
+        with db.engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text('SELECT * FROM no_such_table'))
+            assert conn.info.get('query_start') == []
+            conn.execute(text('SELECT 1'))
+    assert collector.count == 2
+    assert 'no_such_table' in next(iter(collector.shapes))
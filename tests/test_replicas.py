@@ -0,0 +1,92 @@
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app import app, db, User, Group, Post, PostAlbum, Job
+from extensions.db_replicas import DatabaseStickyStore, router
+
+
+def _seed(session, post_content):
+    user = User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token')
+    album = Group(name='Album', kind='album')
+    album.members.append(user)
+    session.add(album)
+    session.flush()
+    post = Post(content=post_content, user_id=user.id, group_id=album.id)
+    session.add(post)
+    session.flush()
+    session.add(PostAlbum(post_id=post.id, album_id=album.id))
+    session.commit()
+    return album.id
+
+
+@pytest.fixture
+def client(tmp_path):
+    app.config['TESTING'] = True
+    replica_uri = f"sqlite:///{tmp_path / 'replica.db'}"
+    engine = create_engine(replica_uri)
+    db.metadata.create_all(engine)
+    with Session(engine) as session:
+        _seed(session, 'replica copy')
+    engine.dispose()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        album_id = _seed(db.session, 'primary copy')
+        router.configure([replica_uri])
+        try:
+            yield app.test_client(), album_id
+        finally:
+            router.configure([])
+
+
+def _contents(rv):
+    return [p['content'] for p in rv.get_json()['posts']]
+
+
+def test_get_reads_from_replica(client):
+    c, album_id = client
+    rv = c.get(f'/api/albums/{album_id}/posts', headers={'Authorization': 'Bearer viewer-token'})
+    assert _contents(rv) == ['replica copy']
+
+
+def test_writes_go_to_primary_and_writer_reads_primary_afterwards(client):
+    c, album_id = client
+    headers = {'Authorization': 'Bearer viewer-token'}
+    rv = c.post(f'/api/albums/{album_id}/posts', json={'content': 'fresh'}, headers=headers)
+    assert rv.status_code == 200
+    assert Post.query.filter_by(content='fresh').count() == 1
+
+    rv = c.get(f'/api/albums/{album_id}/posts', headers=headers)
+    assert _contents(rv) == ['fresh', 'primary copy']
+
+
+def test_write_window_is_shared_across_workers(client):
+    c, album_id = client
+    headers = {'Authorization': 'Bearer viewer-token'}
+    c.post(f'/api/albums/{album_id}/posts', json={'content': 'fresh'}, headers=headers)
+    # A second store over the same table stands in for another gunicorn worker.
+    other_worker = DatabaseStickyStore(db)
+    assert other_worker.is_sticky('Bearer viewer-token')
+    assert not other_worker.is_sticky('Bearer someone-else')
+    stored = db.session.execute(select(other_worker.table.c.client_hash)).scalars().all()
+    assert stored and 'viewer-token' not in stored[0]
+    # No cookie: only the shared table keeps this token client on the primary.
+    rv = app.test_client().get(f'/api/albums/{album_id}/posts', headers=headers)
+    assert _contents(rv) == ['fresh', 'primary copy']
+
+
+def test_use_primary_view_skips_replica(client):
+    c, _ = client
+    job = Job(name='noop', payload='{}', user_id=User.query.first().id)
+    db.session.add(job)
+    db.session.commit()  # Only on the primary; a replica read would 404.
+    rv = c.get(f'/api/jobs/{job.id}', headers={'Authorization': 'Bearer viewer-token'})
+    assert rv.status_code == 200
+
+
+def test_unreachable_replica_falls_back_to_primary(client, tmp_path):
+    c, album_id = client
+    router.configure([f"sqlite:///{tmp_path / 'missing' / 'replica.db'}"])
+    rv = c.get(f'/api/albums/{album_id}/posts', headers={'Authorization': 'Bearer viewer-token'})
+    assert _contents(rv) == ['primary copy']
@@ -0,0 +1,62 @@
+import pytest
+from app import app, db, User, Group, Post, PostAlbum, Comment
+from extensions.msgpack_response import unpackb
+from extensions.query_stats import collect_queries
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        user = User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token')
+        album = Group(name='Album', kind='album')
+        album.members.append(user)
+        db.session.add(album)
+        db.session.flush()
+        posts = [Post(content=f'post {i}', user_id=user.id, group_id=album.id, image_urls=f'a{i}.jpg,b{i}.jpg') for i in range(5)]
+        db.session.add_all(posts)
+        db.session.flush()
+        db.session.add_all([PostAlbum(post_id=p.id, album_id=album.id) for p in posts])
+        db.session.add_all([Comment(content='nice', user_id=user.id, post_id=p.id) for p in posts])
+        db.session.commit()
+        yield app.test_client(), album.id
+
+
+HEADERS = {'Authorization': 'Bearer viewer-token'}
+
+
+def test_fields_limit_keys_and_skip_relation_queries(client):
+    c, album_id = client
+    with collect_queries() as collector:
+        rv = c.get(f'/api/albums/{album_id}/posts?fields=id,user,likes,first_image', headers=HEADERS)
+    post = rv.get_json()['posts'][0]
+    assert set(post) == {'id', 'user', 'likes', 'first_image'}
+    assert post['first_image'] == 'a4.jpg'
+    # Neither comments nor album links were loaded.
+    assert not [shape for shape in collector.shapes if shape.startswith(('SELECT comment.', 'SELECT post_album.'))]
+
+
+def test_include_adds_relations_to_selected_fields(client):
+    c, album_id = client
+    rv = c.get(f'/api/albums/{album_id}/posts?fields=id&include=comments,albums', headers=HEADERS)
+    post = rv.get_json()['posts'][0]
+    assert set(post) == {'id', 'comments', 'associated_albums'}
+    assert post['comments'][0]['content'] == 'nice'
+
+
+def test_unknown_field_is_rejected(client):
+    c, album_id = client
+    rv = c.get(f'/api/albums/{album_id}/posts?fields=id,password', headers=HEADERS)
+    assert rv.status_code == 400
+    assert 'password' in rv.get_json()['error']
+
+
+def test_msgpack_response_matches_json(client):
+    c, album_id = client
+    as_json = c.get(f'/api/albums/{album_id}/posts', headers=HEADERS)
+    as_msgpack = c.get(f'/api/albums/{album_id}/posts', headers={**HEADERS, 'Accept': 'application/msgpack'})
+    assert as_msgpack.mimetype == 'application/msgpack'
+    assert unpackb(as_msgpack.get_data()) == as_json.get_json()
+    assert len(as_msgpack.get_data()) < len(as_json.get_data())
@@ -0,0 +1,77 @@
+import json
+import os
+import tracemalloc
+
+import pytest
+from sqlalchemy import insert
+
+from app import app, db, User, Group, Post, PostAlbum, Comment
+
+# Set STREAM_TEST_POSTS=1000000 for the full-size check; the default keeps the suite fast.
+STREAM_TEST_POSTS = int(os.environ.get('STREAM_TEST_POSTS', 20000))
+STREAM_PEAK_BYTES = 8 * 1024 * 1024
+HEADERS = {'Authorization': 'Bearer alice-token'}
+
+
+@pytest.fixture
+def client():
+    app.config['TESTING'] = True
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        alice = User(username='alice', password='x', first_name='Alice', last_name='Test', api_token='alice-token')
+        group = Group(name='Family', kind='group')
+        group.members.append(alice)
+        db.session.add(group)
+        db.session.flush()
+        album = Group(name='Trip', kind='album', owner_id=alice.id, parent_group_id=group.id)
+        album.members.append(alice)
+        db.session.add(album)
+        db.session.commit()
+        yield app.test_client(), alice, group, album
+
+
+def test_streamed_feed_matches_buffered_feed(client, monkeypatch):
+    c, alice, group, album = client
+    monkeypatch.setattr('app.FEED_STREAM_BATCH_SIZE', 3)
+    for i in range(7):
+        post = Post(content=f'post {i}', user_id=alice.id, group_id=album.id if i % 2 else group.id)
+        db.session.add(post)
+        db.session.flush()
+        if i % 2:
+            db.session.add(PostAlbum(post_id=post.id, album_id=album.id))
+        db.session.add(Comment(content=f'comment {i}', user_id=alice.id, post_id=post.id))
+    db.session.commit()
+
+    for path in (f'/api/groups/{group.id}/posts', f'/api/albums/{album.id}/posts', f'/api/groups/{group.id}/posts?fields=id,user'):
+        buffered = c.get(path, headers=HEADERS).get_json()
+        streamed = c.get(path + ('&' if '?' in path else '?') + 'stream=true', headers=HEADERS)
+        assert streamed.is_streamed
+        assert json.loads(streamed.get_data()) == buffered
+    assert len(buffered['posts']) == 7
+
+
+def test_streamed_feed_of_empty_group(client):
+    c, _, group, _ = client
+    assert c.get(f'/api/groups/{group.id}/posts?stream=true', headers=HEADERS).get_json()['posts'] == []
+
+
+def test_streamed_feed_memory_is_bounded(client):
+    c, alice, group, _ = client
+    for start in range(0, STREAM_TEST_POSTS, 50000):
+        rows = range(start, min(STREAM_TEST_POSTS, start + 50000))
+        db.session.execute(insert(Post), [{"content": f"post {i}", "user_id": alice.id, "group_id": group.id} for i in rows])
+    db.session.commit()
+
+    tracemalloc.start()
+    try:
+        rv = c.get(f'/api/groups/{group.id}/posts?stream=true&fields=id,content', headers=HEADERS, buffered=False)
+        size = 0
+        for chunk in rv.response:
+            size += len(chunk)
+        rv.close()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert size > STREAM_TEST_POSTS * 20
+    assert peak < STREAM_PEAK_BYTES
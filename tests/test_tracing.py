@@ -0,0 +1,73 @@
+import json
+
+import pytest
+from sqlalchemy import text
+import app as app_module
+import extensions.tracing as tracing
+from app import app, db, User, enqueue_job, run_pending_jobs, job_handler
+
+
+@job_handler('test_traced')
+def traced_job():
+    User.query.count()
+
+
+@pytest.fixture
+def traced(monkeypatch, tmp_path):
+    app.config['TESTING'] = True
+    trace_file = tmp_path / 'traces.jsonl'
+    monkeypatch.setattr(tracing, 'TRACE_FILE', str(trace_file))
+    monkeypatch.setattr(tracing, 'TRACE_EXPORTER', 'file')
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 1.0)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        db.session.add(User(username='viewer', password='x', first_name='V', last_name='Test', api_token='viewer-token'))
+        db.session.commit()
+        yield lambda: [json.loads(line) for line in trace_file.read_text().splitlines()]
+
+
+def test_request_span_contains_sql_spans(traced):
+    rv = app.test_client().get('/api/me', headers={'Authorization': 'Bearer viewer-token'})
+    trace_id = rv.headers['traceparent'].split('-')[1]
+    spans = [s for s in traced() if s["traceId"] == trace_id]
+    root = next(s for s in spans if s["kind"] == 'server')
+    assert root["name"] == 'HTTP GET /api/me'
+    assert any(s["name"] == 'db.query' and s["parentSpanId"] == root["spanId"] for s in spans)
+
+
+def test_incoming_traceparent_is_continued(traced):
+    parent = '00-' + 'a' * 32 + '-' + 'b' * 16 + '-01'
+    app.test_client().get('/api/me', headers={'Authorization': 'Bearer viewer-token', 'traceparent': parent})
+    root = next(s for s in traced() if s["kind"] == 'server')
+    assert root["traceId"] == 'a' * 32
+    assert root["parentSpanId"] == 'b' * 16
+
+
+def test_unsampled_requests_export_nothing(traced, monkeypatch):
+    monkeypatch.setattr(tracing, 'TRACE_SAMPLE_RATE', 0.0)
+    app.test_client().get('/api/me', headers={'Authorization': 'Bearer viewer-token'})
+    with pytest.raises(FileNotFoundError):
+        traced()
+
+
+def test_job_continues_enqueuing_trace(traced, monkeypatch):
+    monkeypatch.setattr(app_module, 'JOB_QUEUE_ENABLED', True)
+    with tracing.start_span('enqueue') as span:
+        enqueue_job('test_traced')
+    run_pending_jobs('w1')
+    job_span = next(s for s in traced() if s["name"] == 'job test_traced')
+    assert job_span["traceId"] == span.trace_id
+    assert job_span["parentSpanId"] == span.span_id
+
+
+def test_failed_statement_ends_its_span(traced):
+    with tracing.start_span('outer') as outer:
+        with db.engine.connect() as conn:
+            with pytest.raises(Exception):
+                conn.execute(text('SELECT * FROM no_such_table'))
+            assert tracing.current_span() is outer
+            assert conn.info.get('trace_spans') == []
+    failed = next(s for s in traced() if s["name"] == 'db.query')
+    assert failed["parentSpanId"] == outer.span_id
+    assert failed["status"]["code"] == 'ERROR'